@@ -1,10 +1,37 @@
 from fastapi import APIRouter
-from .endpoints import auth, users, files, data
+from ...core.config import settings
+from .endpoints import auth, users, files, data, admin
+from .endpoints import auth_async, files_async, data_async
 
-api_router = APIRouter()
 
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(files.router, prefix="/files", tags=["files"])
-api_router.include_router(data.router, prefix="/data", tags=["data"])
+def _with_fallback(primary: APIRouter, fallback: APIRouter) -> APIRouter:
+    """Combine two routers; routes in ``primary`` shadow the same path/method
+    in ``fallback`` so endpoints without an async variant keep working."""
+    combined = APIRouter()
+    taken = {(route.path, method) for route in primary.routes for method in route.methods}
+    combined.routes.extend(primary.routes)
+    combined.routes.extend(
+        route for route in fallback.routes
+        if not any((route.path, method) in taken for method in route.methods)
+    )
+    return combined
 
+
+def build_api_router(async_db: bool = settings.ASYNC_DB) -> APIRouter:
+    router = APIRouter()
+
+    auth_router, files_router, data_router = auth.router, files.router, data.router
+    if async_db:
+        auth_router = _with_fallback(auth_async.router, auth.router)
+        files_router = _with_fallback(files_async.router, files.router)
+        data_router = _with_fallback(data_async.router, data.router)
+
+    router.include_router(auth_router, prefix="/auth", tags=["auth"])
+    router.include_router(users.router, prefix="/users", tags=["users"])
+    router.include_router(files_router, prefix="/files", tags=["files"])
+    router.include_router(data_router, prefix="/data", tags=["data"])
+    router.include_router(admin.router, prefix="/admin", tags=["admin"])
+    return router
+
+
+api_router = build_api_router()
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
+from ....core.deps import get_current_admin_user
+from ....core.profiling import request_log
+from ....models.user import User
+from ....schemas.admin import DatasetCacheReport, RequestProfile, SlowRequest
+from ....services.data_service import DataService
+
+router = APIRouter()
+
+
+@router.get("/datasets", response_model=DatasetCacheReport)
+def get_cached_datasets(current_user: User = Depends(get_current_admin_user)):
+    """Datasets cached by the worker serving the request and their memory:
+    resident pages of the shared Arrow mapping vs. private heap bytes."""
+    return DatasetCacheReport(**DataService.cache_report())
+
+
+@router.get("/slow-queries", response_model=List[SlowRequest])
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Requests of this worker that took at least SLOW_REQUEST_MS, newest first."""
+    return request_log.slow_requests(limit)
+
+
+@router.get("/profiles", response_model=List[RequestProfile])
+def get_profiles(current_user: User = Depends(get_current_admin_user)):
+    """Request profiles kept by this worker, newest first."""
+    return request_log.profile_list()
+
+
+@router.get("/profiles/{profile_id}", response_model=RequestProfile)
+def get_profile(profile_id: int, current_user: User = Depends(get_current_admin_user)):
+    profile = request_log.profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
@@ -7,6 +7,7 @@ from ....core.security import verify_password, get_password_hash, create_access_
 from ....core.config import settings
 from ....models.user import User, UserRole
 from ....schemas.user import UserCreate, UserLogin, Token, UserResponse
+from ....services.listing_service import ListingService
 
 router = APIRouter()
 
@@ -43,6 +44,7 @@ def signup(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Username or email already registered"
         )
     db.refresh(new_user)
+    ListingService.invalidate_totals()
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     # JWT 'sub' must be a string per spec; cast id to str to avoid decode errors
@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timedelta
+from sqlalchemy.exc import IntegrityError
+from ....core.database import get_async_db
+from ....core.security import verify_password, get_password_hash, create_access_token
+from ....core.config import settings
+from ....models.user import User, UserRole
+from ....schemas.user import UserCreate, UserLogin, Token, UserResponse
+from ....services.listing_service import ListingService
+
+router = APIRouter()
+
+
+def _token_for(user: User) -> Token:
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    # JWT 'sub' must be a string per spec; cast id to str to avoid decode errors
+    access_token = create_access_token(
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
+    )
+    return Token(
+        access_token=access_token,
+        token_type="bearer",
+        user=UserResponse.model_validate(user)
+    )
+
+
+@router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
+async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = (await db.execute(
+        select(User).where(
+            (User.email == user_data.email) | (User.username == user_data.username)
+        )
+    )).scalars().first()
+    
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Username or email already registered"
+        )
+    
+    # bcrypt is deliberately slow; hashing on the event loop would stall every request
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
+    
+    new_user = User(
+        username=user_data.username,
+        email=user_data.email,
+        password_hash=hashed_password,
+        role=UserRole.MEMBER
+    )
+    
+    db.add(new_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        # Handle race conditions on unique constraints
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Username or email already registered"
+        )
+    await db.refresh(new_user)
+    ListingService.invalidate_totals()
+    
+    return _token_for(new_user)
+
+
+@router.post("/login", response_model=Token)
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(
+        select(User).where(User.email == user_data.email)
+    )).scalars().first()
+    
+    if not user or not await run_in_threadpool(
+        verify_password, user_data.password, user.password_hash
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+    
+    return _token_for(user)
@@ -7,12 +7,46 @@ from ....core.database import get_db
 from ....core.deps import get_current_user
 from ....models.user import User, UserRole
 from ....models.file import File
-from ....schemas.data import RowsResponse, AggregateRequest, AggregateResponse, ColumnInfo
+from ....schemas.data import (
+    RowsResponse, AggregateRequest, AggregateResponse, ColumnInfo, StatsResponse, SavedViewCreate, SavedViewResponse
+)
+from ....core.serialization import (
+    frame_response, arrow_response, ndjson_stream, sse_stream, NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE
+)
 from ....services.data_service import DataService
+from ....services.file_service import FileService
+from ....services.view_service import ViewService
 
 router = APIRouter()
 
 
+def parse_filters(filters: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode the ``filters`` query parameter; malformed JSON means no filters."""
+    if not filters:
+        return None
+    try:
+        return json.loads(filters)
+    except ValueError:
+        return None
+
+
+def check_view_params(view: Optional[int], search: Optional[str], filters: Optional[str], sort_by: Optional[str]) -> None:
+    """A view's rows come from its own search, filters and sort."""
+    if view is not None and (search or filters or sort_by):
+        raise HTTPException(status_code=400, detail="search, filters and sort_by can't be combined with a view")
+
+
+def _get_accessible_file(file_id: int, current_user: User, db: Session) -> File:
+    db_file = db.query(File).filter(File.id == file_id).first()
+    if not db_file:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if current_user.role != UserRole.ADMIN and db_file.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this file")
+
+    return db_file
+
+
 @router.get("/{file_id}/rows", response_model=RowsResponse)
 def get_rows(
     file_id: int,
@@ -22,35 +56,32 @@ def get_rows(
     sort_dir: str = Query("asc", regex="^(asc|desc)$"),
     search: Optional[str] = None,
     filters: Optional[str] = None,
+    layout: str = Query("records", regex="^(records|columnar|arrow)$"),
+    view: Optional[int] = Query(None, description="Id of a saved view of the file to page through"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    db_file = db.query(File).filter(File.id == file_id).first()
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
+    db_file = _get_accessible_file(file_id, current_user, db)
     
-    if current_user.role != UserRole.ADMIN and db_file.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this file")
-    
-    filters_dict = None
-    if filters:
-        try:
-            filters_dict = json.loads(filters)
-        except:
-            pass
+    check_view_params(view, search, filters, sort_by)
+    if view is not None:
+        result = ViewService.get_rows(db, db_file, view, page=page, page_size=page_size)
+    else:
+        result = DataService.get_rows(
+            file_id=file_id,
+            db=db,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+            search=search,
+            filters=parse_filters(filters)
+        )
     
-    result = DataService.get_rows(
-        file_id=file_id,
-        db=db,
-        page=page,
-        page_size=page_size,
-        sort_by=sort_by,
-        sort_dir=sort_dir,
-        search=search,
-        filters=filters_dict
-    )
-    
-    return RowsResponse(**result)
+    meta = {"total": result["total"], "page": result["page"], "page_size": result["page_size"]}
+    if layout == "arrow":
+        return arrow_response(result["rows"], **meta)
+    return frame_response(result["rows"], "rows", layout=layout, **meta)
 
 
 @router.post("/{file_id}/aggregate", response_model=AggregateResponse)
@@ -60,12 +91,7 @@ def aggregate_data(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    db_file = db.query(File).filter(File.id == file_id).first()
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    if current_user.role != UserRole.ADMIN and db_file.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this file")
+    db_file = _get_accessible_file(file_id, current_user, db)
     
     metrics = [{"col": m.col, "agg": m.agg} for m in request.metrics]
     
@@ -78,7 +104,7 @@ def aggregate_data(
         db=db
     )
     
-    return AggregateResponse(data=result)
+    return frame_response(result, "data")
 
 
 @router.get("/{file_id}/columns", response_model=List[ColumnInfo])
@@ -87,18 +113,30 @@ def get_columns(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    db_file = db.query(File).filter(File.id == file_id).first()
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    if current_user.role != UserRole.ADMIN and db_file.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this file")
+    db_file = _get_accessible_file(file_id, current_user, db)
     
+    if not DataService.has_profiles(db, db_file):
+        FileService.refresh_profiles(db, db_file)
+
     columns = DataService.get_columns(file_id, db)
     
     return [ColumnInfo(**col) for col in columns]
 
 
+@router.get("/{file_id}/stats", response_model=StatsResponse)
+def get_stats(
+    file_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    db_file = _get_accessible_file(file_id, current_user, db)
+
+    if "stats" not in (db_file.columns_json or {}):
+        db_file = FileService.refresh_stats(db, db_file)
+
+    return DataService.get_stats(db_file)
+
+
 @router.get("/{file_id}/export")
 def export_csv(
     file_id: int,
@@ -108,19 +146,7 @@ def export_csv(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    db_file = db.query(File).filter(File.id == file_id).first()
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
-
-    if current_user.role != UserRole.ADMIN and db_file.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to access this file")
-
-    filters_dict = None
-    if filters:
-        try:
-            filters_dict = json.loads(filters)
-        except:
-            pass
+    db_file = _get_accessible_file(file_id, current_user, db)
 
     columns_list = None
     if columns:
@@ -130,7 +156,7 @@ def export_csv(
         file_id=file_id,
         db=db,
         search=search,
-        filters=filters_dict,
+        filters=parse_filters(filters),
         columns=columns_list
     )
 
@@ -141,3 +167,65 @@ def export_csv(
             "Content-Disposition": f"attachment; filename=export_{file_id}.csv"
         }
     )
+
+
+@router.get("/{file_id}/stream")
+def stream_rows(
+    file_id: int,
+    search: Optional[str] = None,
+    filters: Optional[str] = None,
+    format: str = Query("ndjson", regex="^(ndjson|sse)$"),
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    db_file = _get_accessible_file(file_id, current_user, db)
+
+    chunks = DataService.stream_rows(db_file, db, search=search, filters=parse_filters(filters), limit=limit)
+    if format == "sse":
+        return StreamingResponse(sse_stream(chunks), media_type=SSE_MEDIA_TYPE, headers={"Cache-Control": "no-cache"})
+    return StreamingResponse(ndjson_stream(chunks), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post("/{file_id}/views", response_model=SavedViewResponse, status_code=201)
+def create_view(
+    file_id: int,
+    request: SavedViewCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    db_file = _get_accessible_file(file_id, current_user, db)
+    view = ViewService.create_view(
+        db,
+        db_file,
+        current_user.id,
+        request.name,
+        search=request.search,
+        filters=request.filters,
+        sort_by=request.sort_by,
+        sort_dir=request.sort_dir,
+        columns=request.columns
+    )
+    return ViewService.describe(view)
+
+
+@router.get("/{file_id}/views", response_model=List[SavedViewResponse])
+def list_views(
+    file_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    _get_accessible_file(file_id, current_user, db)
+    return [ViewService.describe(view) for view in ViewService.list_views(db, file_id)]
+
+
+@router.delete("/{file_id}/views/{view_id}")
+def delete_view(
+    file_id: int,
+    view_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    _get_accessible_file(file_id, current_user, db)
+    ViewService.delete_view(db, file_id, view_id)
+    return {"message": "View deleted successfully"}
@@ -0,0 +1,149 @@
+from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List
+from ....core.database import get_async_db
+from ....core.deps import get_current_user_async
+from ....models.user import User, UserRole
+from ....models.file import File
+from ....schemas.data import RowsResponse, AggregateRequest, AggregateResponse, ColumnInfo, StatsResponse
+from ....core.serialization import frame_response, arrow_response
+from ....services.data_service import DataService
+from ....services.file_service import FileService
+from ....services.view_service import ViewService
+from .data import parse_filters, check_view_params
+
+router = APIRouter()
+
+
+async def _get_accessible_file(file_id: int, current_user: User, db: AsyncSession) -> File:
+    db_file = await db.get(File, file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    if current_user.role != UserRole.ADMIN and db_file.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this file")
+    
+    return db_file
+
+
+@router.get("/{file_id}/rows", response_model=RowsResponse)
+async def get_rows(
+    file_id: int,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    sort_by: Optional[str] = None,
+    sort_dir: str = Query("asc", regex="^(asc|desc)$"),
+    search: Optional[str] = None,
+    filters: Optional[str] = None,
+    layout: str = Query("records", regex="^(records|columnar|arrow)$"),
+    view: Optional[int] = Query(None, description="Id of a saved view of the file to page through"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_file = await _get_accessible_file(file_id, current_user, db)
+    
+    check_view_params(view, search, filters, sort_by)
+    if view is not None:
+        result = await ViewService.get_rows_async(db, db_file, view, page=page, page_size=page_size)
+    else:
+        result = await DataService.get_rows_async(
+            file_id=file_id,
+            db=db,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+            search=search,
+            filters=parse_filters(filters)
+        )
+    
+    meta = {"total": result["total"], "page": result["page"], "page_size": result["page_size"]}
+    if layout == "arrow":
+        return arrow_response(result["rows"], **meta)
+    return frame_response(result["rows"], "rows", layout=layout, **meta)
+
+
+@router.post("/{file_id}/aggregate", response_model=AggregateResponse)
+async def aggregate_data(
+    file_id: int,
+    request: AggregateRequest,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    await _get_accessible_file(file_id, current_user, db)
+    
+    metrics = [{"col": m.col, "agg": m.agg} for m in request.metrics]
+    
+    result = await DataService.aggregate_data_async(
+        file_id=file_id,
+        group_by=request.group_by or [],
+        metrics=metrics,
+        filters=request.filters,
+        search=request.search,
+        db=db
+    )
+    
+    return frame_response(result, "data")
+
+
+@router.get("/{file_id}/columns", response_model=List[ColumnInfo])
+async def get_columns(
+    file_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_file = await _get_accessible_file(file_id, current_user, db)
+
+    if not await db.run_sync(DataService.has_profiles, db_file):
+        await db.run_sync(FileService.refresh_profiles, db_file)
+    
+    columns = await DataService.get_columns_async(file_id, db)
+    
+    return [ColumnInfo(**col) for col in columns]
+
+
+@router.get("/{file_id}/stats", response_model=StatsResponse)
+async def get_stats(
+    file_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_file = await _get_accessible_file(file_id, current_user, db)
+
+    if "stats" not in (db_file.columns_json or {}):
+        db_file = await db.run_sync(FileService.refresh_stats, db_file)
+
+    return DataService.get_stats(db_file)
+
+
+@router.get("/{file_id}/export")
+async def export_csv(
+    file_id: int,
+    search: Optional[str] = None,
+    filters: Optional[str] = None,
+    columns: Optional[str] = Query(None, description="Comma-separated columns to include"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    await _get_accessible_file(file_id, current_user, db)
+
+    columns_list = None
+    if columns:
+        columns_list = [c.strip() for c in columns.split(',') if c.strip()]
+
+    csv_text = await DataService.export_csv_async(
+        file_id=file_id,
+        db=db,
+        search=search,
+        filters=parse_filters(filters),
+        columns=columns_list
+    )
+
+    return StreamingResponse(
+        iter([csv_text]),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f"attachment; filename=export_{file_id}.csv"
+        }
+    )
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from ....core.database import get_db
 from ....core.deps import get_current_user
 from ....models.user import User, UserRole
 from ....models.file import File as FileModel
-from ....schemas.file import FileUploadResponse, FileResponse, FileListResponse
+from ....schemas.file import FileUploadResponse, FileAppendResponse, FileResponse, FileListResponse
 from ....services.file_service import FileService
+from ....services.listing_service import ListingService
 
 router = APIRouter()
 
@@ -14,10 +15,11 @@ router = APIRouter()
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_file(
     file: UploadFile = File(...),
+    sheet: Optional[str] = Form(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    db_file = await FileService.save_uploaded_file(file, current_user.id, db)
+    db_file = await FileService.save_uploaded_file(file, current_user.id, db, sheet)
     
     return FileUploadResponse(
         id=db_file.id,
@@ -28,26 +30,46 @@ async def upload_file(
     )
 
 
+@router.post("/{file_id}/append", response_model=FileAppendResponse)
+async def append_to_file(
+    file_id: int,
+    file: UploadFile = File(...),
+    sheet: Optional[str] = Form(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    is_admin = current_user.role == UserRole.ADMIN
+    db_file, appended = await FileService.append_uploaded_file(
+        file_id, file, current_user.id, is_admin, db, sheet
+    )
+    
+    return FileAppendResponse(
+        id=db_file.id,
+        filename=db_file.filename,
+        row_count=db_file.row_count,
+        appended_rows=appended,
+        columns=db_file.columns_json.get('columns', []),
+        message="Rows appended successfully"
+    )
+
+
 @router.get("", response_model=FileListResponse)
 def get_files(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; takes precedence over page"),
+    prefix: Optional[str] = Query(None, description="Only files whose name starts with this (case-insensitive)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    query = db.query(FileModel)
-    
     # Only admins can see all files; members see their own
-    if current_user.role != UserRole.ADMIN:
-        query = query.filter(FileModel.user_id == current_user.id)
-    
-    total = query.count()
-    
-    files = query.offset((page - 1) * page_size).limit(page_size).all()
+    user_id = None if current_user.role == UserRole.ADMIN else current_user.id
+    result = ListingService.list_files(db, user_id, page=page, page_size=page_size, cursor=cursor, prefix=prefix)
     
     return FileListResponse(
-        total=total,
-        files=[FileResponse.model_validate(f) for f in files]
+        total=result["total"],
+        files=[FileResponse.model_validate(f) for f in result["files"]],
+        next_cursor=result["next_cursor"]
     )
 
 
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from ....core.database import get_async_db
+from ....core.deps import get_current_user_async
+from ....models.user import User, UserRole
+from ....models.file import File as FileModel
+from ....schemas.file import FileUploadResponse, FileResponse, FileListResponse
+from ....services.file_service import FileService
+from ....services.listing_service import ListingService
+
+router = APIRouter()
+
+
+@router.post("/upload", response_model=FileUploadResponse)
+async def upload_file(
+    file: UploadFile = File(...),
+    sheet: Optional[str] = Form(None),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_file = await FileService.save_uploaded_file_async(file, current_user.id, db, sheet)
+    
+    return FileUploadResponse(
+        id=db_file.id,
+        filename=db_file.filename,
+        row_count=db_file.row_count,
+        columns=db_file.columns_json.get('columns', []),
+        message="File uploaded and parsed successfully"
+    )
+
+
+@router.get("", response_model=FileListResponse)
+async def get_files(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; takes precedence over page"),
+    prefix: Optional[str] = Query(None, description="Only files whose name starts with this (case-insensitive)"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Only admins can see all files; members see their own
+    user_id = None if current_user.role == UserRole.ADMIN else current_user.id
+    result = await ListingService.list_files_async(
+        db, user_id, page=page, page_size=page_size, cursor=cursor, prefix=prefix
+    )
+    
+    return FileListResponse(
+        total=result["total"],
+        files=[FileResponse.model_validate(f) for f in result["files"]],
+        next_cursor=result["next_cursor"]
+    )
+
+
+@router.get("/{file_id}", response_model=FileResponse)
+async def get_file(
+    file_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_file = await db.get(FileModel, file_id)
+    
+    if not db_file:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    if current_user.role != UserRole.ADMIN and db_file.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this file")
+    
+    return FileResponse.model_validate(db_file)
+
+
+@router.delete("/{file_id}")
+async def delete_file(
+    file_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    is_admin = current_user.role == UserRole.ADMIN
+    await FileService.delete_file_async(file_id, current_user.id, is_admin, db)
+    
+    return {"message": "File deleted successfully"}
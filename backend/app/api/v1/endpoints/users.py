@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 from ....core.database import get_db
 from ....core.deps import get_current_user, get_current_admin_user
 from ....models.user import User
-from ....schemas.user import UserResponse
+from ....schemas.user import UserResponse, UserListResponse
+from ....services.listing_service import ListingService
 
 router = APIRouter()
 
@@ -14,10 +15,17 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
     return UserResponse.model_validate(current_user)
 
 
-@router.get("", response_model=List[UserResponse])
+@router.get("", response_model=UserListResponse)
 def get_users(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; takes precedence over page"),
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    users = db.query(User).all()
-    return [UserResponse.model_validate(user) for user in users]
+    result = ListingService.list_users(db, page=page, page_size=page_size, cursor=cursor)
+    return UserListResponse(
+        total=result["total"],
+        users=[UserResponse.model_validate(user) for user in result["users"]],
+        next_cursor=result["next_cursor"]
+    )
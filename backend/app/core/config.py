@@ -18,6 +18,13 @@ class Settings(BaseSettings):
 
     # Use a stable absolute path for SQLite by default so CLI tools and server share the same DB regardless of CWD
     DATABASE_URL: str = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+    # Serve auth/files/data endpoints through an async engine (aiosqlite/asyncpg)
+    ASYNC_DB: bool = os.getenv("ASYNC_DB", "false").lower() == "true"
+    # Optional explicit async URL; derived from DATABASE_URL when empty
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    # Connection pool sizing shared by the sync and async engines
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
     # Use environment variable for secrets; fallback is for local dev only
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "change-me")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
@@ -28,6 +35,49 @@ class Settings(BaseSettings):
     # Optional extra CORS origins (comma-separated)
     CORS_EXTRA_ORIGINS: str = os.getenv("CORS_EXTRA_ORIGINS", "")
 
+    # Uploads are streamed to disk and rejected once they exceed this size (0 = unlimited)
+    MAX_UPLOAD_SIZE_MB: int = int(os.getenv("MAX_UPLOAD_SIZE_MB", "100"))
+    # Reject CSV uploads with more physical lines than this before parsing (0 = unlimited)
+    MAX_UPLOAD_ROWS: int = int(os.getenv("MAX_UPLOAD_ROWS", "0"))
+    # Uploads are parsed and inserted in batches of this many rows (CSV and Excel alike)
+    INGEST_CHUNK_ROWS: int = int(os.getenv("INGEST_CHUNK_ROWS", "50000"))
+    # Parsed files (with their filter indexes) kept in memory for queries (0 disables)
+    DATASET_CACHE_SIZE: int = int(os.getenv("DATASET_CACHE_SIZE", "8"))
+    # Also keep parsed files as memory-mapped Arrow files in UPLOAD_DIR/datasets,
+    # shared by all worker processes through the OS page cache
+    ARROW_CACHE: bool = os.getenv("ARROW_CACHE", "true").lower() == "true"
+    # Engine running row, aggregate and export queries: "pandas" or "duckdb" (needs duckdb;
+    # falls back to pandas for queries it can't run)
+    QUERY_ENGINE: str = os.getenv("QUERY_ENGINE", "pandas").lower()
+    # Threads filtering and aggregating row partitions of large datasets in parallel
+    # (1 = serial); lower it when running several worker processes per host
+    QUERY_WORKERS: int = int(os.getenv("QUERY_WORKERS", str(os.cpu_count() or 1)))
+    # Files preloaded into the dataset cache in the background at startup and after
+    # uploads (0 disables); "recent" ranks files by last access, "frequent" by access count
+    WARMUP_FILES: int = int(os.getenv("WARMUP_FILES", "4"))
+    WARMUP_ORDER: str = os.getenv("WARMUP_ORDER", "recent").lower()
+    # A warm-up stops loading files once they take this much memory or time
+    WARMUP_MEMORY_MB: int = int(os.getenv("WARMUP_MEMORY_MB", "1024"))
+    WARMUP_SECONDS: int = int(os.getenv("WARMUP_SECONDS", "120"))
+    # Seconds a file/user listing total is reused before it is counted again
+    LIST_TOTAL_TTL_SECONDS: int = int(os.getenv("LIST_TOTAL_TTL_SECONDS", "30"))
+    # Request/stage timings at /metrics (Prometheus text format) and in Server-Timing headers
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # /metrics is only served to these client addresses (IPs or CIDR networks,
+    # comma-separated) or to requests bearing METRICS_TOKEN; both empty = nobody
+    METRICS_ALLOWED_IPS: str = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1")
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    # Requests taking at least this long are kept in the slow-query log (0 disables)
+    SLOW_REQUEST_MS: int = int(os.getenv("SLOW_REQUEST_MS", "1000"))
+    # Share of requests profiled up front; profiles of those that turn out slow are kept
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    # Request profiles kept for /admin/profiles
+    PROFILE_HISTORY: int = int(os.getenv("PROFILE_HISTORY", "20"))
+    # Response compression: "gzip", "brotli" (needs brotli-asgi; falls back to gzip) or "none"
+    RESPONSE_COMPRESSION: str = os.getenv("RESPONSE_COMPRESSION", "gzip").lower()
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
     # Optional bootstrap admin on startup if no admin exists
     ADMIN_EMAIL: str = os.getenv("ADMIN_EMAIL", "")
     ADMIN_PASSWORD: str = os.getenv("ADMIN_PASSWORD", "")
@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
@@ -8,15 +12,129 @@ if settings.DATABASE_URL.startswith("sqlite"):
     # Needed for SQLite when used with FastAPI TestClient / threaded servers
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+
+def pool_args(url: str) -> dict:
+    """Pool sizing for ``url``; SQLite in-memory databases use a pool class
+    that takes no size arguments, and aiosqlite's default NullPool would
+    reconnect on every request, so file databases get a queue pool."""
+    parsed = make_url(url)
+    sizing = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+    if issubclass(parsed.get_dialect().get_pool_class(parsed), QueuePool):
+        return sizing
+    if parsed.drivername == "sqlite+aiosqlite" and parsed.database not in (None, "", ":memory:"):
+        return {"poolclass": AsyncAdaptedQueuePool, **sizing}
+    return {}
+
+
+engine = create_engine(settings.DATABASE_URL, connect_args=connect_args, **pool_args(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+def sync_schema(bind=None):
+    """``create_all`` plus ``ADD COLUMN``/``CREATE INDEX`` for columns and
+    indexes added to tables that already exist (there is no Alembic here).
+    New columns must be nullable or carry a ``server_default``.
+    """
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=bind.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                conn.execute(text(ddl))
+            # Not reflected: SQLite can't reflect expression indexes
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# Sync engines for the databases of async engines, by URL (see sync_sessionmaker)
+_sync_engines = {}
+
+
+def sync_sessionmaker(bind) -> sessionmaker:
+    """Sessions on the database of ``bind`` for work outside the request,
+    e.g. background threads. The ``sync_engine`` of an async engine still
+    drives its async DBAPI, which only works inside ``greenlet_spawn``, so
+    the same URL is opened with the dialect's default sync driver instead
+    (without pooling: these sessions are occasional)."""
+    if not bind.dialect.is_async:
+        return sessionmaker(autocommit=False, autoflush=False, bind=bind)
+    url = bind.url.set(drivername=bind.url.get_backend_name())
+    if url == engine.url:
+        return SessionLocal
+    sync_engine = _sync_engines.get(url)
+    if sync_engine is None:
+        sync_args = {"check_same_thread": False} if url.get_backend_name() == "sqlite" else {}
+        sync_engine = _sync_engines.setdefault(url, create_engine(url, connect_args=sync_args, poolclass=NullPool))
+    return sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
+
+# Async drivers used when ASYNC_DB is enabled and no ASYNC_DATABASE_URL is given
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    scheme, sep, rest = settings.DATABASE_URL.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme.split("+", 1)[0])
+    if not sep or driver is None:
+        raise RuntimeError(
+            f"No async driver known for '{scheme}'. Set ASYNC_DATABASE_URL explicitly."
+        )
+    return f"{driver}://{rest}"
+
+
+def get_async_engine():
+    """Create the async engine on first use so the optional driver
+    (aiosqlite/asyncpg) is only required when async endpoints are served.
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        url = get_async_database_url()
+        _async_engine = create_async_engine(url, **pool_args(url))
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+def AsyncSessionLocal():
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
@@ -1,27 +1,27 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from .database import get_db
+from .database import get_db, get_async_db
 from .security import decode_access_token
+from .request_context import note_user
 from ..models.user import User, UserRole
 
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def _user_id_from_credentials(credentials: HTTPAuthorizationCredentials) -> int:
     token = credentials.credentials
     payload = decode_access_token(token)
-    
+
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
-    
+
     user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(
@@ -30,23 +30,33 @@ def get_current_user(
         )
 
     try:
-        user_id = int(user_id)
+        return int(user_id)
     except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+
+def _ensure_user(user: Optional[User]) -> User:
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
-    
+    note_user(user.id, user.role == UserRole.ADMIN)
     return user
 
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    user_id = _user_id_from_credentials(credentials)
+    user = db.query(User).filter(User.id == user_id).first()
+    return _ensure_user(user)
+
+
 def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -54,3 +64,18 @@ def get_current_admin_user(current_user: User = Depends(get_current_user)) -> Us
             detail="Not enough permissions"
         )
     return current_user
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    user_id = _user_id_from_credentials(credentials)
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    return _ensure_user(user)
+
+
+async def get_current_admin_user_async(
+    current_user: User = Depends(get_current_user_async)
+) -> User:
+    return get_current_admin_user(current_user)
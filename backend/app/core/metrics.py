@@ -0,0 +1,183 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Sequence, Tuple
+from . import request_context
+
+# Upper bounds (seconds) of latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        name = f"{name}{{{label_text}}}"
+    return f"{name} {value:.17g}"
+
+
+class Metric:
+    """A named metric with one value per combination of label values.
+
+    Metrics live in the process they are recorded in; with several workers
+    each one is scraped separately.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield _format(self.name, dict(zip(self.labels, key)), value)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket counts, then the sum and count of all observations
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            labels = dict(zip(self.labels, key))
+            for bound, bucket_count in zip(self.buckets, state):
+                yield _format(f"{self.name}_bucket", {**labels, "le": f"{bound:g}"}, bucket_count)
+            yield _format(f"{self.name}_bucket", {**labels, "le": "+Inf"}, state[-1])
+            yield _format(f"{self.name}_sum", labels, state[-2])
+            yield _format(f"{self.name}_count", labels, state[-1])
+
+
+REGISTRY: List[Metric] = []
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route", "status")
+)
+STAGE_LATENCY = Histogram(
+    "stage_duration_seconds", "Time spent in each stage of data queries and file ingest.", ("service", "stage")
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result (hit or miss).", ("cache", "result"))
+CACHE_HIT_RATIO = Gauge("cache_hit_ratio", "Share of cache lookups that were hits.", ("cache",))
+COALESCED_REQUESTS = Counter(
+    "coalesced_requests_total", "Requests that waited for an identical in-flight load or query.", ("operation",)
+)
+WARMUP_DATASETS = Counter(
+    "warmup_datasets_total", "Files considered by cache warm-up, by result (loaded, cached, skipped, failed).", ("result",)
+)
+INGEST_ROWS = Counter("ingest_rows_total", "Rows ingested by uploads and appends.")
+INGEST_SECONDS = Counter("ingest_seconds_total", "Time spent ingesting rows (parsing through inserting).")
+INGEST_RATE = Gauge("ingest_rows_per_second", "Rows per second of the most recent ingest.")
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_ingest(rows: int, seconds: float) -> None:
+    INGEST_ROWS.inc(rows)
+    INGEST_SECONDS.inc(seconds)
+    if seconds > 0:
+        INGEST_RATE.set(rows / seconds)
+
+
+@contextmanager
+def timed(service: str, name: str) -> Iterator[None]:
+    """Time the enclosed block as stage ``name`` of ``service``; it is also
+    added to the current request's stage timings (and profile, if any)."""
+    context = request_context.current()
+    profile = context.profiler() if context is not None else None
+    start = time.perf_counter()
+    try:
+        with profile.running() if profile is not None else nullcontext():
+            yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.observe(elapsed, service=service, stage=name)
+        if context is not None:
+            context.stages[name] = context.stages.get(name, 0.0) + elapsed
+
+
+def server_timing(total: float) -> str:
+    """Server-Timing header value: time per stage so far plus the total, in ms."""
+    context = request_context.current()
+    timings = dict(context.stages if context is not None else {})
+    timings["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    caches = {key[0] for key in CACHE_REQUESTS._values}
+    for cache in caches:
+        hits = CACHE_REQUESTS.value(cache=cache, result="hit")
+        total = hits + CACHE_REQUESTS.value(cache=cache, result="miss")
+        CACHE_HIT_RATIO.set(hits / total if total else 0.0, cache=cache)
+    lines = [line for metric in REGISTRY for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    for metric in REGISTRY:
+        metric.clear()
@@ -0,0 +1,127 @@
+import random
+import time
+from typing import List
+from urllib.parse import parse_qsl
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from . import metrics, request_context
+from .config import settings
+from .profiling import request_log
+from .request_context import RequestContext
+
+# Allowance for multipart boundaries and part headers around the file body
+MULTIPART_OVERHEAD = 64 * 1024
+# Streamed responses whose chunks must reach the client as they are sent
+UNCOMPRESSED_MEDIA_TYPES = ("application/x-ndjson", "text/event-stream")
+
+
+class UploadSizeLimitMiddleware:
+    """Reject request bodies whose declared Content-Length exceeds
+    MAX_UPLOAD_SIZE_MB before any of the body is received. Chunked requests
+    without a length are still capped while streaming to disk."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        if scope["type"] == "http" and max_bytes:
+            content_length = dict(scope["headers"]).get(b"content-length")
+            if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD:
+                response = JSONResponse(
+                    {"detail": f"File exceeds the maximum upload size of {settings.MAX_UPLOAD_SIZE_MB} MB"},
+                    status_code=413,
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class UncompressedStreamsMiddleware:
+    """Keep streamed responses (NDJSON, Server-Sent Events) out of response
+    compression. Compressors hold small writes back until enough output
+    accumulates, so the first rows and every event would wait for later
+    ones. Responses already carrying a Content-Encoding pass through the
+    GZip/Brotli middleware untouched, so these are marked ``identity``;
+    this middleware must sit inside the compression middleware."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_marked(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                media_type = headers.get("content-type", "").split(";", 1)[0].strip()
+                if media_type in UNCOMPRESSED_MEDIA_TYPES and "content-encoding" not in headers:
+                    headers["Content-Encoding"] = "identity"
+            await send(message)
+
+        await self.app(scope, receive, send_marked)
+
+
+class MetricsMiddleware:
+    """Time every request: latency per route template (``/data/{file_id}/rows``,
+    not the raw path) and the stage timings recorded while serving it, sent
+    as a ``Server-Timing`` header. Slow requests go to the slow-query log,
+    with a profile if an admin asked for one (``X-Profile: 1``) or the
+    request was sampled (PROFILE_SAMPLE_RATE)."""
+
+    def __init__(self, app: ASGIApp, routes: List[BaseRoute]):
+        self.app = app
+        self.routes = routes
+
+    def _route(self, scope: Scope) -> str:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "unmatched")
+        return "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        context = RequestContext(
+            profile_requested=dict(scope["headers"]).get(b"x-profile", b"").lower() in (b"1", b"true"),
+            sampled=random.random() < settings.PROFILE_SAMPLE_RATE,
+        )
+        token = request_context.start(context)
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                if settings.METRICS_ENABLED:
+                    headers.append("Server-Timing", metrics.server_timing(time.perf_counter() - start))
+                if context.profile_requested and context.profile is not None:
+                    context.profile_id = request_log.next_profile_id()
+                    headers.append("X-Profile-Id", str(context.profile_id))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_context.end(token)
+            duration = time.perf_counter() - start
+            route = self._route(scope)
+            if settings.METRICS_ENABLED:
+                metrics.REQUEST_LATENCY.observe(duration, method=scope["method"], route=route, status=str(status))
+            request_log.record(context, {
+                "method": scope["method"],
+                "route": route,
+                "path": scope["path"],
+                "status": status,
+                "file_id": scope.get("path_params", {}).get("file_id"),
+                "params": dict(parse_qsl(scope["query_string"].decode("latin-1"))),
+            }, duration)
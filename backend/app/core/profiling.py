@@ -0,0 +1,128 @@
+import cProfile
+import itertools
+import json
+import logging
+import pstats
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from .config import settings
+
+# Functions kept per profile, by cumulative time
+PROFILE_TOP_FUNCTIONS = 30
+# Slow requests kept for /admin/slow-queries
+SLOW_LOG_SIZE = 200
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfile:
+    """cProfile of the timed stages of one request.
+
+    Stages may run on different threads (sync endpoints run in the
+    threadpool), so there is one profiler per thread, enabled while any
+    stage is running on it.
+    """
+
+    def __init__(self):
+        self._profilers: Dict[int, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        with self._lock:
+            entry = self._profilers.setdefault(threading.get_ident(), [cProfile.Profile(), 0])
+            entry[1] += 1
+            first = entry[1] == 1
+        if first:
+            try:
+                entry[0].enable()
+            except ValueError:
+                pass  # another profiler is active on this thread
+        try:
+            yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                last = entry[1] == 0
+            if last:
+                entry[0].disable()
+
+    def summary(self, limit: int = PROFILE_TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+        """The ``limit`` functions with the highest cumulative time."""
+        stats = pstats.Stats()
+        with self._lock:
+            for profiler, _ in self._profilers.values():
+                try:
+                    stats.add(profiler)
+                except TypeError:
+                    pass  # nothing was recorded on that thread
+        top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [
+            {
+                "function": pstats.func_std_string(func),
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+            for func, (_, calls, total, cumulative, _) in top
+        ]
+
+
+class RequestLog:
+    """Slow requests and request profiles of this process, most recent last."""
+
+    def __init__(self):
+        self.slow: deque = deque(maxlen=SLOW_LOG_SIZE)
+        self.profiles: deque = deque(maxlen=max(settings.PROFILE_HISTORY, 1))
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_profile_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def record(self, context, request: Dict[str, Any], duration: float) -> None:
+        """Log ``request`` if it took at least SLOW_REQUEST_MS and keep its
+        profile if one was asked for, or if it was sampled and slow."""
+        duration_ms = round(duration * 1000, 3)
+        slow = bool(settings.SLOW_REQUEST_MS) and duration_ms >= settings.SLOW_REQUEST_MS
+        entry = {
+            "timestamp": datetime.now(timezone.utc),
+            **request,
+            "duration_ms": duration_ms,
+            "user_id": context.user_id,
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in context.stages.items()},
+            "details": dict(context.details),
+            "profile_id": None,
+        }
+        if context.profile is not None and (context.profile_id is not None or slow):
+            entry["profile_id"] = context.profile_id or self.next_profile_id()
+            with self._lock:
+                self.profiles.append({**entry, "functions": context.profile.summary()})
+        if slow:
+            with self._lock:
+                self.slow.append(entry)
+            logger.warning("Slow request: %s", json.dumps(entry, default=str))
+
+    def slow_requests(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.slow)[::-1][:limit]
+
+    def profile_list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.profiles)[::-1]
+
+    def profile(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return next((p for p in self.profiles if p["profile_id"] == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.slow.clear()
+            self.profiles.clear()
+
+
+request_log = RequestLog()
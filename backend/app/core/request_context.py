@@ -0,0 +1,60 @@
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from .profiling import RequestProfile
+
+
+class RequestContext:
+    """What is known about the request being served.
+
+    Created by the request middleware and filled in by the auth dependency
+    (user), ``metrics.timed`` (stage timings, profiles) and the services
+    (row counts). Those may run on worker threads with a copy of the
+    context, so they update this object rather than setting variables.
+    """
+
+    def __init__(self, profile_requested: bool = False, sampled: bool = False):
+        self.stages: Dict[str, float] = {}
+        self.details: Dict[str, Any] = {}
+        self.user_id: Optional[int] = None
+        self.is_admin = False
+        self.profile_requested = profile_requested
+        self.sampled = sampled
+        self.profile: Optional[RequestProfile] = None
+        self.profile_id: Optional[int] = None
+
+    def profiler(self) -> Optional[RequestProfile]:
+        """The request's profile, started on first use if an admin asked for
+        one (``X-Profile`` header) or the request was sampled."""
+        if self.profile is None and (self.sampled or (self.profile_requested and self.is_admin)):
+            self.profile = RequestProfile()
+        return self.profile
+
+
+_current: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def current() -> Optional[RequestContext]:
+    return _current.get()
+
+
+def start(context: RequestContext):
+    """Make ``context`` current; returns the token to pass to ``end``."""
+    return _current.set(context)
+
+
+def end(token) -> None:
+    _current.reset(token)
+
+
+def note_user(user_id: int, is_admin: bool) -> None:
+    context = current()
+    if context is not None:
+        context.user_id = user_id
+        context.is_admin = is_admin
+
+
+def note(**details: Any) -> None:
+    """Attach ``details`` (e.g. row counts) to the request's slow-query log entry."""
+    context = current()
+    if context is not None:
+        context.details.update(details)
@@ -0,0 +1,157 @@
+import json
+import math
+from typing import Any, Dict, Iterator, List
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from fastapi.responses import Response
+from .metrics import timed
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+# pandas JSON encoder options shared by all JSON encodings of rows. The
+# encoder writes at most 15 decimal places (its maximum), which rounds
+# values like 0.1 + 0.2; see _rounded_float_columns
+JSON_OPTIONS = {"date_format": "iso", "double_precision": 15, "force_ascii": False}
+
+
+def _rounded_float_columns(df: pd.DataFrame) -> List[Any]:
+    """Float columns whose values pandas' encoder would not write exactly.
+    Magnitudes in [10, 1e15) are written with at least 17 significant
+    digits, which always round-trip; other values are checked by encoding
+    them and reading them back."""
+    floats = [col for col in df.columns if df[col].dtype.kind == "f"]
+    rounded = []
+    for col in floats:
+        values = df[col].to_numpy(dtype=np.float64)
+        magnitude = np.abs(values)
+        values = values[np.isfinite(values) & (magnitude > 0) & ((magnitude < 10) | (magnitude >= 1e15))]
+        if len(values) == 0:
+            continue
+        written = np.array(json.loads(pd.Series(values).to_json(orient="values", **JSON_OPTIONS)))
+        if not np.array_equal(written, values):
+            rounded.append(col)
+    return rounded
+
+
+def _exact_split(df: pd.DataFrame, rounded: List[Any]) -> Dict[str, Any]:
+    """``{"columns", "data"}`` of ``df`` as pandas encodes it, except that
+    the ``rounded`` columns hold the exact floats (the stdlib encoder writes
+    their shortest round-trip form)."""
+    split = json.loads(df.to_json(orient="split", index=False, **JSON_OPTIONS))
+    for col in rounded:
+        j = df.columns.get_loc(col)
+        for row, value in zip(split["data"], df[col].to_numpy(dtype=np.float64).tolist()):
+            row[j] = value if math.isfinite(value) else None
+    return split
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def frame_to_json(df: pd.DataFrame, layout: str = "records") -> str:
+    """Serialize a DataFrame as JSON in a single pass: an array of records,
+    or ``{"columns": [...], "data": [[...], ...]}`` for the columnar layout,
+    which sends each column name once instead of once per row.
+
+    pandas' native encoder writes NaN/NaT/inf as ``null`` and datetimes as
+    ISO 8601, so rows can skip ``to_dict`` + Pydantic validation + stdlib
+    encoding. Floats round-trip exactly: frames with floats it would round
+    take a slower pass through the stdlib encoder.
+    """
+    rounded = _rounded_float_columns(df)
+    if layout == "columnar":
+        if rounded:
+            return _dumps(_exact_split(df, rounded))
+        return df.to_json(orient="split", index=False, **JSON_OPTIONS)
+    if df.empty:
+        return "[]"
+    if rounded:
+        split = _exact_split(df, rounded)
+        return _dumps([dict(zip(split["columns"], row)) for row in split["data"]])
+    return df.to_json(orient="records", **JSON_OPTIONS)
+
+
+def frame_response(df: pd.DataFrame, key: str = "rows", layout: str = "records", **meta: Any) -> Response:
+    """JSON response of ``meta`` fields plus the DataFrame, either as records
+    under ``key`` or, for the columnar layout, as top-level ``columns``/``data``.
+
+    Endpoints returning this keep their ``response_model`` for the OpenAPI
+    schema; FastAPI passes Response objects through without re-validating.
+    """
+    with timed("data", "serialize"):
+        head = json.dumps(meta, separators=(",", ":"))[:-1]
+        sep = "," if meta else ""
+        if layout == "columnar":
+            # Splice the {"columns":..,"data":..} object into the envelope
+            body = f'{head}{sep}{frame_to_json(df, layout)[1:]}'
+        else:
+            body = f'{head}{sep}"{key}":{frame_to_json(df)}}}'
+        content = body.encode("utf-8")
+    return Response(content=content, media_type="application/json")
+
+
+def frame_to_arrow(df: pd.DataFrame, **meta: Any) -> bytes:
+    """Encode a DataFrame as an Arrow IPC stream with ``meta`` in the schema metadata."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(
+            status_code=400,
+            detail="Missing optional dependency 'pyarrow'. Please install it on the server to enable Arrow responses."
+        )
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns (e.g. numbers and text) have no Arrow type; send them as text
+        mixed = {
+            col: df[col].map(lambda v: None if v is None or v != v else str(v))
+            for col in df.columns if df[col].dtype == object
+        }
+        table = pa.Table.from_pandas(df.assign(**mixed), preserve_index=False)
+
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        **{key.encode(): str(value).encode() for key, value in meta.items()},
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_response(df: pd.DataFrame, **meta: Any) -> Response:
+    """Arrow IPC stream response; ``meta`` is mirrored in ``X-*`` headers."""
+    headers = {f"X-{key.replace('_', '-').title()}": str(value) for key, value in meta.items()}
+    with timed("data", "serialize"):
+        content = frame_to_arrow(df, **meta)
+    return Response(content=content, media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+
+
+def ndjson_stream(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """One JSON object per row and line, written chunk by chunk."""
+    for df in chunks:
+        with timed("data", "serialize"):
+            rounded = _rounded_float_columns(df)
+            if rounded:
+                split = _exact_split(df, rounded)
+                text = "".join(f"{_dumps(dict(zip(split['columns'], row)))}\n" for row in split["data"])
+            else:
+                text = df.to_json(orient="records", lines=True, **JSON_OPTIONS)
+            body = text.encode("utf-8")
+        yield body
+
+
+def sse_stream(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """Server-Sent Events: a ``rows`` event (JSON array) per chunk, then an
+    ``end`` event with the number of rows sent."""
+    total = 0
+    for df in chunks:
+        total += len(df)
+        with timed("data", "serialize"):
+            body = f"event: rows\ndata: {frame_to_json(df)}\n\n".encode("utf-8")
+        yield body
+    yield f"event: end\ndata: {json.dumps({'total': total})}\n\n".encode("utf-8")
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from . import request_context
+from .metrics import COALESCED_REQUESTS
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight computation.
+
+    The first caller of a key (the leader) runs it; callers arriving while
+    it runs wait for its result, or its exception, instead of repeating the
+    work. Threads (sync endpoints) and coroutines (async endpoints) share
+    the same flights. Nothing is kept once the computation finishes, so
+    results must be cached elsewhere to outlive it. If a leader is
+    cancelled, its waiters start the computation again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable):
+        """The key's in-flight future and whether this caller leads it."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def _coalesced(self) -> None:
+        COALESCED_REQUESTS.inc(operation=self.name)
+        request_context.note(coalesced=self.name)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            self._coalesced()
+            try:
+                return future.result()
+            except CancelledError:
+                continue  # the leader was cancelled; lead or join the next flight
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            self._coalesced()
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this request was cancelled, not the leader
+                continue
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+def flight_key(*parts: Any) -> Hashable:
+    """A hashable key of request parameters (dicts and lists included)."""
+    def freeze(value: Any) -> Hashable:
+        if isinstance(value, dict):
+            return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(freeze(v) for v in value)
+        return value
+    return freeze(parts)
@@ -1,14 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+import ipaddress
 import os
-from .core.database import engine, Base, SessionLocal
+import secrets
+from .core.database import engine, Base, SessionLocal, dispose_async_engine, sync_schema
 from .api.v1 import api_router
 from .models import User, File, Row
 from .models.user import User as UserModel, UserRole
 from .core.security import get_password_hash
 from .core.config import settings
+from .core.middleware import UploadSizeLimitMiddleware, UncompressedStreamsMiddleware, MetricsMiddleware
+from .core import metrics
+from .services.warmup_service import WarmupService
 
-Base.metadata.create_all(bind=engine)
+sync_schema(engine)
 
 app = FastAPI(
     title="Data Visualization Dashboard API",
@@ -48,6 +55,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Inside compression, so NDJSON/SSE streams skip it
+app.add_middleware(UncompressedStreamsMiddleware)
+
+# Response compression for large JSON/Arrow/CSV payloads
+if settings.RESPONSE_COMPRESSION == "brotli":
+    try:
+        from brotli_asgi import BrotliMiddleware
+        # Clients that do not accept br still get gzip
+        app.add_middleware(BrotliMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE, gzip_fallback=True)
+    except ImportError:
+        app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+elif settings.RESPONSE_COMPRESSION == "gzip":
+    app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Outermost, so request latency includes compression
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+
 app.include_router(api_router, prefix="/api/v1")
 
 
@@ -56,6 +82,33 @@ def health_check():
     return {"status": "healthy", "message": "API is running"}
 
 
+def metrics_access_allowed(request: Request) -> bool:
+    """Whether ``request`` bears ``METRICS_TOKEN`` or comes from an address in
+    ``METRICS_ALLOWED_IPS`` (behind a proxy, the proxy's address)."""
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+            return True
+    try:
+        address = ipaddress.ip_address(request.client.host if request.client else "")
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network.strip(), strict=False)
+        for network in settings.METRICS_ALLOWED_IPS.split(",") if network.strip()
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics(request: Request):
+    """Metrics of this worker process in the Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not metrics_access_allowed(request):
+        raise HTTPException(status_code=403, detail="Not authorized to read metrics")
+    return Response(content=metrics.render(), media_type=metrics.PROMETHEUS_MEDIA_TYPE)
+
+
 @app.get("/")
 def root():
     return {"message": "Data Visualization Dashboard API", "docs": "/docs"}
@@ -101,3 +154,15 @@ def bootstrap_admin():
     except Exception:
         # Startup should not crash the app; log in real deployments
         pass
+
+
+@app.on_event("startup")
+def warm_dataset_cache():
+    """Preload the most used files into the dataset cache in the background;
+    startup doesn't wait for it (see WarmupService)."""
+    WarmupService.schedule(SessionLocal)
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await dispose_async_engine()
@@ -1,5 +1,8 @@
 from .user import User
 from .file import File
 from .row import Row
+from .row_zone import RowZone
+from .column_profile import ColumnProfile
+from .saved_view import SavedView
 
-__all__ = ["User", "File", "Row"]
+__all__ = ["User", "File", "Row", "RowZone", "ColumnProfile", "SavedView"]
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON
+from sqlalchemy.orm import relationship
+from ..core.database import Base
+
+
+class ColumnProfile(Base):
+    """Profile of one column of a file's rows (samples, frequent values,
+    histogram), kept up to date at ingest so /columns never reads rows."""
+    __tablename__ = "column_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_id = Column(Integer, ForeignKey("files.id"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    # Mergeable state, see ProfileService
+    profile = Column(JSON, nullable=False)
+
+    file = relationship("File", back_populates="profiles")
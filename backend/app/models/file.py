@@ -1,19 +1,70 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+import uuid
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
 
 
+# SQLite stores server-side timestamps (CURRENT_TIMESTAMP) without
+# microseconds; bound values must match them for equality, as keyset
+# pagination by (uploaded_at, id) needs
+SQLITE_TIMESTAMP = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
+
+def new_data_token() -> str:
+    return uuid.uuid4().hex
+
+
 class File(Base):
     __tablename__ = "files"
+    # Ids of deleted files are never handed out again
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     filename = Column(String, nullable=False)
     storage_path = Column(String, nullable=False)
-    uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    uploaded_at = Column(DateTime(timezone=True).with_variant(SQLITE_TIMESTAMP, "sqlite"), server_default=func.now())
     row_count = Column(Integer, default=0)
     columns_json = Column(JSON, nullable=True)
+    # Bumped whenever rows change (e.g. appends) so derived data can be keyed on it
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # sha256 of the uploaded bytes; cleared once rows diverge from the upload (append)
+    content_hash = Column(String(64), nullable=True, index=True)
+    # Duplicate uploads share the parsed rows of this file instead of owning copies
+    data_file_id = Column(Integer, ForeignKey("files.id"), nullable=True, index=True)
+    # Unique per ingest of rows (shared with duplicate uploads, renewed when a
+    # file gets its own copy); caches key datasets on it, not on ids, which
+    # tables created before autoincrement may reuse
+    data_token = Column(String(32), nullable=True, default=new_data_token)
+    # Data queries served and when the latest was (written back periodically); warm-up ranks files by them
+    access_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_accessed_at = Column(DateTime(timezone=True), nullable=True, index=True)
 
     owner = relationship("User", back_populates="files")
     rows = relationship("Row", back_populates="file", cascade="all, delete-orphan")
+    zones = relationship("RowZone", back_populates="file", cascade="all, delete-orphan")
+    profiles = relationship("ColumnProfile", back_populates="file", cascade="all, delete-orphan")
+    views = relationship("SavedView", back_populates="file", cascade="all, delete-orphan")
+
+    @property
+    def data_id(self) -> int:
+        """Id under which this file's rows (and derived data) are stored."""
+        return self.data_file_id or self.id
+
+    @property
+    def data_key(self) -> str:
+        """Key of this file's rows in the dataset cache and Arrow store;
+        files uploaded before tokens existed fall back to their data id."""
+        return self.data_token or str(self.data_id)
+
+
+# Listings page by (uploaded_at, id), per owner for members, and match
+# filename prefixes case-insensitively
+Index("ix_files_uploaded_at_id", File.uploaded_at, File.id)
+Index("ix_files_user_id_uploaded_at_id", File.user_id, File.uploaded_at, File.id)
+Index("ix_files_lower_filename", func.lower(File.filename))
+Index("ix_files_user_id_lower_filename", File.user_id, func.lower(File.filename))
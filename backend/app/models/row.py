@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, ForeignKey, JSON
+from sqlalchemy import Column, Integer, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from ..core.database import Base
 
 
 class Row(Base):
     __tablename__ = "rows"
+    # Rows are always read per file in id order (and by id range for zone maps)
+    __table_args__ = (Index("ix_rows_file_id_id", "file_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     file_id = Column(Integer, ForeignKey("files.id"), nullable=False)
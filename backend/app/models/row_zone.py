@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, ForeignKey, JSON
+from sqlalchemy.orm import relationship
+from ..core.database import Base
+
+
+class RowZone(Base):
+    """Zone map over a contiguous id range of one file's rows: per-column
+    numeric min/max for skipping ranges a filter can't match, plus distinct
+    count sketches that merge into the file's distinct estimates."""
+    __tablename__ = "row_zones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_id = Column(Integer, ForeignKey("files.id"), nullable=False, index=True)
+    first_row_id = Column(Integer, nullable=False)
+    last_row_id = Column(Integer, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    # {column: [min, max]} of values that coerce to numbers; columns without any are left out
+    stats = Column(JSON, nullable=False)
+    # {column: base64 HyperLogLog registers}
+    sketches = Column(JSON, nullable=False)
+
+    file = relationship("File", back_populates="zones")
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, LargeBinary
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, deferred
+from ..core.database import Base
+
+
+class SavedView(Base):
+    """A named search/filters/sort/columns query of a file, stored with the
+    positions of its matching rows in view order, so its pages are read
+    without filtering or sorting (see ViewService)."""
+    __tablename__ = "saved_views"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_id = Column(Integer, ForeignKey("files.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    name = Column(String, nullable=False)
+    # search, filters, sort_by, sort_dir and columns, as taken by /rows
+    definition = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # File version the positions were computed for; stale views are refreshed before use
+    version = Column(Integer, nullable=True)
+    row_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Little-endian int32 row positions; deferred, pages read their slice only
+    positions = deferred(Column(LargeBinary, nullable=True))
+    refreshed_at = Column(DateTime(timezone=True), nullable=True)
+
+    file = relationship("File", back_populates="views")
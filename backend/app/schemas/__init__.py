@@ -1,9 +1,9 @@
 from .user import UserCreate, UserLogin, UserResponse, Token
-from .file import FileUploadResponse, FileResponse, FileListResponse
+from .file import FileUploadResponse, FileAppendResponse, FileResponse, FileListResponse
 from .data import RowsResponse, AggregateRequest, AggregateResponse, ColumnInfo
 
 __all__ = [
     "UserCreate", "UserLogin", "UserResponse", "Token",
-    "FileUploadResponse", "FileResponse", "FileListResponse",
+    "FileUploadResponse", "FileAppendResponse", "FileResponse", "FileListResponse",
     "RowsResponse", "AggregateRequest", "AggregateResponse", "ColumnInfo"
 ]
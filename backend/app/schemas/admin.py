@@ -0,0 +1,53 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+
+class ProcessMemory(BaseModel):
+    resident_bytes: int
+    anonymous_bytes: int
+    file_bytes: int
+
+
+class CachedDataset(BaseModel):
+    data_key: str
+    version: int
+    rows: int
+    path: Optional[str] = None
+    file_bytes: Optional[int] = None
+    resident_bytes: Optional[int] = None
+    shared_bytes: Optional[int] = None
+    private_bytes: Optional[int] = None
+    heap_bytes: int
+
+
+class DatasetCacheReport(BaseModel):
+    pid: int
+    process: Optional[ProcessMemory] = None
+    datasets: List[CachedDataset]
+
+
+class SlowRequest(BaseModel):
+    timestamp: datetime
+    method: str
+    route: str
+    path: str
+    status: int
+    file_id: Optional[int] = None
+    params: Dict[str, str]
+    duration_ms: float
+    user_id: Optional[int] = None
+    stages_ms: Dict[str, float]
+    details: Dict[str, Any]
+    profile_id: Optional[int] = None
+
+
+class ProfiledFunction(BaseModel):
+    function: str
+    calls: int
+    total_ms: float
+    cumulative_ms: float
+
+
+class RequestProfile(SlowRequest):
+    functions: List[ProfiledFunction]
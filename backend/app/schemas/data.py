@@ -1,11 +1,24 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 
 
+class TopValue(BaseModel):
+    value: Any
+    count: int
+
+
+class Histogram(BaseModel):
+    edges: List[float]
+    counts: List[int]
+
+
 class ColumnInfo(BaseModel):
     name: str
     type: str
     sample_values: List[Any]
+    top_values: List[TopValue] = []
+    histogram: Optional[Histogram] = None
 
 
 class RowsResponse(BaseModel):
@@ -29,3 +42,43 @@ class AggregateRequest(BaseModel):
 
 class AggregateResponse(BaseModel):
     data: List[Dict[str, Any]]
+
+
+class ColumnStats(BaseModel):
+    name: str
+    type: str
+    min: Optional[Any] = None
+    max: Optional[Any] = None
+    nulls: int = 0
+    distinct: int = 0
+
+
+class StatsResponse(BaseModel):
+    file_id: int
+    version: int
+    row_count: int
+    columns: List[ColumnStats]
+
+
+class SavedViewCreate(BaseModel):
+    name: str = Field(..., min_length=1)
+    search: Optional[str] = None
+    filters: Optional[Dict[str, Any]] = None
+    sort_by: Optional[str] = None
+    sort_dir: str = Field("asc", pattern="^(asc|desc)$")
+    columns: Optional[List[str]] = None
+
+
+class SavedViewResponse(BaseModel):
+    id: int
+    file_id: int
+    name: str
+    search: Optional[str] = None
+    filters: Optional[Dict[str, Any]] = None
+    sort_by: Optional[str] = None
+    sort_dir: str = "asc"
+    columns: Optional[List[str]] = None
+    row_count: int
+    version: Optional[int] = None
+    created_at: Optional[datetime] = None
+    refreshed_at: Optional[datetime] = None
@@ -11,12 +11,22 @@ class FileUploadResponse(BaseModel):
     message: str
 
 
+class FileAppendResponse(BaseModel):
+    id: int
+    filename: str
+    row_count: int
+    appended_rows: int
+    columns: List[str]
+    message: str
+
+
 class FileResponse(BaseModel):
     id: int
     filename: str
     uploaded_at: datetime
     row_count: int
     columns_json: Optional[Dict[str, Any]] = None
+    version: int = 1
 
     class Config:
         from_attributes = True
@@ -25,3 +35,4 @@ class FileResponse(BaseModel):
 class FileListResponse(BaseModel):
     total: int
     files: List[FileResponse]
+    next_cursor: Optional[str] = None
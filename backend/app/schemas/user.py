@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class UserCreate(BaseModel):
@@ -25,6 +25,12 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class UserListResponse(BaseModel):
+    total: int
+    users: List[UserResponse]
+    next_cursor: Optional[str] = None
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -0,0 +1,140 @@
+import glob
+import os
+import uuid
+from typing import Dict, Optional
+
+import pandas as pd
+
+from ..core.config import settings
+from ..core.metrics import cache_lookup
+
+# /proc/self/smaps fields summed per mapping, in kB
+SMAPS_FIELDS = ("Rss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+class ArrowStore:
+    """Decoded datasets as Arrow IPC files under ``UPLOAD_DIR/datasets``,
+    one per ``(File.data_key, version)``. The key is unique per ingest of
+    rows, so a file never maps another (deleted) file's rows even where
+    the database reuses ids.
+
+    Files are memory-mapped, so every worker process reading a dataset
+    shares the same page cache pages: numeric columns and the codes of
+    dictionary-encoded columns are zero-copy views of the mapping, while
+    text columns are materialized as Python objects per process. The
+    database stays the source of truth; files are written on first load
+    and can be deleted at any time.
+    """
+
+    @staticmethod
+    def _dir() -> str:
+        return os.path.join(settings.UPLOAD_DIR, "datasets")
+
+    @staticmethod
+    def path(key: str, version: int) -> str:
+        return os.path.join(ArrowStore._dir(), f"{key}-v{version}.arrow")
+
+    @staticmethod
+    def write(frame: pd.DataFrame, key: str, version: int) -> bool:
+        """Store ``frame``; False when disabled, pyarrow is missing or the
+        frame has columns Arrow can't represent losslessly (mixed types)."""
+        if not settings.ARROW_CACHE or frame.columns.empty:
+            return False
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return False
+
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return False
+        for i, col in enumerate(frame.columns):
+            if frame[col].dtype.kind == 'f':
+                # Keep NaN as a value instead of a null so floats map zero-copy
+                table = table.set_column(i, table.field(i), pa.array(frame[col].to_numpy(), from_pandas=False))
+
+        path = ArrowStore.path(key, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and renamed, so other workers never map a partial file
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        ArrowStore.remove(key, keep=path)
+        return True
+
+    @staticmethod
+    def read(key: str, version: int) -> Optional[pd.DataFrame]:
+        """The stored frame, memory-mapped, or None when there is no file."""
+        if not settings.ARROW_CACHE:
+            return None
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return None
+
+        try:
+            table = pa.ipc.open_file(pa.memory_map(ArrowStore.path(key, version), "r")).read_all()
+        except (OSError, pa.ArrowInvalid):
+            cache_lookup("arrow", False)
+            return None  # not stored (or removed meanwhile), or not a complete file
+        cache_lookup("arrow", True)
+        # split_blocks keeps each column its own (zero-copy) block; ints with
+        # nulls come back as objects, as they are read from the database
+        return table.to_pandas(split_blocks=True, integer_object_nulls=True)
+
+    @staticmethod
+    def remove(key: str, keep: Optional[str] = None) -> None:
+        """Delete the files of ``key`` (except ``keep``). Processes that
+        mapped them keep reading their mapping."""
+        for path in glob.glob(os.path.join(ArrowStore._dir(), f"{key}-v*.arrow")):
+            if path != keep:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def mapped_memory(path: str) -> Optional[Dict[str, int]]:
+        """Resident and shared bytes of this process's mappings of ``path``
+        (Linux ``/proc/self/smaps``); None where unavailable."""
+        try:
+            with open("/proc/self/smaps") as smaps:
+                lines = smaps.readlines()
+        except OSError:
+            return None
+
+        totals = dict.fromkeys(SMAPS_FIELDS, 0)
+        in_mapping = False
+        for line in lines:
+            name, _, rest = line.partition(":")
+            if name in SMAPS_FIELDS:
+                if in_mapping:
+                    totals[name] += int(rest.split()[0]) * 1024
+            elif "-" in line.split(" ", 1)[0]:
+                # Mapping header: address range, perms, offset, device, inode, path
+                in_mapping = line.rstrip("\n").endswith(path)
+        return {
+            "resident_bytes": totals["Rss"],
+            "shared_bytes": totals["Shared_Clean"] + totals["Shared_Dirty"],
+            "private_bytes": totals["Private_Clean"] + totals["Private_Dirty"],
+        }
+
+    @staticmethod
+    def process_memory() -> Optional[Dict[str, int]]:
+        """Resident bytes of this process, split into anonymous (heap) and
+        file-backed pages (Linux ``/proc/self/status``); None where unavailable."""
+        fields = {"VmRSS": "resident_bytes", "RssAnon": "anonymous_bytes", "RssFile": "file_bytes"}
+        try:
+            with open("/proc/self/status") as status:
+                lines = status.readlines()
+        except OSError:
+            return None
+        memory = {}
+        for line in lines:
+            name, _, rest = line.partition(":")
+            if name in fields:
+                memory[fields[name]] = int(rest.split()[0]) * 1024
+        return memory if len(memory) == len(fields) else None
@@ -1,47 +1,372 @@
+import os
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from ..models.file import File
 from ..models.row import Row
+from ..models.row_zone import RowZone
+from ..models.column_profile import ColumnProfile
+from .stats_service import StatsService
+from .profile_service import ProfileService
+from .filter_service import FilterService
+from .dataset_cache import Dataset, dataset_cache
+from .arrow_store import ArrowStore
+from .duckdb_service import DuckDBService
+from ..core.config import settings
+from ..core.metrics import timed
+from ..core.single_flight import SingleFlight, flight_key
+from ..core import request_context
+
+# Streamed scans start with chunks this small so the first rows go out
+# quickly, then double up to the maximum
+STREAM_FIRST_CHUNK_ROWS = 1000
+STREAM_MAX_CHUNK_ROWS = 64000
+# Scans and aggregates are split into row partitions of at least this many
+# rows, up to one per query worker (QUERY_WORKERS)
+PARTITION_MIN_ROWS = 50000
+
+# Metric aggregates; all but count are computed on the numeric values
+AGGREGATES: Dict[str, Any] = {
+    'count': 'count',
+    'sum': lambda x: FilterService.numeric(x).sum(),
+    'avg': lambda x: FilterService.numeric(x).mean(),
+    'min': lambda x: FilterService.numeric(x).min(),
+    'max': lambda x: FilterService.numeric(x).max(),
+    'std': lambda x: FilterService.numeric(x).std(),
+}
+# Per-partition statistics each aggregate is merged from: non-null values
+# (count), numeric values (n), their sum, min, max and squared deviations
+# from the partition mean (m2)
+PARTIAL_STATS = {
+    'count': ('count',),
+    'sum': ('sum',),
+    'avg': ('sum', 'n'),
+    'min': ('min',),
+    'max': ('max',),
+    'std': ('sum', 'n', 'm2'),
+}
+# How partials of each statistic are combined, within and across partitions
+PARTIAL_MERGE = {'count': 'sum', 'n': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max', 'm2': 'sum'}
+
+# Concurrent loads of the same file version, and identical queries, share
+# one computation
+dataset_loads = SingleFlight("load")
+query_flights = SingleFlight("query")
+
+# Accesses of a file are counted in memory and written to it (access_count,
+# last_accessed_at) on its first access, then at most this often
+ACCESS_FLUSH_SECONDS = 60
+# file id -> [accesses not written yet, monotonic time of the last write]
+_accesses: Dict[int, List[float]] = {}
+_accesses_lock = threading.Lock()
+
+_query_pools: Dict[int, ThreadPoolExecutor] = {}
+_query_pools_lock = threading.Lock()
 
 
 class DataService:
     @staticmethod
-    def _load_dataframe(file_id: int, db: Session) -> pd.DataFrame:
+    def _frame_from_rows(
+        rows_data: List[Dict[str, Any]],
+        columns_json: Optional[Dict[str, Any]] = None
+    ) -> pd.DataFrame:
+        if not rows_data:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows_data)
+        dictionaries = (columns_json or {}).get('dictionaries') or {}
+        decoded = {
+            col: DataService._decode(df[col], dictionary)
+            for col, dictionary in dictionaries.items() if col in df.columns
+        }
+        return df.assign(**decoded) if decoded else df
+
+    @staticmethod
+    def _decode(codes: pd.Series, dictionary: List[Any]) -> pd.Series:
+        """``category`` Series from stored dictionary codes. Categories are
+        put in sorted order so sorting by codes sorts the values."""
+        codes = pd.to_numeric(codes, errors='coerce').fillna(-1).astype(np.int32)
+        values = pd.Categorical.from_codes(codes, categories=dictionary)
+        try:
+            values = values.reorder_categories(sorted(dictionary))
+        except TypeError:
+            pass  # mixed-type dictionary; keep insertion order
+        return pd.Series(values, index=codes.index)
+
+    @staticmethod
+    def _get_file(file_id: int, db: Session) -> File:
         db_file = db.query(File).filter(File.id == file_id).first()
         if not db_file:
             raise HTTPException(status_code=404, detail="File not found")
+        return db_file
 
-        query = db.query(Row).filter(Row.file_id == file_id)
-        rows_data = [row.raw_json for row in query.all()]
-        if not rows_data:
-            return pd.DataFrame()
-        return pd.DataFrame(rows_data)
+    @staticmethod
+    async def _get_file_async(file_id: int, db: AsyncSession) -> File:
+        db_file = await db.get(File, file_id)
+        if not db_file:
+            raise HTTPException(status_code=404, detail="File not found")
+        return db_file
+
+    @staticmethod
+    def _pending_access(file_id: int) -> int:
+        """Count an access of the file; the accesses to write now, if due."""
+        now = time.monotonic()
+        with _accesses_lock:
+            entry = _accesses.setdefault(file_id, [0, None])
+            entry[0] += 1
+            if entry[1] is not None and now - entry[1] < ACCESS_FLUSH_SECONDS:
+                return 0
+            count, entry[0], entry[1] = entry[0], 0, now
+            return count
+
+    @staticmethod
+    def _access_update(file_id: int, count: int):
+        return update(File).where(File.id == file_id).values(
+            access_count=func.coalesce(File.access_count, 0) + count, last_accessed_at=func.now()
+        )
+
+    @staticmethod
+    def _record_access(db: Session, db_file: File) -> None:
+        """Note that the file's data was queried (cache warm-up ranks files
+        by it). Best effort: a failed write never fails the query."""
+        count = DataService._pending_access(db_file.id)
+        if not count:
+            return
+        try:
+            db.execute(DataService._access_update(db_file.id, count))
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+
+    @staticmethod
+    async def _record_access_async(db: AsyncSession, db_file: File) -> None:
+        count = DataService._pending_access(db_file.id)
+        if not count:
+            return
+        try:
+            await db.execute(DataService._access_update(db_file.id, count))
+            await db.commit()
+        except SQLAlchemyError:
+            await db.rollback()
+
+    @staticmethod
+    def _range_filters(db_file: File, filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return StatsService.range_filters(filters, (db_file.columns_json or {}).get('columns', []))
+
+    @staticmethod
+    def _zones_query(db_file: File):
+        return select(RowZone.first_row_id, RowZone.last_row_id, RowZone.stats).where(
+            RowZone.file_id == db_file.data_id
+        ).order_by(RowZone.first_row_id)
+
+    @staticmethod
+    def _rows_query(db_file: File, ranges: Optional[List[Any]]):
+        query = select(Row.raw_json).where(Row.file_id == db_file.data_id)
+        if ranges:
+            query = query.where(or_(*(Row.id.between(first, last) for first, last in ranges)))
+        return query.order_by(Row.id)
+
+    @staticmethod
+    def _empty_dataset(db_file: File) -> Dataset:
+        """No rows, but the file's columns: every zone was pruned by filters."""
+        columns_json = db_file.columns_json or {}
+        return Dataset(pd.DataFrame(columns=columns_json.get('columns', [])), columns_json)
+
+    @staticmethod
+    def _mapped_dataset(key: str, version: int, columns_json: Optional[Dict[str, Any]]) -> Optional[Dataset]:
+        """The file version's Arrow file, memory-mapped and cached, if stored."""
+        frame = ArrowStore.read(key, version)
+        if frame is None:
+            return None
+        return dataset_cache.put(key, version, frame, columns_json, path=ArrowStore.path(key, version))
+
+    @staticmethod
+    def _cache_dataset(
+        key: str, version: int, frame: pd.DataFrame, columns_json: Optional[Dict[str, Any]]
+    ) -> Dataset:
+        """Cache a fully read frame. It is stored as an Arrow file first and
+        mapped back, so this process shares its pages with the other workers."""
+        if ArrowStore.write(frame, key, version):
+            dataset = DataService._mapped_dataset(key, version, columns_json)
+            if dataset is not None:
+                return dataset
+        return dataset_cache.put(key, version, frame, columns_json)
+
+    @staticmethod
+    def _load_file_dataset(db_file: File, db: Session, filters: Optional[Dict[str, Any]] = None) -> Dataset:
+        """Rows of ``db_file``, from the dataset cache or the file's Arrow
+        file when present. Otherwise the whole file is read and cached,
+        except that range ``filters`` read only rows of zones whose min/max
+        could match (not cached; filters are still applied later).
+        Concurrent loads of the same rows share one read."""
+        with timed("data", "load"):
+            dataset = dataset_cache.get(db_file.data_key, db_file.version)
+            if dataset is not None:
+                request_context.note(loaded_from="cache")
+                return dataset
+            return dataset_loads.do(
+                DataService._load_key(db_file, filters), lambda: DataService._read_dataset(db_file, db, filters)
+            )
+
+    @staticmethod
+    def _load_key(db_file: File, filters: Optional[Dict[str, Any]]):
+        return flight_key(db_file.data_key, db_file.version, DataService._range_filters(db_file, filters))
+
+    @staticmethod
+    def _read_dataset(db_file: File, db: Session, filters: Optional[Dict[str, Any]]) -> Dataset:
+        dataset = DataService._mapped_dataset(db_file.data_key, db_file.version, db_file.columns_json)
+        if dataset is not None:
+            request_context.note(loaded_from="arrow")
+            return dataset
+
+        ranges = None
+        range_filters = DataService._range_filters(db_file, filters)
+        if range_filters:
+            ranges = StatsService.prune(db.execute(DataService._zones_query(db_file)).all(), range_filters)
+            if ranges == []:
+                return DataService._empty_dataset(db_file)
+        # Zone-pruned reads cover only the zones that may match
+        request_context.note(loaded_from="database" if ranges is None else "zones")
+
+        rows_data = db.execute(DataService._rows_query(db_file, ranges)).scalars().all()
+        frame = DataService._frame_from_rows(rows_data, db_file.columns_json)
+        if ranges is not None:
+            return Dataset(frame, db_file.columns_json)
+        return DataService._cache_dataset(db_file.data_key, db_file.version, frame, db_file.columns_json)
+
+    @staticmethod
+    async def _load_file_dataset_async(
+        db_file: File, db: AsyncSession, filters: Optional[Dict[str, Any]] = None
+    ) -> Dataset:
+        with timed("data", "load"):
+            dataset = dataset_cache.get(db_file.data_key, db_file.version)
+            if dataset is not None:
+                request_context.note(loaded_from="cache")
+                return dataset
+            return await dataset_loads.do_async(
+                DataService._load_key(db_file, filters), lambda: DataService._read_dataset_async(db_file, db, filters)
+            )
+
+    @staticmethod
+    async def _read_dataset_async(db_file: File, db: AsyncSession, filters: Optional[Dict[str, Any]]) -> Dataset:
+        dataset = await run_in_threadpool(
+            DataService._mapped_dataset, db_file.data_key, db_file.version, db_file.columns_json
+        )
+        if dataset is not None:
+            request_context.note(loaded_from="arrow")
+            return dataset
+
+        ranges = None
+        range_filters = DataService._range_filters(db_file, filters)
+        if range_filters:
+            zones = (await db.execute(DataService._zones_query(db_file))).all()
+            ranges = StatsService.prune(zones, range_filters)
+            if ranges == []:
+                return DataService._empty_dataset(db_file)
+        # Zone-pruned reads cover only the zones that may match
+        request_context.note(loaded_from="database" if ranges is None else "zones")
+
+        result = await db.execute(DataService._rows_query(db_file, ranges))
+        rows_data = list(result.scalars().all())
+        frame = await run_in_threadpool(DataService._frame_from_rows, rows_data, db_file.columns_json)
+        if ranges is not None:
+            return Dataset(frame, db_file.columns_json)
+        return await run_in_threadpool(
+            DataService._cache_dataset, db_file.data_key, db_file.version, frame, db_file.columns_json
+        )
+
+    @staticmethod
+    def _partitions(frame: pd.DataFrame) -> List[pd.DataFrame]:
+        """``frame`` split into contiguous row partitions, one per query
+        worker as long as each gets PARTITION_MIN_ROWS rows."""
+        count = max(1, min(settings.QUERY_WORKERS, len(frame) // PARTITION_MIN_ROWS))
+        if count == 1:
+            return [frame]
+        size = -(-len(frame) // count)
+        return [frame.iloc[start:start + size] for start in range(0, len(frame), size)]
+
+    @staticmethod
+    def _map_partitions(func: Callable[[pd.DataFrame], Any], frame: pd.DataFrame) -> List[Any]:
+        """``func`` applied to each partition of ``frame``, concurrently on
+        the query pool when there is more than one. The numpy/pandas kernels
+        doing the work (masks, numeric coercion, groupby) release the GIL."""
+        partitions = DataService._partitions(frame)
+        if len(partitions) == 1:
+            return [func(partitions[0])]
+        workers = settings.QUERY_WORKERS
+        with _query_pools_lock:
+            if workers not in _query_pools:
+                _query_pools[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query")
+            pool = _query_pools[workers]
+        return list(pool.map(func, partitions))
+
+    @staticmethod
+    def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        return frames[0] if len(frames) == 1 else pd.concat(frames)
+
+    @staticmethod
+    def _search(df: pd.DataFrame, search: str) -> pd.DataFrame:
+        mask = np.zeros(len(df), dtype=bool)
+        for col in df.columns:
+            mask |= FilterService.contains(df[col], search).to_numpy()
+        return df[mask]
+
+    @staticmethod
+    def _scan(
+        dataset: Dataset,
+        search: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> Callable[[pd.DataFrame], pd.DataFrame]:
+        """Rows of a partition matching ``search`` and ``filters``. Filters
+        of cached (indexed) datasets are answered from the indexes up front
+        (see _selected), so only the search is left for the partitions."""
+        if dataset.indexed:
+            return lambda part: DataService._search(part, search) if search else part
+
+        def scan(part: pd.DataFrame) -> pd.DataFrame:
+            positions = FilterService.select(Dataset(part, dataset.columns_json), filters)
+            if positions is not None:
+                part = part.iloc[positions]
+            return DataService._search(part, search) if search else part
+        return scan
+
+    @staticmethod
+    def _selected(dataset: Dataset, filters: Optional[Dict[str, Any]]) -> pd.DataFrame:
+        """The rows left to scan: those matching ``filters`` by the indexes
+        of a cached dataset, or all of them."""
+        df = dataset.frame
+        if dataset.indexed:
+            positions = FilterService.select(dataset, filters)
+            if positions is not None:
+                df = df.iloc[positions]
+        return df
 
     @staticmethod
     def _apply_search_and_filters(
-        df: pd.DataFrame,
+        dataset: Dataset,
         search: Optional[str],
         filters: Optional[Dict[str, Any]]
     ) -> pd.DataFrame:
+        """Rows matching ``filters`` (see FilterService), then ``search``
+        across all columns of those rows. Large scans run partitioned on the
+        query pool."""
+        df = dataset.frame
         if df.empty:
             return df
-        if search:
-            mask = df.astype(str).apply(lambda x: x.str.contains(search, case=False, na=False)).any(axis=1)
-            df = df[mask]
-        if filters:
-            for col, value in filters.items():
-                if col in df.columns:
-                    if isinstance(value, dict):
-                        if 'min' in value:
-                            df = df[pd.to_numeric(df[col], errors='coerce') >= value['min']]
-                        if 'max' in value:
-                            df = df[pd.to_numeric(df[col], errors='coerce') <= value['max']]
-                    else:
-                        df = df[df[col].astype(str).str.contains(str(value), case=False, na=False)]
-        return df
+        with timed("data", "filter"):
+            df = DataService._selected(dataset, filters)
+            if not search and (dataset.indexed or not filters):
+                return df
+            return DataService._concat(DataService._map_partitions(DataService._scan(dataset, search, filters), df))
 
     @staticmethod
     def get_rows(
@@ -54,17 +379,72 @@ class DataService:
         search: Optional[str] = None,
         filters: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        df = DataService._load_dataframe(file_id, db)
+        """A page of the rows matching ``search`` and ``filters``; identical
+        concurrent requests share one computation."""
+        db_file = DataService._get_file(file_id, db)
+
+        def run() -> Dict[str, Any]:
+            dataset = DataService._load_file_dataset(db_file, db, filters)
+            return DataService._paginate(dataset, page, page_size, sort_by, sort_dir, search, filters)
+        key = flight_key("rows", db_file.data_key, db_file.version, page, page_size, sort_by, sort_dir, search, filters)
+        result = query_flights.do(key, run)
+        DataService._record_access(db, db_file)
+        return result
+
+    @staticmethod
+    async def get_rows_async(
+        file_id: int,
+        db: AsyncSession,
+        page: int = 1,
+        page_size: int = 50,
+        sort_by: Optional[str] = None,
+        sort_dir: str = "asc",
+        search: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        db_file = await DataService._get_file_async(file_id, db)
+
+        async def run() -> Dict[str, Any]:
+            dataset = await DataService._load_file_dataset_async(db_file, db, filters)
+            return await run_in_threadpool(
+                DataService._paginate, dataset, page, page_size, sort_by, sort_dir, search, filters
+            )
+        key = flight_key("rows", db_file.data_key, db_file.version, page, page_size, sort_by, sort_dir, search, filters)
+        result = await query_flights.do_async(key, run)
+        await DataService._record_access_async(db, db_file)
+        return result
+
+    @staticmethod
+    def _paginate(
+        dataset: Dataset,
+        page: int,
+        page_size: int,
+        sort_by: Optional[str],
+        sort_dir: str,
+        search: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Page metadata plus ``rows`` as a DataFrame slice; the API layer
+        serializes it straight to JSON (see ``core.serialization``)."""
+        df = dataset.frame
         if df.empty:
-            return {"total": 0, "page": page, "page_size": page_size, "rows": []}
+            return {"total": 0, "page": page, "page_size": page_size, "rows": df}
 
-        df = DataService._apply_search_and_filters(df, search, filters)
+        queried = DataService._query_page(dataset, page, page_size, sort_by, sort_dir, search, filters)
+        if queried is not None:
+            return queried
+
+        df = DataService._apply_search_and_filters(dataset, search, filters)
 
         total = len(df)
+        request_context.note(rows=len(dataset.frame), matched=total)
 
         if sort_by and sort_by in df.columns:
             ascending = sort_dir.lower() == "asc"
-            df = df.sort_values(by=sort_by, ascending=ascending)
+            # Stable: ties stay in file order, as in DuckDB pages and saved views,
+            # so no row repeats or goes missing between pages
+            with timed("data", "sort"):
+                df = df.sort_values(by=sort_by, ascending=ascending, kind="stable")
 
         start = (page - 1) * page_size
         end = start + page_size
@@ -74,9 +454,29 @@ class DataService:
             "total": total,
             "page": page,
             "page_size": page_size,
-            "rows": df_page.to_dict(orient='records')
+            "rows": df_page
         }
 
+    @staticmethod
+    def _query_page(
+        dataset: Dataset,
+        page: int,
+        page_size: int,
+        sort_by: Optional[str],
+        sort_dir: str,
+        search: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """The page as selected by the SQL engine, if enabled (see DuckDBService)."""
+        if not search and not filters and not (sort_by and sort_by in dataset.frame.columns):
+            return None  # a plain slice of the frame
+        selected = DuckDBService.page(dataset, page, page_size, sort_by, sort_dir, search, filters)
+        if selected is None:
+            return None
+        positions, total = selected
+        request_context.note(rows=len(dataset.frame), matched=total, engine="duckdb")
+        return {"total": total, "page": page, "page_size": page_size, "rows": dataset.frame.iloc[positions]}
+
     @staticmethod
     def aggregate_data(
         file_id: int,
@@ -85,51 +485,275 @@ class DataService:
         filters: Optional[Dict[str, Any]],
         search: Optional[str],
         db: Session
-    ) -> List[Dict[str, Any]]:
-        df = DataService._load_dataframe(file_id, db)
-        if df.empty:
-            return []
+    ) -> pd.DataFrame:
+        db_file = DataService._get_file(file_id, db)
+        request_context.note(group_by=group_by, metrics=metrics, filters=filters, search=search)
+        with timed("data", "aggregate"):
+            result = StatsService.aggregate(
+                db_file.columns_json, db_file.row_count, group_by, metrics, filters, search
+            )
+        if result is not None:
+            request_context.note(loaded_from="stats")
+            return result
 
-        df = DataService._apply_search_and_filters(df, search, filters)
-        
-        agg_dict = {}
-        for metric in metrics:
-            col = metric['col']
-            agg = metric['agg']
-            
-            if col not in df.columns:
-                continue
-            
-            if agg == 'count':
-                agg_dict[f"{col}_{agg}"] = (col, 'count')
-            elif agg == 'sum':
-                agg_dict[f"{col}_{agg}"] = (col, lambda x: pd.to_numeric(x, errors='coerce').sum())
-            elif agg == 'avg':
-                agg_dict[f"{col}_{agg}"] = (col, lambda x: pd.to_numeric(x, errors='coerce').mean())
-            elif agg == 'min':
-                agg_dict[f"{col}_{agg}"] = (col, lambda x: pd.to_numeric(x, errors='coerce').min())
-            elif agg == 'max':
-                agg_dict[f"{col}_{agg}"] = (col, lambda x: pd.to_numeric(x, errors='coerce').max())
+        def run() -> pd.DataFrame:
+            dataset = DataService._load_file_dataset(db_file, db, filters)
+            return DataService._aggregate(dataset, group_by, metrics, filters, search)
+        key = flight_key("aggregate", db_file.data_key, db_file.version, group_by, metrics, filters, search)
+        result = query_flights.do(key, run)
+        DataService._record_access(db, db_file)
+        return result
+
+    @staticmethod
+    async def aggregate_data_async(
+        file_id: int,
+        group_by: List[str],
+        metrics: List[Dict[str, str]],
+        filters: Optional[Dict[str, Any]],
+        search: Optional[str],
+        db: AsyncSession
+    ) -> pd.DataFrame:
+        db_file = await DataService._get_file_async(file_id, db)
+        request_context.note(group_by=group_by, metrics=metrics, filters=filters, search=search)
+        with timed("data", "aggregate"):
+            result = StatsService.aggregate(
+                db_file.columns_json, db_file.row_count, group_by, metrics, filters, search
+            )
+        if result is not None:
+            request_context.note(loaded_from="stats")
+            return result
+
+        async def run() -> pd.DataFrame:
+            dataset = await DataService._load_file_dataset_async(db_file, db, filters)
+            return await run_in_threadpool(
+                DataService._aggregate, dataset, group_by, metrics, filters, search
+            )
+        key = flight_key("aggregate", db_file.data_key, db_file.version, group_by, metrics, filters, search)
+        result = await query_flights.do_async(key, run)
+        await DataService._record_access_async(db, db_file)
+        return result
+
+    @staticmethod
+    def _aggregate(
+        dataset: Dataset,
+        group_by: List[str],
+        metrics: List[Dict[str, str]],
+        filters: Optional[Dict[str, Any]],
+        search: Optional[str]
+    ) -> pd.DataFrame:
+        # No columns: the file has no rows (zone pruning keeps the columns)
+        if dataset.frame.columns.empty:
+            return dataset.frame
+
+        aggregates = {
+            f"{metric['col']}_{metric['agg']}": (metric['col'], metric['agg'])
+            for metric in metrics
+            if metric['col'] in dataset.frame.columns and metric['agg'] in AGGREGATES
+        }
+        valid_group_by = [col for col in group_by if col in dataset.frame.columns]
+        if aggregates and (valid_group_by or not group_by):
+            result = DuckDBService.aggregate(dataset, valid_group_by, aggregates, filters, search)
+            if result is not None:
+                request_context.note(rows=len(dataset.frame), groups=len(result), engine="duckdb")
+                return result
+            if len(DataService._partitions(dataset.frame)) > 1:
+                return DataService._aggregate_partitioned(dataset, valid_group_by, aggregates, filters, search)
+
+        df = DataService._apply_search_and_filters(dataset, search, filters)
+        agg_dict = {key: (col, AGGREGATES[agg]) for key, (col, agg) in aggregates.items()}
         
-        if group_by:
-            valid_group_by = [col for col in group_by if col in df.columns]
-            if valid_group_by and agg_dict:
-                result = df.groupby(valid_group_by).agg(**agg_dict).reset_index()
+        with timed("data", "aggregate"):
+            if group_by:
+                if valid_group_by and agg_dict:
+                    # observed=True: dictionary-encoded (category) keys only yield groups present in df
+                    result = df.groupby(valid_group_by, observed=True).agg(**agg_dict).reset_index()
+                else:
+                    result = df
             else:
-                result = df
-        else:
-            if agg_dict:
-                result_dict = {}
-                for key, (col, func) in agg_dict.items():
-                    if callable(func):
-                        result_dict[key] = func(df[col])
-                    else:
-                        result_dict[key] = df[col].agg(func)
-                result = pd.DataFrame([result_dict])
-            else:
-                result = df
+                if agg_dict:
+                    result_dict = {}
+                    for key, (col, func) in agg_dict.items():
+                        if callable(func):
+                            result_dict[key] = func(df[col])
+                        else:
+                            result_dict[key] = df[col].agg(func)
+                    result = pd.DataFrame([result_dict])
+                else:
+                    result = df
         
-        return result.to_dict(orient='records')
+        request_context.note(rows=len(dataset.frame), matched=len(df), groups=len(result))
+        return result
+
+    @staticmethod
+    def _aggregate_partitioned(
+        dataset: Dataset,
+        keys: List[str],
+        aggregates: Dict[str, Tuple[str, str]],
+        filters: Optional[Dict[str, Any]],
+        search: Optional[str]
+    ) -> pd.DataFrame:
+        """Same result as the serial aggregate: each partition is scanned
+        and reduced to partial statistics per group on the query pool, then
+        the partials are merged."""
+        with timed("data", "filter"):
+            df = DataService._selected(dataset, filters)
+        scan = DataService._scan(dataset, search, filters)
+
+        def reduce(part: pd.DataFrame) -> Tuple[int, pd.DataFrame]:
+            rows = scan(part)
+            return len(rows), DataService._partial_aggregate(rows, keys, aggregates)
+
+        with timed("data", "aggregate"):
+            reduced = DataService._map_partitions(reduce, df)
+            result = DataService._merge_partials([partial for _, partial in reduced], keys, aggregates)
+        request_context.note(
+            rows=len(dataset.frame), matched=sum(matched for matched, _ in reduced), groups=len(result)
+        )
+        return result
+
+    @staticmethod
+    def _partial_aggregate(
+        df: pd.DataFrame,
+        keys: List[str],
+        aggregates: Dict[str, Tuple[str, str]]
+    ) -> pd.DataFrame:
+        """PARTIAL_STATS of ``df`` per group of ``keys`` (one row without
+        keys), in columns named ``col:stat``."""
+        group_keys = [df[key] for key in keys]
+        columns = {}
+        for col, agg in aggregates.values():
+            values = FilterService.numeric(df[col]) if agg != 'count' else None
+            for stat in PARTIAL_STATS[agg]:
+                if stat == 'count':
+                    columns[f"{col}:count"] = df[col].notna()
+                elif stat == 'n':
+                    columns[f"{col}:n"] = values.notna()
+                elif stat == 'm2':
+                    if keys:
+                        mean = values.groupby(group_keys, observed=True).transform('mean')
+                    else:
+                        mean = values.mean()
+                    columns[f"{col}:m2"] = (values - mean) ** 2
+                else:
+                    columns[f"{col}:{stat}"] = values
+        partial = pd.DataFrame(columns, index=df.index)
+        merge = {name: PARTIAL_MERGE[name.rsplit(':', 1)[1]] for name in partial.columns}
+        if keys:
+            return partial.groupby(group_keys, observed=True).agg(merge)
+        return pd.DataFrame([{name: partial[name].agg(how) for name, how in merge.items()}])
+
+    @staticmethod
+    def _merge_partials(
+        partials: List[pd.DataFrame],
+        keys: List[str],
+        aggregates: Dict[str, Tuple[str, str]]
+    ) -> pd.DataFrame:
+        """Aggregates of the whole result from the partitions' partials.
+        Groups come out sorted by key, as from a serial groupby."""
+        parts = pd.concat(partials)
+        grouped = parts.groupby(level=list(range(parts.index.nlevels)), observed=True)
+        merged = grouped.agg({name: PARTIAL_MERGE[name.rsplit(':', 1)[1]] for name in parts.columns})
+
+        result = {}
+        for key, (col, agg) in aggregates.items():
+            if agg in ('count', 'sum', 'min', 'max'):
+                result[key] = merged[f"{col}:{agg}"]
+                continue
+            n = merged[f"{col}:n"]
+            mean = merged[f"{col}:sum"] / n
+            if agg == 'avg':
+                result[key] = mean
+                continue
+            # Squared deviations around the overall mean: each partition's
+            # own plus n times the square of its mean's offset from the overall
+            part_n = parts[f"{col}:n"]
+            overall = grouped[f"{col}:sum"].transform('sum') / grouped[f"{col}:n"].transform('sum')
+            offset = (part_n * (parts[f"{col}:sum"] / part_n - overall) ** 2).fillna(0)
+            m2 = merged[f"{col}:m2"] + offset.groupby(level=list(range(parts.index.nlevels)), observed=True).sum()
+            result[key] = np.sqrt(m2 / (n - 1)).where(n > 1)
+        result = pd.DataFrame(result, index=merged.index)
+        return result.reset_index() if keys else result.reset_index(drop=True)
+
+    @staticmethod
+    def _chunk_sizes() -> Iterator[int]:
+        size = STREAM_FIRST_CHUNK_ROWS
+        while True:
+            yield size
+            size = min(size * 2, STREAM_MAX_CHUNK_ROWS)
+
+    @staticmethod
+    def _frame_chunks(frame: pd.DataFrame) -> Iterator[pd.DataFrame]:
+        start = 0
+        for size in DataService._chunk_sizes():
+            if start >= len(frame):
+                return
+            yield frame.iloc[start:start + size]
+            start += size
+
+    @staticmethod
+    def _stored_chunks(db_file: File, db: Session, filters: Optional[Dict[str, Any]]) -> Iterator[pd.DataFrame]:
+        """Decoded rows of ``db_file`` read from the database chunk by chunk,
+        skipping zones that can't match range ``filters``."""
+        ranges = None
+        range_filters = DataService._range_filters(db_file, filters)
+        if range_filters:
+            ranges = StatsService.prune(db.execute(DataService._zones_query(db_file)).all(), range_filters)
+            if ranges == []:
+                return
+        query = DataService._rows_query(db_file, ranges).execution_options(yield_per=STREAM_FIRST_CHUNK_ROWS)
+        rows = db.execute(query).scalars()
+        for size in DataService._chunk_sizes():
+            rows_data = list(itertools.islice(rows, size))
+            if not rows_data:
+                return
+            with timed("data", "load"):
+                frame = DataService._frame_from_rows(rows_data, db_file.columns_json)
+            yield frame
+
+    @staticmethod
+    def stream_rows(
+        db_file: File,
+        db: Session,
+        search: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Rows matching ``search``/``filters`` in file order, as the frames
+        a chunked scan finds them in (at most ``limit`` rows). A cached
+        dataset is sliced; otherwise rows are read and decoded from the
+        database chunk by chunk, so the first rows don't wait for the rest.
+        Filters are validated before anything is scanned."""
+        columns_json = db_file.columns_json or {}
+        if filters:
+            FilterService.parse(filters, columns_json.get('types', {}))
+        DataService._record_access(db, db_file)
+        dataset = dataset_cache.get(db_file.data_key, db_file.version)
+        if dataset is None:
+            dataset = DataService._mapped_dataset(db_file.data_key, db_file.version, db_file.columns_json)
+        if dataset is not None:
+            chunks = DataService._frame_chunks(dataset.frame)
+        else:
+            chunks = DataService._stored_chunks(db_file, db, filters)
+        return DataService._matching_chunks(chunks, columns_json, search, filters, limit)
+
+    @staticmethod
+    def _matching_chunks(
+        chunks: Iterator[pd.DataFrame],
+        columns_json: Dict[str, Any],
+        search: Optional[str],
+        filters: Optional[Dict[str, Any]],
+        limit: Optional[int]
+    ) -> Iterator[pd.DataFrame]:
+        sent = 0
+        for chunk in chunks:
+            matched = DataService._apply_search_and_filters(Dataset(chunk, columns_json), search, filters)
+            if limit is not None:
+                matched = matched.iloc[:limit - sent]
+            if len(matched):
+                sent += len(matched)
+                yield matched
+            if limit is not None and sent >= limit:
+                return
 
     @staticmethod
     def export_csv(
@@ -139,40 +763,137 @@ class DataService:
         filters: Optional[Dict[str, Any]] = None,
         columns: Optional[List[str]] = None
     ) -> str:
-        df = DataService._load_dataframe(file_id, db)
-        if df.empty:
+        db_file = DataService._get_file(file_id, db)
+
+        def run() -> str:
+            return DataService._to_csv(DataService._load_file_dataset(db_file, db, filters), search, filters, columns)
+        key = flight_key("export", db_file.data_key, db_file.version, search, filters, columns)
+        result = query_flights.do(key, run)
+        DataService._record_access(db, db_file)
+        return result
+
+    @staticmethod
+    async def export_csv_async(
+        file_id: int,
+        db: AsyncSession,
+        search: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[List[str]] = None
+    ) -> str:
+        db_file = await DataService._get_file_async(file_id, db)
+
+        async def run() -> str:
+            dataset = await DataService._load_file_dataset_async(db_file, db, filters)
+            return await run_in_threadpool(DataService._to_csv, dataset, search, filters, columns)
+        key = flight_key("export", db_file.data_key, db_file.version, search, filters, columns)
+        result = await query_flights.do_async(key, run)
+        await DataService._record_access_async(db, db_file)
+        return result
+
+    @staticmethod
+    def _to_csv(
+        dataset: Dataset,
+        search: Optional[str],
+        filters: Optional[Dict[str, Any]],
+        columns: Optional[List[str]]
+    ) -> str:
+        if dataset.frame.columns.empty:
             return ""
-        df = DataService._apply_search_and_filters(df, search, filters)
+        positions = DuckDBService.positions(dataset, search, filters)
+        if positions is not None:
+            df = dataset.frame.iloc[positions]
+            request_context.note(engine="duckdb")
+        else:
+            df = DataService._apply_search_and_filters(dataset, search, filters)
+        request_context.note(rows=len(dataset.frame), matched=len(df))
         if columns:
             cols = [c for c in columns if c in df.columns]
             if cols:
                 df = df[cols]
-        # Return CSV string
-        return df.to_csv(index=False)
+        with timed("data", "serialize"):
+            return df.to_csv(index=False)
+
+    @staticmethod
+    def _profiles_query(db_file: File):
+        return select(ColumnProfile.name, ColumnProfile.profile).where(ColumnProfile.file_id == db_file.data_id)
+
+    @staticmethod
+    def has_profiles(db: Session, db_file: File) -> bool:
+        query = select(ColumnProfile.id).where(ColumnProfile.file_id == db_file.data_id).limit(1)
+        return db.execute(query).first() is not None
 
     @staticmethod
     def get_columns(file_id: int, db: Session) -> List[Dict[str, Any]]:
-        db_file = db.query(File).filter(File.id == file_id).first()
-        if not db_file:
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        query = db.query(Row).filter(Row.file_id == file_id).limit(5)
-        rows_data = [row.raw_json for row in query.all()]
-        
-        if not rows_data:
-            return []
-        
-        df = pd.DataFrame(rows_data)
-        
-        columns_info = []
-        for col in df.columns:
-            sample_values = df[col].dropna().head(3).tolist()
-            col_type = db_file.columns_json.get('types', {}).get(col, 'string')
-            
-            columns_info.append({
-                "name": col,
-                "type": col_type,
-                "sample_values": sample_values
-            })
-        
-        return columns_info
+        db_file = DataService._get_file(file_id, db)
+        profiles = dict(db.execute(DataService._profiles_query(db_file)).all())
+        return DataService._column_info(profiles, db_file.columns_json)
+
+    @staticmethod
+    async def get_columns_async(file_id: int, db: AsyncSession) -> List[Dict[str, Any]]:
+        db_file = await DataService._get_file_async(file_id, db)
+        profiles = dict((await db.execute(DataService._profiles_query(db_file))).all())
+        return DataService._column_info(profiles, db_file.columns_json)
+
+    @staticmethod
+    def _column_info(
+        profiles: Dict[str, Dict[str, Any]],
+        columns_json: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Every stored column with its profile; no rows are read."""
+        types = (columns_json or {}).get('types', {})
+        return [
+            ProfileService.describe(col, types.get(col, 'string'), profiles.get(col))
+            for col in (columns_json or {}).get('columns', [])
+        ]
+
+    @staticmethod
+    def _heap_bytes(frame: pd.DataFrame) -> int:
+        """Bytes of ``frame`` columns held on this process's heap, i.e. not
+        read-only views of a memory-mapped Arrow file."""
+        total = 0
+        for col in frame.columns:
+            series = frame[col]
+            values = series.array.codes if isinstance(series.dtype, pd.CategoricalDtype) else series.to_numpy()
+            total += int(series.memory_usage(index=False, deep=True))
+            if isinstance(values, np.ndarray) and not values.flags.writeable:
+                total -= values.nbytes
+        return total
+
+    @staticmethod
+    def cache_report() -> Dict[str, Any]:
+        """Cached datasets of this worker with the memory they take: pages of
+        their Arrow file mapping (shared with other workers) and heap bytes."""
+        datasets = []
+        for key, version, dataset in dataset_cache.entries():
+            entry = {
+                "data_key": key,
+                "version": version,
+                "rows": len(dataset.frame),
+                "path": dataset.path,
+                "file_bytes": None,
+                "resident_bytes": None,
+                "shared_bytes": None,
+                "private_bytes": None,
+                "heap_bytes": DataService._heap_bytes(dataset.frame),
+            }
+            if dataset.path and os.path.exists(dataset.path):
+                entry["file_bytes"] = os.path.getsize(dataset.path)
+                entry.update(ArrowStore.mapped_memory(dataset.path) or {})
+            datasets.append(entry)
+        return {"pid": os.getpid(), "process": ArrowStore.process_memory(), "datasets": datasets}
+
+    @staticmethod
+    def get_stats(db_file: File) -> Dict[str, Any]:
+        """Stored per-column stats; no rows are read."""
+        columns_json = db_file.columns_json or {}
+        stats = columns_json.get('stats', {})
+        types = columns_json.get('types', {})
+        return {
+            "file_id": db_file.id,
+            "version": db_file.version,
+            "row_count": db_file.row_count or 0,
+            "columns": [
+                {"name": col, "type": types.get(col, "string"), **stats.get(col, {})}
+                for col in columns_json.get('columns', [])
+            ],
+        }
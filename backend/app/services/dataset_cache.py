@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+from ..core.config import settings
+from ..core.metrics import cache_lookup
+
+
+class Dataset:
+    """Decoded rows of one file version plus per-column indexes.
+
+    Indexes are only built for cached (``indexed``) datasets, where they are
+    reused by later queries; one-off frames (e.g. zone-pruned reads) are
+    scanned instead. ``path`` is the memory-mapped Arrow file the frame's
+    columns are backed by, if any (see ArrowStore).
+    """
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        columns_json: Optional[Dict[str, Any]],
+        indexed: bool = False,
+        path: Optional[str] = None
+    ):
+        self.frame = frame
+        self.columns_json = columns_json or {}
+        self.indexed = indexed
+        self.path = path
+        self._indexes: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def index(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """The index stored under ``key``, built by ``build()`` on first use."""
+        with self._lock:
+            if key not in self._indexes:
+                self._indexes[key] = build()
+            return self._indexes[key]
+
+
+class DatasetCache:
+    """LRU of datasets keyed by ``(File.data_key, version)``.
+
+    Keys come from the file row read for the request, so a hit always
+    matches the database: ``data_key`` is unique per ingest of rows (never
+    a reusable id) and ``File.version`` is bumped whenever rows change.
+    Older versions of a dataset are dropped when a newer one is cached.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[Tuple[str, int], Dataset]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: int) -> Optional[Dataset]:
+        with self._lock:
+            dataset = self._entries.get((key, version))
+            if dataset is not None:
+                self._entries.move_to_end((key, version))
+        cache_lookup("dataset", dataset is not None)
+        return dataset
+
+    def put(
+        self,
+        key: str,
+        version: int,
+        frame: pd.DataFrame,
+        columns_json: Optional[Dict[str, Any]],
+        path: Optional[str] = None
+    ) -> Dataset:
+        """Cache ``frame`` (unless caching is disabled) and return it as a Dataset."""
+        size = settings.DATASET_CACHE_SIZE
+        dataset = Dataset(frame, columns_json, indexed=size > 0, path=path)
+        if size <= 0:
+            return dataset
+        with self._lock:
+            for entry in [entry for entry in self._entries if entry[0] == key]:
+                del self._entries[entry]
+            self._entries[(key, version)] = dataset
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+        return dataset
+
+    def contains(self, key: str, version: int) -> bool:
+        """Whether the version is cached, without counting as a lookup."""
+        with self._lock:
+            return (key, version) in self._entries
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            for entry in [entry for entry in self._entries if entry[0] == key]:
+                del self._entries[entry]
+
+    def entries(self) -> List[Tuple[int, int, Dataset]]:
+        """``(key, version, dataset)`` from least to most recently used."""
+        with self._lock:
+            return [(key, version, dataset) for (key, version), dataset in self._entries.items()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+dataset_cache = DatasetCache()
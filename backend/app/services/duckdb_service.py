@@ -0,0 +1,293 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..core.config import settings
+from ..core.metrics import timed
+from .dataset_cache import Dataset
+from .filter_service import Condition, FilterService, Node
+
+# Name the dataset's table is registered under, and the column added to it
+# holding each row's position in the frame
+TABLE_NAME = "dataset"
+POSITION_COLUMN = "__position"
+
+# SQL of each metric aggregate over the column (``{col}``) or its numeric
+# values (``{num}``), matching the pandas aggregates (AGGREGATES)
+SQL_AGGREGATES = {
+    'count': "COUNT({col})",
+    'sum': "COALESCE(SUM({num}), 0)",
+    'avg': "AVG({num})",
+    'min': "MIN({num})",
+    'max': "MAX({num})",
+    'std': "STDDEV_SAMP({num})",
+}
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _param(value: Any) -> Any:
+    return pd.Timestamp(value).to_pydatetime() if isinstance(value, np.datetime64) else value
+
+
+class _Query:
+    """SQL expressions over one registered dataset, plus the parameters
+    bound so far (in the order their placeholders appear)."""
+
+    def __init__(self, dataset: Dataset, schema):
+        import pyarrow as pa
+
+        self.dataset = dataset
+        self.types = {field.name: field.type for field in schema if field.name != POSITION_COLUMN}
+        self.params: List[Any] = []
+        self._pa = pa
+
+    def base(self) -> str:
+        """The table with NaN as null, as pandas treats it."""
+        floats = [name for name, kind in self.types.items() if self._pa.types.is_floating(kind)]
+        if not floats:
+            return f"SELECT * FROM {TABLE_NAME}"
+        replaced = ", ".join(f"NULLIF({_quote(name)}, 'NaN'::DOUBLE) AS {_quote(name)}" for name in floats)
+        return f"SELECT * REPLACE ({replaced}) FROM {TABLE_NAME}"
+
+    def bind(self, value: Any) -> str:
+        self.params.append(_param(value))
+        return "?"
+
+    def text(self, name: str) -> str:
+        """The values as pandas prints them (``astype(str)``)."""
+        if self._pa.types.is_boolean(self.types[name]):
+            return f"CASE WHEN {_quote(name)} THEN 'True' WHEN NOT {_quote(name)} THEN 'False' END"
+        return f"CAST({_quote(name)} AS VARCHAR)"
+
+    def numeric(self, name: str) -> str:
+        """The values coerced to numbers (``FilterService.numeric``)."""
+        kind = self.types[name]
+        if self._pa.types.is_integer(kind) or self._pa.types.is_floating(kind):
+            return _quote(name)
+        if self._pa.types.is_boolean(kind):
+            return f"CAST({_quote(name)} AS INTEGER)"
+        return f"NULLIF(TRY_CAST({self.text(name)} AS DOUBLE), 'NaN'::DOUBLE)"
+
+    def keys(self, name: str, kind: str) -> str:
+        """The values as typed filter keys (``FilterService.keys``)."""
+        if kind == "number":
+            return self.numeric(name)
+        if kind == "date":
+            if self._pa.types.is_timestamp(self.types[name]):
+                return _quote(name)
+            date_format = self.dataset.columns_json.get('date_formats', {}).get(name)
+            if date_format:
+                return f"TRY_STRPTIME({self.text(name)}, {_literal(date_format)})"
+            return f"TRY_CAST({self.text(name)} AS TIMESTAMP)"
+        return self.text(name)
+
+    def condition(self, cond: Condition) -> str:
+        if cond.op == "contains":
+            return f"COALESCE(regexp_matches({self.text(cond.column)}, {self.bind(cond.value)}, 'i'), FALSE)"
+        if cond.op == "is_null":
+            return f"{_quote(cond.column)} IS {'' if cond.value else 'NOT '}NULL"
+        if cond.op == "prefix":
+            return f"COALESCE(starts_with(lower({self.text(cond.column)}), {self.bind(cond.value)}), FALSE)"
+        keys = self.keys(cond.column, cond.kind)
+        if cond.op == "in":
+            if not cond.value:
+                return "FALSE"
+            return f"COALESCE({keys} IN ({', '.join(self.bind(value) for value in cond.value)}), FALSE)"
+        low, high = cond.value
+        bounds = [f"{keys} IS NOT NULL"]
+        if low is not None:
+            bounds.append(f"{keys} >= {self.bind(low)}")
+        if high is not None:
+            bounds.append(f"{keys} <= {self.bind(high)}")
+        return "(" + " AND ".join(bounds) + ")"
+
+    def node(self, node: Node) -> Optional[str]:
+        """SQL of a condition tree; None where FilterService ignores it."""
+        if isinstance(node, Condition):
+            return self.condition(node) if node.column in self.types else None
+        combinator, children = node
+        parts = [part for part in (self.node(child) for child in children) if part is not None]
+        if not parts:
+            return None
+        return "(" + f" {combinator.upper()} ".join(parts) + ")"
+
+    def where(self, search: Optional[str], filters: Optional[Dict[str, Any]]) -> str:
+        clauses = []
+        if filters:
+            tree = FilterService.parse(filters, self.dataset.columns_json.get('types', {}))
+            clause = self.node(tree)
+            if clause is not None:
+                clauses.append(clause)
+        if search:
+            matches = [
+                f"COALESCE(regexp_matches({self.text(name)}, {self.bind(search)}, 'i'), FALSE)" for name in self.types
+            ]
+            clauses.append("(" + " OR ".join(matches) + ")")
+        return " AND ".join(clauses) or "TRUE"
+
+
+class DuckDBService:
+    """Rows, aggregates and exports of a Dataset as SQL run by an embedded
+    DuckDB (``QUERY_ENGINE=duckdb``).
+
+    The dataset is scanned as an Arrow table (the memory-mapped Arrow file
+    when it has one) with each row's position added. Filters, search and
+    metrics are translated to SQL with the pandas path's semantics; rows
+    and exports only take the matching positions from SQL and read the
+    values from the frame, so they come out exactly as from pandas.
+    Methods return None when duckdb or pyarrow is missing, the frame can't
+    be represented in Arrow or the SQL fails (e.g. a search regex RE2
+    doesn't support); callers then run the pandas path.
+    """
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.QUERY_ENGINE == "duckdb"
+
+    @staticmethod
+    def _cursor():
+        """A cursor of the process's in-memory database; cursors are
+        independent connections, one per query."""
+        global _connection
+        import duckdb
+
+        with _connection_lock:
+            if _connection is None:
+                _connection = duckdb.connect(config={"threads": max(1, settings.QUERY_WORKERS)})
+        return _connection.cursor()
+
+    @staticmethod
+    def _table(dataset: Dataset):
+        """The dataset as an Arrow table with positions (built once per dataset)."""
+        def build():
+            import pyarrow as pa
+
+            table = None
+            if dataset.path:
+                try:
+                    table = pa.ipc.open_file(pa.memory_map(dataset.path, "r")).read_all()
+                except (OSError, pa.ArrowInvalid):
+                    pass  # removed meanwhile; convert the frame instead
+            if table is None or table.num_rows != len(dataset.frame):
+                try:
+                    table = pa.Table.from_pandas(dataset.frame, preserve_index=False)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                    return None
+            return table.append_column(POSITION_COLUMN, pa.array(np.arange(table.num_rows)))
+        return dataset.index(("duckdb",), build)
+
+    @staticmethod
+    def _run(dataset: Dataset, build_sql) -> Optional[Any]:
+        """Result of the SQL ``build_sql(query)`` over the dataset, as a
+        DuckDB relation fetched by the caller; None when unavailable."""
+        if not DuckDBService.enabled() or dataset.frame.columns.empty:
+            return None
+        try:
+            import duckdb  # noqa: F401
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return None
+        table = DuckDBService._table(dataset)
+        if table is None:
+            return None
+        query = _Query(dataset, table.schema)
+        sql = build_sql(query)  # raises 400s for malformed filters before anything runs
+        cursor = DuckDBService._cursor()
+        try:
+            cursor.register(TABLE_NAME, table)
+            with timed("data", "query"):
+                return cursor.execute(sql, query.params).df()
+        except duckdb.Error:
+            return None
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def page(
+        dataset: Dataset,
+        page: int,
+        page_size: int,
+        sort_by: Optional[str],
+        sort_dir: str,
+        search: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> Optional[Tuple[np.ndarray, int]]:
+        """Positions of the page's rows and the number of matching rows."""
+        def build(query: _Query) -> str:
+            where = query.where(search, filters)
+            order = POSITION_COLUMN
+            if sort_by and sort_by in query.types:
+                direction = "ASC" if sort_dir.lower() == "asc" else "DESC"
+                order = f"{_quote(sort_by)} {direction} NULLS LAST, {POSITION_COLUMN}"
+            # The total rides along with the page; an empty page counts separately
+            return (
+                f"WITH base AS ({query.base()}), matched AS (SELECT * FROM base WHERE {where}) "
+                f"SELECT {POSITION_COLUMN}, COUNT(*) OVER () AS total FROM matched ORDER BY {order} "
+                f"LIMIT {int(page_size)} OFFSET {int((page - 1) * page_size)}"
+            )
+
+        result = DuckDBService._run(dataset, build)
+        if result is None:
+            return None
+        if len(result):
+            return result[POSITION_COLUMN].to_numpy(dtype=np.intp), int(result["total"].iloc[0])
+        counted = DuckDBService._run(
+            dataset, lambda query: f"WITH base AS ({query.base()}) "
+                                   f"SELECT COUNT(*) AS total FROM base WHERE {query.where(search, filters)}"
+        )
+        if counted is None:
+            return None
+        return np.empty(0, dtype=np.intp), int(counted["total"].iloc[0])
+
+    @staticmethod
+    def positions(
+        dataset: Dataset,
+        search: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> Optional[np.ndarray]:
+        """Ascending positions of all rows matching ``search`` and ``filters``."""
+        result = DuckDBService._run(
+            dataset, lambda query: f"WITH base AS ({query.base()}) SELECT {POSITION_COLUMN} FROM base "
+                                   f"WHERE {query.where(search, filters)} ORDER BY {POSITION_COLUMN}"
+        )
+        return None if result is None else result[POSITION_COLUMN].to_numpy(dtype=np.intp)
+
+    @staticmethod
+    def aggregate(
+        dataset: Dataset,
+        keys: List[str],
+        aggregates: Dict[str, Tuple[str, str]],
+        filters: Optional[Dict[str, Any]],
+        search: Optional[str]
+    ) -> Optional[pd.DataFrame]:
+        """``aggregates`` (``{name: (col, agg)}``) per group of ``keys``,
+        groups sorted by key, or one row without keys."""
+        def build(query: _Query) -> str:
+            where = query.where(search, filters)
+            metrics = ", ".join(
+                SQL_AGGREGATES[agg].format(col=_quote(col), num=query.numeric(col)) + f" AS {_quote(name)}"
+                for name, (col, agg) in aggregates.items()
+            )
+            if not keys:
+                return f"WITH base AS ({query.base()}) SELECT {metrics} FROM base WHERE {where}"
+            grouped = ", ".join(_quote(key) for key in keys)
+            # Like groupby, rows with a null key belong to no group
+            not_null = " AND ".join(f"{_quote(key)} IS NOT NULL" for key in keys)
+            return (
+                f"WITH base AS ({query.base()}) SELECT {grouped}, {metrics} FROM base "
+                f"WHERE {where} AND {not_null} GROUP BY {grouped} ORDER BY {grouped}"
+            )
+
+        return DuckDBService._run(dataset, build)
@@ -1,108 +1,559 @@
+import numpy as np
 import pandas as pd
 import os
-from typing import List, Dict, Any
+import uuid
+import codecs
+import datetime
+import hashlib
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, NamedTuple, Optional, Tuple
+from sqlalchemy import delete, insert, literal, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import UploadFile, HTTPException
-from ..models.file import File
+from fastapi.concurrency import run_in_threadpool
+from ..models.file import File, new_data_token
 from ..models.row import Row
+from ..models.row_zone import RowZone
+from ..models.column_profile import ColumnProfile
 from ..core.config import settings
+from ..core.database import sync_sessionmaker
+from ..core.metrics import record_ingest, timed
+from .data_service import DataService
+from .stats_service import StatsService, ZONE_ROWS
+from .profile_service import ProfileService
+from .dataset_cache import dataset_cache
+from .arrow_store import ArrowStore
+from .warmup_service import WarmupService
+from .view_service import ViewService
+from .listing_service import ListingService
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+# Uploads are copied to disk in chunks of this size, never read whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+# Leading bytes of valid Excel containers (zip for .xlsx, OLE2 for .xls)
+FILE_SIGNATURES = {
+    '.xlsx': b'PK\x03\x04',
+    '.xls': b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',
+}
+# Type inference looks at a stratified sample of at most this many values per column
+INFER_SAMPLE_SIZE = 10000
+# Values checked before the full sample; a unanimous probe settles the column
+INFER_PROBE_SIZE = 200
+# Frames at least this wide are inferred column-parallel
+INFER_PARALLEL_COLUMNS = 16
+INFER_WORKERS = min(8, os.cpu_count() or 1)
+# Leading non-null values tried when guessing a column's date format
+DATE_FORMAT_PROBES = 10
+# String columns with at most this many distinct values (and at most this
+# share of distinct values per row) are stored dictionary-encoded
+CATEGORY_MAX_DISTINCT = 1000
+CATEGORY_MAX_RATIO = 0.5
+# Stripped from values that don't parse as numbers as-is
+NUMERIC_NOISE = r"[\s,\$€£]|%$"
+
+
+class UploadInfo(NamedTuple):
+    content_hash: str
+    size: int
+    # Physical lines minus the header for CSVs (quoted newlines overcount); None for Excel
+    estimated_rows: Optional[int]
+
+
+class ZoneBatch(NamedTuple):
+    """Row insert parameters for one zone plus its zone map entry."""
+    records: List[Dict[str, Any]]
+    stats: Dict[str, List[Any]]
+    sketches: Dict[str, str]
+
+
+class ChunkedIngest:
+    """Running state of a chunked ingest, shared by uploads and appends.
+
+    Each ``next_batches()`` call parses one chunk and returns its rows split
+    into zones of ``ZONE_ROWS`` (None once exhausted). Columns come from the
+    first chunk unless ``columns`` is given, in which case every chunk must
+    match them. Types are inferred on the first chunk and then refined by
+    each later one the way appended rows refine them, so no chunk is ever
+    parsed twice.
+
+    Low-cardinality string columns (picked on the first chunk unless
+    ``dictionaries`` is given) are stored dictionary-encoded: rows hold
+    integer codes into a per-column dictionary that later chunks extend.
+    A column whose dictionary would outgrow ``CATEGORY_MAX_DISTINCT`` is
+    stored plain from then on; ``insert`` decodes the rows already stored
+    before the next rows go in.
+    The date format of each date column is detected once, for queries.
+
+    Column stats, distinct-count sketches and column profiles are
+    accumulated on top of ``stats``/``sketches``/``profiles`` (those of
+    existing rows, for appends).
+    """
+
+    def __init__(
+        self,
+        chunks: Iterator[pd.DataFrame],
+        file_id: int,
+        columns: Optional[List[str]] = None,
+        types: Optional[Dict[str, str]] = None,
+        dictionaries: Optional[Dict[str, List[str]]] = None,
+        date_formats: Optional[Dict[str, str]] = None,
+        stats: Optional[Dict[str, Dict[str, Any]]] = None,
+        sketches: Optional[Dict[str, np.ndarray]] = None,
+        profiles: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        self.chunks = chunks
+        self.file_id = file_id
+        self.columns = columns
+        self.types = types
+        # Copied: dictionaries grow in place as chunks are encoded
+        self.dictionaries = (
+            {col: list(values) for col, values in dictionaries.items()}
+            if dictionaries is not None else None
+        )
+        # Columns no longer encoded -> their dictionary, until stored rows are decoded
+        self.undecoded: Dict[str, List[Any]] = {}
+        self.encoding_dropped = False
+        self.date_formats = dict(date_formats or {})
+        self.stats = stats
+        self.sketches = dict(sketches or {})
+        self.profiles = dict(profiles or {})
+        self.row_count = 0
+        self.started = time.perf_counter()
+
+    def next_batches(self) -> Optional[List[ZoneBatch]]:
+        with timed("file", "parse"):
+            chunk = next(self.chunks, None)
+        if chunk is None:
+            if self.started is not None:
+                record_ingest(self.row_count, time.perf_counter() - self.started)
+                self.started = None
+            return None
+
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        missing = [col for col in self.columns if col not in chunk.columns]
+        unexpected = [col for col in chunk.columns if col not in self.columns]
+        if missing or unexpected:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Schema mismatch: missing columns {missing}, unexpected columns {unexpected}"
+            )
+        if list(chunk.columns) != self.columns:
+            chunk = chunk[self.columns]
+
+        self.row_count += len(chunk)
+        if settings.MAX_UPLOAD_ROWS and self.row_count > settings.MAX_UPLOAD_ROWS:
+            # CSVs are checked before parsing; Excel row counts are only known here
+            raise HTTPException(
+                status_code=413,
+                detail=f"File exceeds the maximum of {settings.MAX_UPLOAD_ROWS} rows"
+            )
+
+        with timed("file", "infer"):
+            if self.types is None:
+                self.types = FileService.infer_column_types(chunk)
+            else:
+                self.types = FileService.merge_column_types(self.types, chunk)
+
+            if self.dictionaries is None:
+                self.dictionaries = {
+                    col: [] for col in self.columns
+                    if self.types.get(col) == "string" and FileService._is_low_cardinality(chunk[col])
+                }
+            for col, dictionary in list(self.dictionaries.items()):
+                if FileService._outgrows_dictionary(chunk[col], dictionary):
+                    self._stop_encoding(col)
+            for col, col_type in self.types.items():
+                if col_type == "date" and col not in self.date_formats:
+                    fmt = FileService._date_format(chunk[col])
+                    if fmt:
+                        self.date_formats[col] = fmt
+
+        with timed("file", "encode"):
+            FileService._update_profiles(self.profiles, chunk, self.types)
+
+            batches = []
+            for start in range(0, len(chunk), ZONE_ROWS):
+                part = chunk.iloc[start:start + ZONE_ROWS]
+                zone, sketches = FileService._zone_summary(part, self.dictionaries)
+                self.stats = StatsService.merge_column_stats(
+                    self.stats, FileService._column_stats(part, self.types, zone, self.date_formats)
+                )
+                StatsService.merge_sketches(self.sketches, sketches)
+                if self.dictionaries:
+                    part = part.assign(**{
+                        col: FileService._encode(part[col], dictionary)
+                        for col, dictionary in self.dictionaries.items()
+                    })
+                batches.append(ZoneBatch(
+                    FileService._row_records(part, self.file_id),
+                    zone,
+                    {col: StatsService.encode_sketch(registers) for col, registers in sketches.items()}
+                ))
+        return batches
+
+    def _stop_encoding(self, col: str) -> None:
+        dictionary = self.dictionaries.pop(col)
+        self.undecoded[col] = dictionary
+        self.encoding_dropped = True
+        # Encoded columns have no sketch; their dictionary holds every value seen
+        StatsService.merge_sketches(self.sketches, {col: StatsService.sketch(pd.Series(dictionary, dtype=object))})
+
+    def insert(self, db: Session, batches: List[ZoneBatch]) -> None:
+        """Store ``batches``, after decoding the stored rows of columns that
+        stopped being dictionary-encoded."""
+        if self.undecoded:
+            FileService._decode_stored_columns(db, self.file_id, self.undecoded)
+            self.undecoded = {}
+        FileService._insert_batches(db, self.file_id, batches)
+
+    def insert_remaining(self, db: Session) -> None:
+        while True:
+            batches = self.next_batches()
+            if batches is None:
+                break
+            self.insert(db, batches)
+
+    def columns_json(self, sheet: Optional[str] = None) -> Dict[str, Any]:
+        columns_json = {"columns": self.columns or [], "types": self.types or {}}
+        if self.dictionaries or self.encoding_dropped:
+            # Also when emptied, so it replaces the dictionaries stored before an append
+            columns_json["dictionaries"] = self.dictionaries
+        if self.date_formats:
+            columns_json["date_formats"] = self.date_formats
+        columns_json["stats"] = FileService._finish_stats(self.stats, self.sketches, columns_json)
+        if sheet:
+            columns_json["sheet"] = sheet
+        return columns_json
 
 
 class FileService:
     @staticmethod
-    def parse_file(file_path: str, filename: str) -> pd.DataFrame:
+    def parse_file(file_path: str, filename: str, sheet: Optional[str] = None) -> pd.DataFrame:
+        """Whole-file parse; uploads themselves are ingested chunk by chunk."""
+        chunks = list(FileService.iter_file_chunks(file_path, filename, sheet))
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+    @staticmethod
+    def iter_file_chunks(
+        file_path: str, filename: str, sheet: Optional[str] = None, chunksize: Optional[int] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Parse a stored upload into DataFrames of at most ``chunksize`` rows
+        with normalized column names, so CSV and Excel uploads never need to be
+        held in memory whole. At least one (possibly empty) frame is yielded,
+        keeping the columns of header-only files. ``sheet`` picks an Excel
+        worksheet by name or position (default: the first one).
+        """
+        chunksize = chunksize or settings.INGEST_CHUNK_ROWS
         try:
             if filename.endswith('.csv'):
-                # Try multiple common encodings for CSVs. Many real-world files
-                # are saved as Windows-1252/Latin-1 instead of UTF-8.
-                encodings_to_try = [None, 'utf-8', 'utf-8-sig', 'latin1', 'cp1252']
-                last_err = None
-                for enc in encodings_to_try:
-                    try:
-                        if enc is None:
-                            df = pd.read_csv(file_path)
-                        else:
-                            df = pd.read_csv(file_path, encoding=enc)
-                        break
-                    except UnicodeDecodeError as e:
-                        last_err = e
-                        df = None
-                if df is None:
-                    raise UnicodeDecodeError(
-                        last_err.encoding if hasattr(last_err, 'encoding') else 'unknown',
-                        last_err.object if hasattr(last_err, 'object') else b'',
-                        getattr(last_err, 'start', 0),
-                        getattr(last_err, 'end', 0),
-                        f"Could not decode CSV using encodings {encodings_to_try[1:]}."
-                    )
-            elif filename.endswith(('.xlsx', '.xls')):
-                try:
-                    if filename.endswith('.xlsx'):
-                        df = pd.read_excel(file_path, engine='openpyxl')
-                    else:  # .xls
-                        df = pd.read_excel(file_path, engine='xlrd')
-                except ImportError as e:
-                    # Provide a clearer error for missing Excel engines
-                    missing = 'openpyxl' if filename.endswith('.xlsx') else 'xlrd'
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Missing optional dependency '{missing}'. Please install it on the server to enable Excel parsing."
-                    )
+                chunks = FileService._iter_csv_chunks(file_path, chunksize)
+            elif filename.endswith('.xlsx'):
+                chunks = FileService._iter_xlsx_chunks(file_path, sheet, chunksize)
+            elif filename.endswith('.xls'):
+                chunks = FileService._iter_xls_chunks(file_path, sheet, chunksize)
             else:
                 raise ValueError("Unsupported file format")
             
-            df.columns = df.columns.str.strip().str.replace(' ', '_').str.lower()
-            
-            return df
+            for chunk in chunks:
+                chunk.columns = chunk.columns.astype(str).str.strip().str.replace(' ', '_').str.lower()
+                yield chunk
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Error parsing file: {str(e)}")
 
     @staticmethod
-    def infer_column_types(df: pd.DataFrame) -> Dict[str, str]:
-        """Infer types with robust heuristics for messy real-world CSVs.
-        Rules:
-        - If dtype is already numeric/datetime, respect it.
-        - Otherwise, try to coerce numeric after cleaning symbols (commas, currency, %).
-        - Try to parse dates with to_datetime.
-        - Use a threshold (>= 0.7 non-null after coercion) to decide.
-        """
-        column_types: Dict[str, str] = {}
+    def _csv_encoding(file_path: str) -> Optional[str]:
+        """pandas' UTF-8 default when the whole file decodes as UTF-8, else
+        Latin-1: many real-world files are saved as Windows-1252/Latin-1.
+        Decided up front so a chunked read can't fail halfway through."""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+                    decoder.decode(block)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return 'latin1'
+        return None
 
-        def clean_numeric_series(s: pd.Series) -> pd.Series:
-            # Work on strings; remove common noise: commas, spaces, currency, percents
-            s_str = s.astype(str).str.strip()
-            s_str = s_str.str.replace(r"[\s,]", "", regex=True)
-            s_str = s_str.str.replace(r"[\$€£]", "", regex=True)
-            s_str = s_str.str.replace(r"%$", "", regex=True)
-            return pd.to_numeric(s_str, errors='coerce')
+    @staticmethod
+    def _iter_csv_chunks(file_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        encoding = FileService._csv_encoding(file_path)
+        empty = True
+        with pd.read_csv(file_path, encoding=encoding, chunksize=chunksize) as reader:
+            for chunk in reader:
+                empty = False
+                yield chunk
+        if empty:
+            yield pd.read_csv(file_path, encoding=encoding, nrows=0)
 
-        numeric_candidates = []
-        for col in df.columns:
-            series = df[col]
-            # Fast paths for known dtypes
-            if pd.api.types.is_numeric_dtype(series):
-                column_types[col] = "number"
-                continue
-            if pd.api.types.is_datetime64_any_dtype(series):
-                column_types[col] = "date"
-                continue
+    @staticmethod
+    def _select_sheet(sheet_names: List[str], sheet: Optional[str]) -> str:
+        if not sheet:
+            return sheet_names[0]
+        if sheet in sheet_names:
+            return sheet
+        if sheet.isdigit() and int(sheet) < len(sheet_names):
+            return sheet_names[int(sheet)]
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sheet '{sheet}' not found. Available sheets: {', '.join(sheet_names)}"
+        )
 
-            # Try numeric coercion on object-like columns
-            num = clean_numeric_series(series)
-            num_ratio = (num.notna().sum() / len(series)) if len(series) else 0.0
+    @staticmethod
+    def _missing_excel_engine(engine: str) -> HTTPException:
+        return HTTPException(
+            status_code=400,
+            detail=f"Missing optional dependency '{engine}'. Please install it on the server to enable Excel parsing."
+        )
 
-            # Try date coercion
-            dt = pd.to_datetime(series, errors='coerce', infer_datetime_format=True)
-            dt_ratio = (dt.notna().sum() / len(series)) if len(series) else 0.0
+    @staticmethod
+    def _iter_xlsx_chunks(file_path: str, sheet: Optional[str], chunksize: int) -> Iterator[pd.DataFrame]:
+        # python-calamine (Rust) is several times faster when installed;
+        # openpyxl in read-only mode streams rows without building the workbook DOM
+        try:
+            import python_calamine  # noqa: F401
+        except ImportError:
+            rows = FileService._openpyxl_rows(file_path, sheet)
+        else:
+            rows = FileService._calamine_rows(file_path, sheet)
+        yield from FileService._frames_from_rows(rows, chunksize)
 
-            numeric_candidates.append((col, num_ratio))
+    @staticmethod
+    def _openpyxl_rows(file_path: str, sheet: Optional[str]) -> Iterator[tuple]:
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise FileService._missing_excel_engine('openpyxl')
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[FileService._select_sheet(workbook.sheetnames, sheet)]
+            yield from worksheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _calamine_rows(file_path: str, sheet: Optional[str]) -> Iterator[list]:
+        from python_calamine import CalamineWorkbook
+        
+        def cell(value):
+            # Match openpyxl/read_excel: blanks are None, whole numbers ints, dates datetimes
+            if value == "":
+                return None
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            if type(value) is datetime.date:
+                return datetime.datetime(value.year, value.month, value.day)
+            return value
+        
+        workbook = CalamineWorkbook.from_path(file_path)
+        try:
+            worksheet = workbook.get_sheet_by_name(FileService._select_sheet(workbook.sheet_names, sheet))
+            for row in worksheet.iter_rows():
+                yield [cell(value) for value in row]
+        finally:
+            workbook.close()
 
-            if num_ratio >= 0.5 and num_ratio >= dt_ratio:
-                column_types[col] = "number"
-            elif dt_ratio >= 0.5:
-                column_types[col] = "date"
+    @staticmethod
+    def _header_names(values) -> List[str]:
+        """Column names from a sheet's first row, named like ``pd.read_excel``
+        does: blank headers become ``Unnamed: <i>`` and repeats get ``.1``,
+        ``.2`` suffixes. Trailing blank header cells are dropped."""
+        values = list(values)
+        while values and values[-1] in (None, ""):
+            values.pop()
+        names: List[str] = []
+        seen: Dict[str, int] = {}
+        for i, value in enumerate(values):
+            name = f"Unnamed: {i}" if value in (None, "") else str(value)
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
             else:
-                column_types[col] = "string"
+                seen[name] = 0
+            names.append(name)
+        return names
+
+    @staticmethod
+    def _frames_from_rows(rows: Iterable, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Batch worksheet rows (header first) into DataFrames. Blank rows are skipped."""
+        rows = iter(rows)
+        columns = FileService._header_names(next(rows, ()))
+        width = len(columns)
+        batch: List[tuple] = []
+        emitted = False
+        for values in rows:
+            values = tuple(values[:width])
+            if all(value is None for value in values):
+                continue
+            if len(values) < width:
+                values += (None,) * (width - len(values))
+            batch.append(values)
+            if len(batch) >= chunksize:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                emitted = True
+                batch = []
+        if batch or not emitted:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+
+    @staticmethod
+    def _iter_xls_chunks(file_path: str, sheet: Optional[str], chunksize: int) -> Iterator[pd.DataFrame]:
+        # xlrd has no row streaming; the legacy format is parsed whole and batched
+        try:
+            workbook = pd.ExcelFile(file_path, engine='xlrd')
+        except ImportError:
+            raise FileService._missing_excel_engine('xlrd')
+        with workbook:
+            df = workbook.parse(FileService._select_sheet(workbook.sheet_names, sheet))
+        for start in range(0, max(len(df), 1), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+    @staticmethod
+    def _sample(series: pd.Series, size: int = INFER_SAMPLE_SIZE) -> pd.Series:
+        """Stratified sample of at most ``size`` values: one random value from
+        each of ``size`` equal slices, so the whole file is represented and not
+        just its head. Seeded by length, so repeated runs agree."""
+        n = len(series)
+        if n <= size:
+            return series
+        starts = np.arange(size) * n // size
+        widths = np.diff(np.append(starts, n))
+        offsets = (np.random.default_rng(n).random(size) * widths).astype(int)
+        return series.iloc[starts + offsets]
+
+    @staticmethod
+    def _coerce_numeric(s: pd.Series) -> pd.Series:
+        num = pd.to_numeric(s, errors='coerce')
+        retry = num.isna() & s.notna()
+        if retry.any():
+            # Clean only the values that failed: commas, spaces, currency, percents
+            cleaned = s[retry].astype(str).str.strip().str.replace(NUMERIC_NOISE, "", regex=True)
+            num = num.astype(float)
+            num[retry] = pd.to_numeric(cleaned, errors='coerce')
+        return num
+
+    @staticmethod
+    def detect_date_format(s: pd.Series) -> Optional[str]:
+        """strftime format of the column's dates, or None. Formats guessed
+        (month- and day-first) from the leading non-null values compete on
+        how many of those values they parse, so an ambiguous first value such
+        as 03/02/2024 doesn't decide the format alone."""
+        probes = pd.Series([str(value).strip() for value in s.dropna().head(DATE_FORMAT_PROBES)], dtype=object)
+        candidates: List[str] = []
+        with warnings.catch_warnings():
+            # guess_datetime_format warns when a guess contradicts ``dayfirst``
+            warnings.simplefilter("ignore", UserWarning)
+            for value in probes:
+                for dayfirst in (False, True):
+                    fmt = guess_datetime_format(value, dayfirst=dayfirst)
+                    if fmt and fmt not in candidates:
+                        candidates.append(fmt)
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        return max(
+            candidates,
+            key=lambda fmt: pd.to_datetime(probes, format=fmt, errors='coerce').notna().sum()
+        )
+
+    @staticmethod
+    def _date_format(s: pd.Series) -> Optional[str]:
+        """Format in which a date column's values are stored in rows
+        (datetime cells are stored as ISO strings)."""
+        if pd.api.types.is_datetime64_any_dtype(s):
+            return "ISO8601"
+        return FileService.detect_date_format(s)
+
+    @staticmethod
+    def _coerce_datetime(s: pd.Series, fmt: Optional[str] = None) -> pd.Series:
+        """Parse with one explicit format (detected once per column) instead of
+        per-value guessing; values not in that format become NaT."""
+        if pd.api.types.is_datetime64_any_dtype(s):
+            return s
+        fmt = fmt or FileService.detect_date_format(s)
+        if fmt is None:
+            return pd.Series(pd.NaT, index=s.index, dtype='datetime64[ns]')
+        return pd.to_datetime(s, format=fmt, errors='coerce')
+
+    @staticmethod
+    def _classify(values: pd.Series) -> Tuple[str, float, bool]:
+        """Type, numeric ratio and whether the verdict is unanimous (every
+        non-null value coerces to the type, or none coerces to anything)."""
+        n = len(values)
+        present = int(values.notna().sum())
+        num_count = int(FileService._coerce_numeric(values).notna().sum()) if n else 0
+        num_ratio = num_count / n if n else 0.0
+        if num_count and num_count == present and num_ratio >= 0.5:
+            # Dates can't beat a column whose values all coerce to numbers
+            return "number", num_ratio, True
+        
+        dt_count = int(FileService._coerce_datetime(values).notna().sum()) if n else 0
+        dt_ratio = dt_count / n if n else 0.0
+        
+        if num_ratio >= 0.5 and num_ratio >= dt_ratio:
+            column_type = "number"
+        elif dt_ratio >= 0.5:
+            column_type = "date"
+        else:
+            column_type = "string"
+        unanimous = num_count in (0, present) and dt_count in (0, present)
+        return column_type, num_ratio, unanimous
+
+    @staticmethod
+    def _infer_column(series: pd.Series) -> Tuple[str, Optional[float]]:
+        """Type of one column plus, for object columns, its numeric ratio."""
+        # Fast paths for known dtypes
+        if pd.api.types.is_numeric_dtype(series):
+            return "number", None
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return "date", None
+        
+        sample = FileService._sample(series)
+        stages = [sample]
+        if len(sample) > INFER_PROBE_SIZE:
+            # A spread-out probe first; a unanimous probe ends inference early
+            stages.insert(0, sample.iloc[::len(sample) // INFER_PROBE_SIZE])
+        for values in stages:
+            column_type, num_ratio, unanimous = FileService._classify(values)
+            if unanimous:
+                break
+        return column_type, num_ratio
+
+    @staticmethod
+    def infer_column_types(df: pd.DataFrame) -> Dict[str, str]:
+        """Infer types with robust heuristics for messy real-world CSVs.
+        Rules:
+        - If dtype is already numeric/datetime, respect it.
+        - Otherwise, work on a stratified sample of the column, starting with a
+          small probe that settles unanimous columns early.
+        - Try to coerce numeric after cleaning symbols (commas, currency, %).
+        - Try to parse dates in the one format detected for the column.
+        - Use a threshold (>= 0.5 non-null after coercion) to decide.
+        Wide frames are inferred column-parallel.
+        """
+        columns = list(df.columns)
+        if len(columns) >= INFER_PARALLEL_COLUMNS and INFER_WORKERS > 1:
+            with ThreadPoolExecutor(max_workers=INFER_WORKERS) as pool:
+                results = list(pool.map(lambda col: FileService._infer_column(df[col]), columns))
+        else:
+            results = [FileService._infer_column(df[col]) for col in columns]
+        
+        column_types: Dict[str, str] = {}
+        numeric_candidates = []
+        for col, (column_type, num_ratio) in zip(columns, results):
+            column_types[col] = column_type
+            if num_ratio is not None:
+                numeric_candidates.append((col, num_ratio))
 
         # Fallback: ensure at least one numeric column if possible
         if "number" not in column_types.values() and numeric_candidates:
@@ -113,59 +564,663 @@ class FileService:
         return column_types
 
     @staticmethod
-    async def save_uploaded_file(upload_file: UploadFile, user_id: int, db: Session) -> File:
-        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-        
-        file_path = os.path.join(settings.UPLOAD_DIR, f"{user_id}_{upload_file.filename}")
-        
-        with open(file_path, "wb") as f:
-            content = await upload_file.read()
-            f.write(content)
+    def merge_column_types(types: Dict[str, str], df_new: pd.DataFrame) -> Dict[str, str]:
+        """Refresh stored column types from appended rows only.
+        A number/date column keeps its type while at least half of a sample
+        of the new non-null values still coerces to it, otherwise it degrades
+        to string. String columns stay strings: existing rows already failed
+        coercion.
+        """
+        merged = dict(types)
+        for col in df_new.columns:
+            current = merged.get(col, "string")
+            if current == "string":
+                continue
+            values = df_new[col]
+            if current == "number" and pd.api.types.is_numeric_dtype(values):
+                continue
+            if current == "date" and pd.api.types.is_datetime64_any_dtype(values):
+                continue
+            values = FileService._sample(values.dropna())
+            if values.empty:
+                continue
+            if current == "number":
+                ratio = FileService._coerce_numeric(values).notna().mean()
+            else:
+                ratio = FileService._coerce_datetime(values).notna().mean()
+            if ratio < 0.5:
+                merged[col] = "string"
+        return merged
+
+    @staticmethod
+    def _check_signature(head: bytes, ext: str) -> None:
+        signature = FILE_SIGNATURES.get(ext)
+        if signature is not None and not head.startswith(signature):
+            raise HTTPException(status_code=400, detail=f"File content is not a valid {ext} workbook")
+        if ext == '.csv' and b"\x00" in head:
+            raise HTTPException(status_code=400, detail="File content does not look like CSV text")
+
+    @staticmethod
+    async def _write_upload(upload_file: UploadFile, file_path: str) -> UploadInfo:
+        """Stream the upload to ``file_path`` in fixed-size chunks, hashing and
+        counting lines on the way. Unsupported, malformed, empty or oversized
+        uploads are rejected before parsing and the partial file is removed.
+        """
+        filename = upload_file.filename or ""
+        ext = os.path.splitext(filename)[1]
+        if not filename.endswith(SUPPORTED_EXTENSIONS):
+            raise HTTPException(status_code=400, detail="Unsupported file format")
         
-        df = FileService.parse_file(file_path, upload_file.filename)
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        hasher = hashlib.sha256()
+        size = 0
+        newlines = 0
+        last_byte = b""
+        try:
+            with timed("file", "write"), open(file_path, "wb") as f:
+                while True:
+                    chunk = await upload_file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if size == 0:
+                        FileService._check_signature(chunk, ext)
+                    size += len(chunk)
+                    if max_bytes and size > max_bytes:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File exceeds the maximum upload size of {settings.MAX_UPLOAD_SIZE_MB} MB"
+                        )
+                    hasher.update(chunk)
+                    newlines += chunk.count(b"\n")
+                    last_byte = chunk[-1:]
+                    f.write(chunk)
+            
+            if size == 0:
+                raise HTTPException(status_code=400, detail="Uploaded file is empty")
+            
+            estimated_rows = None
+            if ext == '.csv':
+                estimated_rows = max(newlines + (last_byte != b"\n") - 1, 0)
+                if settings.MAX_UPLOAD_ROWS and estimated_rows > settings.MAX_UPLOAD_ROWS:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File exceeds the maximum of {settings.MAX_UPLOAD_ROWS} rows"
+                    )
+        except BaseException:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
         
-        column_types = FileService.infer_column_types(df)
-        columns_json = {
-            "columns": list(df.columns),
-            "types": column_types
+        return UploadInfo(hasher.hexdigest(), size, estimated_rows)
+
+    @staticmethod
+    def _temp_upload_path(user_id: int) -> str:
+        return os.path.join(settings.UPLOAD_DIR, f".{user_id}_{uuid.uuid4().hex}.part")
+
+    @staticmethod
+    def _store_blob(tmp_path: str, content_hash: str, filename: str) -> str:
+        """Move a hashed upload to its content-addressed blob path.
+        Identical bytes map to the same blob, so same-named uploads no longer
+        overwrite each other and duplicates are stored once."""
+        ext = os.path.splitext(filename)[1].lower()
+        blob_path = os.path.join(settings.UPLOAD_DIR, "blobs", content_hash[:2], f"{content_hash}{ext}")
+        if os.path.exists(blob_path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(tmp_path, blob_path)
+        return blob_path
+
+    @staticmethod
+    def _is_low_cardinality(values: pd.Series) -> bool:
+        values = values.dropna()
+        if values.empty or pd.api.types.infer_dtype(values, skipna=False) != "string":
+            return False
+        distinct = values.nunique()
+        return distinct <= CATEGORY_MAX_DISTINCT and distinct <= len(values) * CATEGORY_MAX_RATIO
+
+    @staticmethod
+    def _outgrows_dictionary(values: pd.Series, dictionary: List[Any]) -> bool:
+        """Whether adding ``values`` takes ``dictionary`` past ``CATEGORY_MAX_DISTINCT``."""
+        present = values.dropna()
+        return len(dictionary) + present[~present.isin(dictionary)].nunique() > CATEGORY_MAX_DISTINCT
+
+    @staticmethod
+    def _encode(values: pd.Series, dictionary: List[Any]) -> pd.Series:
+        """Integer codes of ``values`` in ``dictionary``, which is extended in
+        place with unseen values so existing codes stay valid. Nulls stay null."""
+        present = values.dropna()
+        dictionary.extend(pd.unique(present[~present.isin(dictionary)]).tolist())
+        codes = pd.Categorical(values, categories=dictionary).codes
+        encoded = pd.Series(codes.astype(object), index=values.index)
+        encoded[codes < 0] = None
+        return encoded
+
+    @staticmethod
+    def _zone_summary(
+        part: pd.DataFrame, dictionaries: Dict[str, List[Any]]
+    ) -> Tuple[Dict[str, List[Any]], Dict[str, np.ndarray]]:
+        """Zone map stats and distinct sketches of one zone's (decoded) rows.
+        Dictionary-encoded columns need no sketch: their dictionary is exact."""
+        sketches = {
+            col: StatsService.sketch(part[col]) for col in part.columns if col not in dictionaries
+        }
+        return StatsService.zone_stats(part), sketches
+
+    @staticmethod
+    def _column_stats(
+        part: pd.DataFrame,
+        types: Dict[str, str],
+        zone: Dict[str, List[Any]],
+        date_formats: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Null counts plus typed bounds: number columns reuse the zone's
+        numeric min/max, date columns get ISO bounds, strings none."""
+        stats = {}
+        for col in part.columns:
+            low = high = None
+            if types.get(col) == "number" and col in zone:
+                low, high = zone[col]
+            elif types.get(col) == "date":
+                dates = FileService._coerce_datetime(part[col], (date_formats or {}).get(col)).dropna()
+                if not dates.empty:
+                    low, high = dates.min().isoformat(), dates.max().isoformat()
+            stats[col] = {"min": low, "max": high, "nulls": int(part[col].isna().sum())}
+        return stats
+
+    @staticmethod
+    def _finish_stats(
+        stats: Optional[Dict[str, Dict[str, Any]]],
+        sketches: Dict[str, np.ndarray],
+        columns_json: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Per-column stats for ``columns_json``: every column present, bounds
+        dropped for string columns and distinct counts filled in."""
+        types = columns_json.get("types", {})
+        stats = {
+            col: {
+                "min": None, "max": None, "nulls": 0,
+                **(stats or {}).get(col, {}),
+            }
+            for col in columns_json.get("columns", [])
+        }
+        for col, values in stats.items():
+            if types.get(col, "string") == "string":
+                values["min"] = values["max"] = None
+        return StatsService.with_distinct(stats, sketches, columns_json.get("dictionaries"))
+
+    @staticmethod
+    def _update_profiles(
+        profiles: Dict[str, Dict[str, Any]], df: pd.DataFrame, types: Dict[str, str]
+    ) -> None:
+        """Extend ``profiles`` in place with the (decoded) rows of ``df``."""
+        values = FileService._json_frame(df)
+        for col in df.columns:
+            column = values[col]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype(object)
+            numbers = FileService._coerce_numeric(column) if types.get(col) == "number" else None
+            profiles[col] = ProfileService.update(profiles.get(col), column, numbers)
+
+    @staticmethod
+    def _load_profiles(db: Session, data_id: int) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: profile for name, profile in db.query(ColumnProfile.name, ColumnProfile.profile).filter(
+                ColumnProfile.file_id == data_id
+            )
         }
+
+    @staticmethod
+    def _store_profiles(db: Session, file_id: int, profiles: Dict[str, Dict[str, Any]]) -> None:
+        db.execute(delete(ColumnProfile).where(ColumnProfile.file_id == file_id))
+        db.add_all([
+            ColumnProfile(file_id=file_id, name=name, profile=profile)
+            for name, profile in profiles.items()
+        ])
+
+    @staticmethod
+    def _insert_batches(db: Session, file_id: int, batches: List[ZoneBatch]) -> None:
+        with timed("file", "insert"):
+            for batch in batches:
+                if not batch.records:
+                    continue
+                ids = db.execute(insert(Row).returning(Row.id), batch.records).scalars().all()
+                db.add(RowZone(
+                    file_id=file_id,
+                    first_row_id=min(ids),
+                    last_row_id=max(ids),
+                    row_count=len(ids),
+                    stats=batch.stats,
+                    sketches=batch.sketches
+                ))
+
+    @staticmethod
+    def _decode_stored_columns(db: Session, file_id: int, dictionaries: Dict[str, List[Any]]) -> None:
+        """Replace the codes of ``dictionaries``' columns in the file's stored
+        rows by their values, and give the zones those columns' sketches
+        (encoded columns have none)."""
+        zones = db.query(RowZone).filter(RowZone.file_id == file_id).order_by(RowZone.first_row_id).all()
+        zone_starts = np.array([zone.first_row_id for zone in zones], dtype=np.int64)
+        zone_sketches: Dict[int, Dict[str, np.ndarray]] = {}
+        last_id = 0
+        with timed("file", "decode"):
+            while True:
+                rows = db.query(Row.id, Row.raw_json).filter(
+                    Row.file_id == file_id, Row.id > last_id
+                ).order_by(Row.id).limit(ZONE_ROWS).all()
+                if not rows:
+                    break
+                records = []
+                for row_id, raw in rows:
+                    raw = dict(raw)
+                    for col, dictionary in dictionaries.items():
+                        if raw.get(col) is not None:
+                            raw[col] = dictionary[raw[col]]
+                    records.append({"id": row_id, "raw_json": raw})
+                db.execute(update(Row), records)
+
+                if zones:
+                    ids = np.array([row_id for row_id, _ in rows], dtype=np.int64)
+                    owners = np.searchsorted(zone_starts, ids, side="right") - 1
+                    for owner in np.unique(owners[owners >= 0]):
+                        members = [records[i]["raw_json"] for i in np.flatnonzero(owners == owner)]
+                        StatsService.merge_sketches(zone_sketches.setdefault(int(owner), {}), {
+                            col: StatsService.sketch(pd.Series([raw.get(col) for raw in members], dtype=object))
+                            for col in dictionaries
+                        })
+                last_id = rows[-1].id
+        for owner, sketches in zone_sketches.items():
+            zones[owner].sketches = {
+                **(zones[owner].sketches or {}),
+                **{col: StatsService.encode_sketch(registers) for col, registers in sketches.items()},
+            }
+
+    @staticmethod
+    def _zone_sketches(db: Session, data_id: int) -> Dict[str, np.ndarray]:
+        sketches: Dict[str, np.ndarray] = {}
+        for (zone_sketches,) in db.query(RowZone.sketches).filter(RowZone.file_id == data_id):
+            StatsService.merge_sketches(sketches, zone_sketches)
+        return sketches
+
+    @staticmethod
+    def _rebuild_zones(db: Session, data_id: int, columns_json: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Recompute zone maps and column stats from stored rows, e.g. for
+        copied rows or files ingested before zone maps existed."""
+        db.execute(delete(RowZone).where(RowZone.file_id == data_id))
+        types = columns_json.get("types", {})
+        dictionaries = columns_json.get("dictionaries") or {}
+        stats = None
+        sketches: Dict[str, np.ndarray] = {}
+        for first_row_id, last_row_id, part in FileService._iter_stored_zones(db, data_id, columns_json):
+            zone, part_sketches = FileService._zone_summary(part, dictionaries)
+            stats = StatsService.merge_column_stats(
+                stats, FileService._column_stats(part, types, zone, columns_json.get("date_formats"))
+            )
+            StatsService.merge_sketches(sketches, part_sketches)
+            db.add(RowZone(
+                file_id=data_id,
+                first_row_id=first_row_id,
+                last_row_id=last_row_id,
+                row_count=len(part),
+                stats=zone,
+                sketches={col: StatsService.encode_sketch(registers) for col, registers in part_sketches.items()}
+            ))
+        return FileService._finish_stats(stats, sketches, columns_json)
+
+    @staticmethod
+    def _iter_stored_zones(
+        db: Session, data_id: int, columns_json: Dict[str, Any]
+    ) -> Iterator[Tuple[int, int, pd.DataFrame]]:
+        """Stored rows as decoded frames of ``ZONE_ROWS``, with their first and last row ids."""
+        last_id = 0
+        while True:
+            rows = db.query(Row.id, Row.raw_json).filter(
+                Row.file_id == data_id, Row.id > last_id
+            ).order_by(Row.id).limit(ZONE_ROWS).all()
+            if not rows:
+                return
+            yield rows[0].id, rows[-1].id, DataService._frame_from_rows([raw for _, raw in rows], columns_json)
+            last_id = rows[-1].id
+
+    @staticmethod
+    def _rebuild_profiles(db: Session, data_id: int, columns_json: Dict[str, Any]) -> None:
+        """Recompute column profiles from stored rows (files ingested before profiles existed)."""
+        profiles = {col: ProfileService.empty() for col in columns_json.get("columns", [])}
+        types = columns_json.get("types", {})
+        for _, _, part in FileService._iter_stored_zones(db, data_id, columns_json):
+            FileService._update_profiles(profiles, part, types)
+        FileService._store_profiles(db, data_id, profiles)
+
+    @staticmethod
+    def refresh_stats(db: Session, db_file: File) -> File:
+        """Backfill zone maps and ``columns_json['stats']`` for a file ingested
+        before they were tracked."""
+        columns_json = db_file.columns_json or {}
+        stats = FileService._rebuild_zones(db, db_file.data_id, columns_json)
+        db_file.columns_json = {**columns_json, "stats": stats}
+        db.commit()
+        db.refresh(db_file)
+        return db_file
+
+    @staticmethod
+    def refresh_profiles(db: Session, db_file: File) -> File:
+        """Backfill column profiles for a file ingested before they were stored."""
+        FileService._rebuild_profiles(db, db_file.data_id, db_file.columns_json or {})
+        db.commit()
+        return db_file
+
+    @staticmethod
+    def _json_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` with values as stored in rows: JSON columns can't store
+        Timestamps (e.g. Excel date cells), so those become ISO strings."""
+        datetime_cols = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+        if not datetime_cols:
+            return df
+        return df.assign(**{
+            col: df[col].map(lambda v: None if pd.isna(v) else v.isoformat())
+            for col in datetime_cols
+        })
+
+    @staticmethod
+    def _row_records(df: pd.DataFrame, file_id: int) -> List[Dict[str, Any]]:
+        """Row insert parameters; ``to_dict('records')`` keeps per-column types
+        (``iterrows`` would upcast ints in all-numeric frames to floats)."""
+        records = FileService._json_frame(df).to_dict(orient='records')
+        return [{"file_id": file_id, "raw_json": record} for record in records]
+
+    @staticmethod
+    def _find_ingested(
+        db: Session, content_hash: str, filename: str, sheet: Optional[str] = None
+    ) -> Optional[File]:
+        """An existing file holding parsed rows for the same bytes, format and sheet."""
+        ext = os.path.splitext(filename)[1].lower()
+        candidates = db.query(File).filter(
+            File.content_hash == content_hash, File.data_file_id.is_(None)
+        ).order_by(File.id).all()
+        for candidate in candidates:
+            if (
+                os.path.splitext(candidate.filename)[1].lower() == ext
+                and (candidate.columns_json or {}).get("sheet") == (sheet or None)
+            ):
+                return candidate
+        return None
+
+    @staticmethod
+    def _share_ingested(
+        db: Session, source: File, user_id: int, filename: str, storage_path: str
+    ) -> File:
+        """Register a duplicate upload that reuses ``source``'s rows and metadata."""
+        db_file = File(
+            user_id=user_id,
+            filename=filename,
+            storage_path=storage_path,
+            row_count=source.row_count,
+            columns_json=source.columns_json,
+            version=source.version,
+            content_hash=source.content_hash,
+            data_file_id=source.id,
+            data_token=source.data_token
+        )
+        db.add(db_file)
+        db.commit()
+        db.refresh(db_file)
+        return db_file
+
+    @staticmethod
+    async def save_uploaded_file(
+        upload_file: UploadFile, user_id: int, db: Session, sheet: Optional[str] = None
+    ) -> File:
+        tmp_path = FileService._temp_upload_path(user_id)
+        content_hash = (await FileService._write_upload(upload_file, tmp_path)).content_hash
+        file_path = FileService._store_blob(tmp_path, content_hash, upload_file.filename)
+        
+        source = FileService._find_ingested(db, content_hash, upload_file.filename, sheet)
+        if source is not None:
+            db_file = FileService._share_ingested(db, source, user_id, upload_file.filename, file_path)
+            FileService._uploaded(db, db_file)
+            return db_file
         
         db_file = File(
             user_id=user_id,
             filename=upload_file.filename,
             storage_path=file_path,
-            row_count=len(df),
-            columns_json=columns_json
+            row_count=0,
+            content_hash=content_hash
         )
         db.add(db_file)
+        db.flush()
+        
+        # Rows are parsed and inserted chunk by chunk in one transaction
+        ingest = ChunkedIngest(
+            FileService.iter_file_chunks(file_path, upload_file.filename, sheet), db_file.id
+        )
+        ingest.insert_remaining(db)
+        FileService._store_profiles(db, db_file.id, ingest.profiles)
+        db_file.row_count = ingest.row_count
+        db_file.columns_json = ingest.columns_json(sheet)
+        
         db.commit()
         db.refresh(db_file)
+        FileService._uploaded(db, db_file)
+        
+        return db_file
+
+    @staticmethod
+    def _uploaded(db: Session, db_file: File) -> None:
+        """Reset listing totals and load the new rows into the dataset cache
+        in the background, so the dashboard opened right after an upload
+        doesn't wait for them."""
+        ListingService.invalidate_totals()
+        WarmupService.schedule(sync_sessionmaker(db.get_bind()), [db_file.id])
+
+    @staticmethod
+    def _sharing_files(db: Session, db_file: File) -> List[File]:
+        return db.query(File).filter(File.data_file_id == db_file.id).order_by(File.id).all()
+
+    @staticmethod
+    def _hand_over_rows(db: Session, db_file: File, sharers: List[File]) -> File:
+        """Move ``db_file``'s rows to the first file sharing them and point
+        the remaining sharers at it. Returns the new owner."""
+        heir = sharers[0]
+        db.execute(update(Row).where(Row.file_id == db_file.id).values(file_id=heir.id))
+        db.execute(update(RowZone).where(RowZone.file_id == db_file.id).values(file_id=heir.id))
+        db.execute(update(ColumnProfile).where(ColumnProfile.file_id == db_file.id).values(file_id=heir.id))
+        heir.data_file_id = None
+        for other in sharers[1:]:
+            other.data_file_id = heir.id
+        return heir
+
+    @staticmethod
+    def _copy_rows(db: Session, source_id: int, target_id: int) -> None:
+        db.execute(
+            insert(Row).from_select(
+                ["file_id", "raw_json"],
+                select(literal(target_id), Row.raw_json).where(Row.file_id == source_id).order_by(Row.id)
+            )
+        )
+
+    @staticmethod
+    def _detach_shared_rows(db: Session, db_file: File) -> None:
+        """Give ``db_file`` a private copy of its rows before they are modified."""
+        if db_file.data_file_id is not None:
+            FileService._copy_rows(db, db_file.data_file_id, db_file.id)
+            db_file.data_file_id = None
+        else:
+            sharers = FileService._sharing_files(db, db_file)
+            if not sharers:
+                return
+            heir = FileService._hand_over_rows(db, db_file, sharers)
+            FileService._copy_rows(db, heir.id, db_file.id)
+        # The copy is new rows as far as caches are concerned
+        db_file.data_token = new_data_token()
+        # Copies get new row ids, so their zone maps are rebuilt; profiles
+        # don't depend on ids and are stored by the caller once rows change
+        FileService._rebuild_zones(db, db_file.id, db_file.columns_json or {})
+
+    @staticmethod
+    async def append_uploaded_file(
+        file_id: int,
+        upload_file: UploadFile,
+        user_id: int,
+        is_admin: bool,
+        db: Session,
+        sheet: Optional[str] = None
+    ) -> Tuple[File, int]:
+        """Ingest only the rows of ``upload_file`` into an existing file.
+        The upload must have exactly the stored columns; types, row_count and
+        version are refreshed from the new rows without re-reading old ones.
+        Returns the updated file and the number of appended rows.
+        """
+        db_file = db.query(File).filter(File.id == file_id).first()
+        FileService._check_owner(db_file, user_id, is_admin, "modify")
         
-        for _, row in df.iterrows():
-            db_row = Row(
-                file_id=db_file.id,
-                raw_json=row.to_dict()
+        columns_json = db_file.columns_json or {}
+        has_stats = "stats" in columns_json
+        profiles = FileService._load_profiles(db, db_file.data_id)
+        tmp_path = FileService._temp_upload_path(user_id)
+        await FileService._write_upload(upload_file, tmp_path)
+        try:
+            ingest = ChunkedIngest(
+                FileService.iter_file_chunks(tmp_path, upload_file.filename, sheet),
+                db_file.id,
+                columns=columns_json.get('columns', []),
+                types=columns_json.get('types', {}),
+                dictionaries=columns_json.get('dictionaries', {}),
+                date_formats=columns_json.get('date_formats'),
+                stats=columns_json.get('stats'),
+                sketches=FileService._zone_sketches(db, db_file.data_id) if has_stats else None,
+                profiles=profiles
             )
-            db.add(db_row)
+            # The first chunk is checked against the stored columns before anything is written
+            batches = ingest.next_batches()
+            
+            # Copy-on-write: files deduplicated against this one keep the old rows
+            FileService._detach_shared_rows(db, db_file)
+            
+            ingest.insert(db, batches)
+            ingest.insert_remaining(db)
+        finally:
+            os.remove(tmp_path)
+        
+        if ingest.row_count == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file contains no rows")
         
+        previous_rows = db_file.row_count or 0
+        db_file.row_count = previous_rows + ingest.row_count
+        db_file.version = (db_file.version or 1) + 1
+        # Rows no longer match the uploaded bytes, so stop offering them for dedup
+        db_file.content_hash = None
+        # Assign a new dict so the JSON column change is detected
+        columns_json = {**columns_json, **ingest.columns_json()}
+        if not has_stats:
+            # Stats of rows ingested before they were tracked can't be merged; recompute all
+            columns_json["stats"] = FileService._rebuild_zones(db, db_file.id, columns_json)
+        if profiles or not previous_rows:
+            FileService._store_profiles(db, db_file.id, ingest.profiles)
+        else:
+            # Likewise for profiles: rows existed but none were profiled
+            FileService._rebuild_profiles(db, db_file.id, columns_json)
+        db_file.columns_json = columns_json
         db.commit()
+        db.refresh(db_file)
+        # Saved views are recomputed now rather than by their next reader
+        ViewService.refresh_views(db, db_file)
+        FileService._uploaded(db, db_file)
         
-        return db_file
+        return db_file, ingest.row_count
 
     @staticmethod
-    def delete_file(file_id: int, user_id: int, is_admin: bool, db: Session) -> bool:
-        db_file = db.query(File).filter(File.id == file_id).first()
+    async def save_uploaded_file_async(
+        upload_file: UploadFile, user_id: int, db: AsyncSession, sheet: Optional[str] = None
+    ) -> File:
+        tmp_path = FileService._temp_upload_path(user_id)
+        content_hash = (await FileService._write_upload(upload_file, tmp_path)).content_hash
+        file_path = FileService._store_blob(tmp_path, content_hash, upload_file.filename)
         
+        source = await db.run_sync(
+            FileService._find_ingested, content_hash, upload_file.filename, sheet
+        )
+        if source is not None:
+            db_file = await db.run_sync(
+                FileService._share_ingested, source, user_id, upload_file.filename, file_path
+            )
+            await db.run_sync(FileService._uploaded, db_file)
+            return db_file
+        
+        db_file = File(
+            user_id=user_id,
+            filename=upload_file.filename,
+            storage_path=file_path,
+            row_count=0,
+            content_hash=content_hash
+        )
+        db.add(db_file)
+        await db.flush()
+        
+        ingest = ChunkedIngest(
+            FileService.iter_file_chunks(file_path, upload_file.filename, sheet), db_file.id
+        )
+        while True:
+            # Parsing and type inference are CPU-bound; keep them off the event loop
+            batches = await run_in_threadpool(ingest.next_batches)
+            if batches is None:
+                break
+            await db.run_sync(ingest.insert, batches)
+        await db.run_sync(FileService._store_profiles, db_file.id, ingest.profiles)
+        db_file.row_count = ingest.row_count
+        db_file.columns_json = ingest.columns_json(sheet)
+        
+        await db.commit()
+        await db.refresh(db_file)
+        await db.run_sync(FileService._uploaded, db_file)
+        
+        return db_file
+
+    @staticmethod
+    def _check_owner(db_file: File, user_id: int, is_admin: bool, action: str = "delete") -> None:
         if not db_file:
             raise HTTPException(status_code=404, detail="File not found")
         
         if not is_admin and db_file.user_id != user_id:
-            raise HTTPException(status_code=403, detail="Not authorized to delete this file")
+            raise HTTPException(status_code=403, detail=f"Not authorized to {action} this file")
+
+    @staticmethod
+    def delete_file(file_id: int, user_id: int, is_admin: bool, db: Session) -> bool:
+        """Delete a file. Shared rows and blobs are reference-counted: rows
+        pass to a file still sharing them, and a blob is removed only when
+        no file points at it anymore."""
+        db_file = db.query(File).filter(File.id == file_id).first()
+        FileService._check_owner(db_file, user_id, is_admin)
         
-        if os.path.exists(db_file.storage_path):
-            os.remove(db_file.storage_path)
+        # Rows nobody else shares go with the file, and so do their cached copies
+        unshared_key = None
+        if db_file.data_file_id is None:
+            sharers = FileService._sharing_files(db, db_file)
+            if sharers:
+                FileService._hand_over_rows(db, db_file, sharers)
+            else:
+                unshared_key = db_file.data_key
         
+        storage_path = db_file.storage_path
         db.delete(db_file)
         db.commit()
+        ListingService.invalidate_totals()
+        if unshared_key is not None:
+            dataset_cache.invalidate(unshared_key)
+            ArrowStore.remove(unshared_key)
+        
+        still_referenced = db.query(File.id).filter(File.storage_path == storage_path).first()
+        if not still_referenced and os.path.exists(storage_path):
+            os.remove(storage_path)
         
         return True
+
+    @staticmethod
+    async def delete_file_async(
+        file_id: int, user_id: int, is_admin: bool, db: AsyncSession
+    ) -> bool:
+        # Pure bookkeeping; run the sync implementation on the async connection
+        return await db.run_sync(
+            lambda session: FileService.delete_file(file_id, user_id, is_admin, session)
+        )
@@ -0,0 +1,311 @@
+import numbers
+import warnings
+from functools import reduce
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from .dataset_cache import Dataset
+
+# Operators accepted in a column's filter object; a plain value means "contains"
+FILTER_OPERATORS = ("eq", "in", "prefix", "contains", "min", "max", "is_null")
+# Keys combining a list of filter objects
+FILTER_COMBINATORS = ("and", "or")
+# Sorts after any character a prefix can be followed by
+PREFIX_END = "\U0010ffff"
+
+
+class Condition(NamedTuple):
+    column: str
+    op: str
+    # eq/in: list of keys; prefix/contains: text; range: (low, high); is_null: bool
+    value: Any
+    # Key type compared on: "number", "date" or "text"
+    kind: str
+
+
+Node = Union[Condition, Tuple[str, List[Any]]]
+
+
+class HashIndex:
+    """Positions of each distinct key, for ``eq``/``in`` lookups."""
+
+    def __init__(self, keys: pd.Series):
+        codes, uniques = pd.factorize(keys)
+        self.uniques = pd.Index(uniques)
+        # Stable sort keeps positions ascending within each key
+        self.order = np.argsort(codes, kind='stable')
+        nulls = int((codes < 0).sum())
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self.starts = nulls + np.concatenate(([0], np.cumsum(counts)))
+
+    def lookup(self, keys: List[Any]) -> np.ndarray:
+        found = np.unique(self.uniques.get_indexer(keys))
+        found = found[found >= 0]
+        parts = [self.order[self.starts[i]:self.starts[i + 1]] for i in found]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+
+class SortedIndex:
+    """Non-null keys in sorted order, for range and prefix lookups."""
+
+    def __init__(self, keys: np.ndarray, valid: np.ndarray):
+        positions = np.flatnonzero(valid)
+        self.order = positions[np.argsort(keys[positions], kind='stable')]
+        self.keys = keys[self.order]
+
+    def between(self, low: Any, high: Any) -> np.ndarray:
+        start = 0 if low is None else np.searchsorted(self.keys, low, side='left')
+        end = len(self.keys) if high is None else np.searchsorted(self.keys, high, side='right')
+        return np.sort(self.order[start:end])
+
+    def prefix(self, prefix: str) -> np.ndarray:
+        start = np.searchsorted(self.keys, prefix, side='left')
+        end = np.searchsorted(self.keys, prefix + PREFIX_END, side='left')
+        return np.sort(self.order[start:end])
+
+
+class FilterService:
+    """Typed filters over a Dataset.
+
+    A filter object maps columns to a value (case-insensitive substring
+    match) or to an object of operators, all of which must hold. ``and``/
+    ``or`` keys combine lists of filter objects. ``eq``/``in`` compare typed
+    keys (numbers numerically, dates as timestamps, other values as text);
+    ``min``/``max`` compare numbers, or dates when the bounds are strings.
+    Conditions on unknown columns are ignored.
+
+    On cached datasets equality, prefix, range and null conditions are
+    answered from per-column hash/sorted indexes, and the remaining
+    conditions of an ``and`` only look at the rows those matched.
+    """
+
+    @staticmethod
+    def contains(series: pd.Series, pattern: str) -> pd.Series:
+        """Case-insensitive match of ``pattern`` against the values as text.
+        Nulls (and NaN) never match, as in the SQL engine."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Match each distinct value once and map the result through the codes
+            hits = series.cat.categories.astype(str).str.contains(pattern, case=False, na=False)
+            return pd.Series(np.append(hits, False)[series.cat.codes.to_numpy()], index=series.index)
+        return series.astype(str).str.contains(pattern, case=False, na=False) & series.notna()
+
+    @staticmethod
+    def numeric(series: pd.Series) -> pd.Series:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = pd.to_numeric(series.cat.categories.to_series(), errors='coerce').to_numpy(dtype=float)
+            return pd.Series(np.append(values, np.nan)[series.cat.codes.to_numpy()], index=series.index)
+        return pd.to_numeric(series, errors='coerce')
+
+    @staticmethod
+    def parse(filters: Any, types: Dict[str, str]) -> Node:
+        """Validated condition tree of a filter object (400 when malformed)."""
+        if not isinstance(filters, dict):
+            raise HTTPException(status_code=400, detail="Filters must be a JSON object")
+        nodes: List[Node] = []
+        for key, value in filters.items():
+            if key in FILTER_COMBINATORS and isinstance(value, list):
+                nodes.append((key, [FilterService.parse(child, types) for child in value]))
+            elif isinstance(value, dict):
+                nodes.extend(FilterService._parse_column(key, value, types.get(key, "string")))
+            else:
+                nodes.append(Condition(key, "contains", str(value), "text"))
+        return ("and", nodes)
+
+    @staticmethod
+    def _parse_column(col: str, operators: Dict[str, Any], col_type: str) -> List[Condition]:
+        unknown = [op for op in operators if op not in FILTER_OPERATORS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported filter operator '{unknown[0]}' on '{col}'. "
+                       f"Supported: {', '.join(FILTER_OPERATORS)}"
+            )
+        key_kind = col_type if col_type in ("number", "date") else "text"
+        conditions = []
+        for op, value in operators.items():
+            if op in ("eq", "in"):
+                values = value if op == "in" else [value]
+                if not isinstance(values, list) or any(isinstance(v, (dict, list)) for v in values):
+                    raise HTTPException(status_code=400, detail=f"Filter '{op}' on '{col}' needs a value or list of values")
+                keys = [FilterService._key(col, v, key_kind) for v in values if v is not None]
+                conditions.append(Condition(col, "in", [k for k in keys if k is not None], key_kind))
+            elif op in ("prefix", "contains"):
+                if isinstance(value, (dict, list)) or value is None:
+                    raise HTTPException(status_code=400, detail=f"Filter '{op}' on '{col}' needs a text value")
+                conditions.append(Condition(col, op, str(value).lower() if op == "prefix" else str(value), "text"))
+            elif op == "is_null":
+                if not isinstance(value, bool):
+                    raise HTTPException(status_code=400, detail=f"Filter 'is_null' on '{col}' needs true or false")
+                conditions.append(Condition(col, op, value, "text"))
+        if "min" in operators or "max" in operators:
+            conditions.append(FilterService._parse_range(col, operators.get("min"), operators.get("max"), col_type))
+        return conditions
+
+    @staticmethod
+    def _parse_range(col: str, low: Any, high: Any, col_type: str) -> Condition:
+        bounds = [bound for bound in (low, high) if bound is not None]
+        if all(isinstance(bound, numbers.Number) for bound in bounds):
+            return Condition(col, "range", (low, high), "number")
+        if col_type == "number":
+            low, high = (FilterService._number(col, bound) for bound in (low, high))
+            return Condition(col, "range", (low, high), "number")
+        low, high = (FilterService._date(col, bound) for bound in (low, high))
+        return Condition(col, "range", (low, high), "date")
+
+    @staticmethod
+    def _number(col: str, value: Any) -> Optional[float]:
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail=f"Invalid number '{value}' in filter on '{col}'")
+
+    @staticmethod
+    def _date(col: str, value: Any) -> Optional[np.datetime64]:
+        if value is None:
+            return None
+        try:
+            return pd.Timestamp(value).to_datetime64()
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail=f"Invalid date '{value}' in filter on '{col}'")
+
+    @staticmethod
+    def _key(col: str, value: Any, kind: str) -> Any:
+        """A filter value as a key comparable with the column's keys; None
+        for numbers that aren't numeric (they match nothing)."""
+        if kind == "number":
+            number = pd.to_numeric(pd.Series([value], dtype=object), errors='coerce').iloc[0]
+            return None if pd.isna(number) else float(number)
+        if kind == "date":
+            return FilterService._date(col, value)
+        return str(value)
+
+    @staticmethod
+    def keys(series: pd.Series, kind: str, date_format: Optional[str] = None) -> pd.Series:
+        """The column's values as comparable keys (nulls stay null)."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            if kind == "number":
+                return FilterService.numeric(series).astype(float)
+            series = series.astype(object)
+        if kind == "number":
+            return pd.to_numeric(series, errors='coerce').astype(float)
+        if kind == "date":
+            if pd.api.types.is_datetime64_any_dtype(series):
+                return series
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                return pd.to_datetime(series, format=date_format or 'mixed', errors='coerce')
+        return series.where(series.isna(), series.astype(str))
+
+    @staticmethod
+    def select(dataset: Dataset, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Ascending positions of the rows matching ``filters``, or None when
+        nothing is filtered."""
+        if not filters or dataset.frame.empty:
+            return None
+        tree = FilterService.parse(filters, dataset.columns_json.get('types', {}))
+        return FilterService._evaluate(dataset, tree, None)
+
+    @staticmethod
+    def _evaluate(dataset: Dataset, node: Node, candidates: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Positions (within ``candidates``, when given) matching ``node``;
+        None when it doesn't constrain anything."""
+        if isinstance(node, Condition):
+            if node.column not in dataset.frame.columns:
+                return None
+            return FilterService._condition(dataset, node, candidates)
+
+        combinator, children = node
+        if combinator == "and":
+            result = candidates
+            constrained = False
+            # Index lookups first, so scans only see the rows they matched
+            for child in sorted(children, key=lambda child: FilterService._cost(dataset, child)):
+                positions = FilterService._evaluate(dataset, child, result)
+                if positions is not None:
+                    result, constrained = positions, True
+            return result if constrained else None
+
+        parts = [
+            positions for positions in (FilterService._evaluate(dataset, child, candidates) for child in children)
+            if positions is not None
+        ]
+        return reduce(np.union1d, parts) if parts else None
+
+    @staticmethod
+    def _cost(dataset: Dataset, node: Node) -> int:
+        if not isinstance(node, Condition):
+            return 1
+        return 0 if dataset.indexed and node.op != "contains" else 2
+
+    @staticmethod
+    def _condition(dataset: Dataset, cond: Condition, candidates: Optional[np.ndarray]) -> np.ndarray:
+        if dataset.indexed and cond.op != "contains":
+            positions = FilterService._lookup(dataset, cond)
+            if candidates is None:
+                return positions
+            return np.intersect1d(positions, candidates, assume_unique=True)
+
+        series = dataset.frame[cond.column]
+        if candidates is not None:
+            series = series.iloc[candidates]
+        mask = FilterService._scan(dataset, cond, series)
+        base = np.arange(len(dataset.frame)) if candidates is None else candidates
+        return base[mask]
+
+    @staticmethod
+    def _date_format(dataset: Dataset, col: str) -> Optional[str]:
+        return dataset.columns_json.get('date_formats', {}).get(col)
+
+    @staticmethod
+    def _scan(dataset: Dataset, cond: Condition, series: pd.Series) -> np.ndarray:
+        if cond.op == "contains":
+            return FilterService.contains(series, cond.value).to_numpy()
+        if cond.op == "is_null":
+            nulls = series.isna().to_numpy()
+            return nulls if cond.value else ~nulls
+        if cond.op == "prefix":
+            text = FilterService.keys(series, "text")
+            return text.str.lower().str.startswith(cond.value).fillna(False).to_numpy(dtype=bool)
+        keys = FilterService.keys(series, cond.kind, FilterService._date_format(dataset, cond.column))
+        if cond.op == "in":
+            return keys.isin(cond.value).to_numpy()
+        low, high = cond.value
+        mask = keys.notna().to_numpy()
+        if low is not None:
+            mask &= (keys >= low).to_numpy()
+        if high is not None:
+            mask &= (keys <= high).to_numpy()
+        return mask
+
+    @staticmethod
+    def _lookup(dataset: Dataset, cond: Condition) -> np.ndarray:
+        col = cond.column
+        if cond.op == "in":
+            return dataset.index(("hash", col, cond.kind), lambda: HashIndex(
+                FilterService.keys(dataset.frame[col], cond.kind, FilterService._date_format(dataset, col))
+            )).lookup(cond.value)
+
+        if cond.op == "is_null":
+            nulls = dataset.index(("nulls", col), lambda: np.flatnonzero(dataset.frame[col].isna().to_numpy()))
+            if cond.value:
+                return nulls
+            return np.setdiff1d(np.arange(len(dataset.frame)), nulls, assume_unique=True)
+
+        if cond.op == "prefix":
+            def build() -> SortedIndex:
+                text = FilterService.keys(dataset.frame[col], "text")
+                valid = text.notna().to_numpy()
+                return SortedIndex(text.str.lower().to_numpy(dtype=object), valid)
+            return dataset.index(("sorted", col, "text"), build).prefix(cond.value)
+
+        def build_range() -> SortedIndex:
+            keys = FilterService.keys(dataset.frame[col], cond.kind, FilterService._date_format(dataset, col))
+            return SortedIndex(keys.to_numpy(), keys.notna().to_numpy())
+        return dataset.index(("sorted", col, cond.kind), build_range).between(*cond.value)
@@ -0,0 +1,172 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from ..models.file import File
+from ..models.user import User
+from ..core.config import settings
+
+# Greater than any string starting with a given prefix (the highest code point)
+PREFIX_END = "\U0010ffff"
+
+# Listing scope -> (total, monotonic time it was counted)
+_totals: Dict[Hashable, Tuple[int, float]] = {}
+_totals_lock = threading.Lock()
+
+
+class ListingService:
+    """Paginated listings of files (newest first) and users (by id).
+
+    Pages are read by keyset: a page's ``next_cursor`` holds the sort key
+    of its last item and the next page starts right after it, using the
+    ``(uploaded_at, id)`` indexes, so a page costs the same however deep
+    it is. ``page`` (offset) paging is kept for existing clients. Totals
+    are counted once per ``LIST_TOTAL_TTL_SECONDS`` and scope; uploads,
+    deletes and signups reset them in the process handling them, so
+    other workers may report a slightly stale total until it expires.
+    """
+
+    @staticmethod
+    def encode_cursor(*values: Any) -> str:
+        text = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+        return base64.urlsafe_b64encode(text.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str, size: int) -> List[Any]:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, binascii.Error):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if not isinstance(values, list) or len(values) != size:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return values
+
+    @staticmethod
+    def invalidate_totals() -> None:
+        with _totals_lock:
+            _totals.clear()
+
+    @staticmethod
+    def _cached_total(key: Hashable) -> Optional[int]:
+        with _totals_lock:
+            cached = _totals.get(key)
+        if cached is None or time.monotonic() - cached[1] >= settings.LIST_TOTAL_TTL_SECONDS:
+            return None
+        return cached[0]
+
+    @staticmethod
+    def _store_total(key: Hashable, total: int) -> int:
+        with _totals_lock:
+            _totals[key] = (total, time.monotonic())
+        return total
+
+    @staticmethod
+    def _count_query(query):
+        return select(func.count()).select_from(query.order_by(None).subquery())
+
+    @staticmethod
+    def _files_query(user_id: Optional[int], prefix: Optional[str]):
+        """Files of ``user_id`` (all files for None) whose name starts with
+        ``prefix``, case-insensitively. The prefix is matched as a range of
+        ``lower(filename)`` so the expression index serves it."""
+        query = select(File)
+        if user_id is not None:
+            query = query.where(File.user_id == user_id)
+        if prefix:
+            prefix = prefix.lower()
+            name = func.lower(File.filename)
+            query = query.where(name >= prefix, name < prefix + PREFIX_END)
+        return query
+
+    @staticmethod
+    def _files_page_query(query, page: int, page_size: int, cursor: Optional[str]):
+        query = query.order_by(File.uploaded_at.desc(), File.id.desc())
+        if cursor:
+            uploaded_at, file_id = ListingService.decode_cursor(cursor, 2)
+            try:
+                uploaded_at = datetime.fromisoformat(uploaded_at)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            if not isinstance(file_id, int):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.where(or_(
+                File.uploaded_at < uploaded_at, and_(File.uploaded_at == uploaded_at, File.id < file_id)
+            ))
+        else:
+            query = query.offset((page - 1) * page_size)
+        # One more than the page, to tell whether another page follows
+        return query.limit(page_size + 1)
+
+    @staticmethod
+    def _files_result(files: List[File], total: int, page_size: int) -> Dict[str, Any]:
+        next_cursor = None
+        if len(files) > page_size:
+            files = files[:page_size]
+            next_cursor = ListingService.encode_cursor(files[-1].uploaded_at, files[-1].id)
+        return {"total": total, "files": files, "next_cursor": next_cursor}
+
+    @staticmethod
+    def list_files(
+        db: Session,
+        user_id: Optional[int],
+        page: int = 1,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        prefix: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """A page of files, newest first, with the total and the cursor of
+        the next page (None on the last page)."""
+        query = ListingService._files_query(user_id, prefix)
+        key = ("files", user_id, (prefix or "").lower())
+        total = ListingService._cached_total(key)
+        if total is None:
+            total = ListingService._store_total(key, db.execute(ListingService._count_query(query)).scalar_one())
+        files = db.execute(ListingService._files_page_query(query, page, page_size, cursor)).scalars().all()
+        return ListingService._files_result(files, total, page_size)
+
+    @staticmethod
+    async def list_files_async(
+        db: AsyncSession,
+        user_id: Optional[int],
+        page: int = 1,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        prefix: Optional[str] = None
+    ) -> Dict[str, Any]:
+        query = ListingService._files_query(user_id, prefix)
+        key = ("files", user_id, (prefix or "").lower())
+        total = ListingService._cached_total(key)
+        if total is None:
+            counted = (await db.execute(ListingService._count_query(query))).scalar_one()
+            total = ListingService._store_total(key, counted)
+        page_query = ListingService._files_page_query(query, page, page_size, cursor)
+        files = (await db.execute(page_query)).scalars().all()
+        return ListingService._files_result(files, total, page_size)
+
+    @staticmethod
+    def list_users(db: Session, page: int = 1, page_size: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """A page of users by id, like ``list_files``."""
+        total = ListingService._cached_total(("users",))
+        if total is None:
+            total = ListingService._store_total(("users",), db.query(func.count(User.id)).scalar())
+        query = db.query(User).order_by(User.id)
+        if cursor:
+            (user_id,) = ListingService.decode_cursor(cursor, 1)
+            if not isinstance(user_id, int):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.filter(User.id > user_id)
+        else:
+            query = query.offset((page - 1) * page_size)
+        users = query.limit(page_size + 1).all()
+        next_cursor = None
+        if len(users) > page_size:
+            users = users[:page_size]
+            next_cursor = ListingService.encode_cursor(users[-1].id)
+        return {"total": total, "users": users, "next_cursor": next_cursor}
@@ -0,0 +1,136 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional
+
+from .stats_service import _scalar
+
+# Distinct non-null values kept as a column's samples
+PROFILE_SAMPLES = 5
+# Most frequent values served per column
+PROFILE_TOP_VALUES = 10
+# Counters kept per column for frequent values (Misra-Gries summary)
+PROFILE_TRACKED_VALUES = 100
+# Upper bound on histogram bins; bin widths are powers of two so chunks merge exactly
+HISTOGRAM_MAX_BINS = 32
+
+
+class ProfileService:
+    """Column profiles built chunk by chunk at ingest.
+
+    A profile's state is mergeable, so appends extend it without re-reading
+    stored rows:
+
+    - ``samples``: the first distinct non-null values, in row order
+    - ``top``: ``[value, count]`` counters of a Misra-Gries summary. Counts
+      are exact while a column has at most ``PROFILE_TRACKED_VALUES`` distinct
+      values, lower bounds otherwise (values too rare to stand out drop out)
+    - ``histogram``: ``{"width", "start", "counts"}`` over bins
+      ``[i * width, (i + 1) * width)`` starting at bin ``start``; ``None``
+      for columns without numbers
+    """
+
+    @staticmethod
+    def empty() -> Dict[str, Any]:
+        return {"samples": [], "top": [], "histogram": None}
+
+    @staticmethod
+    def update(
+        profile: Optional[Dict[str, Any]],
+        values: pd.Series,
+        numbers: Optional[pd.Series] = None
+    ) -> Dict[str, Any]:
+        """``profile`` extended with ``values`` (JSON-ready, as stored in rows)
+        and, for number columns, their numeric coercion ``numbers``."""
+        profile = profile or ProfileService.empty()
+        present = values.dropna()
+        return {
+            "samples": ProfileService._samples(profile["samples"], present),
+            "top": ProfileService._top(profile["top"], present),
+            "histogram": (
+                ProfileService._histogram(profile["histogram"], numbers)
+                if numbers is not None else profile["histogram"]
+            ),
+        }
+
+    @staticmethod
+    def _samples(samples: List[Any], present: pd.Series) -> List[Any]:
+        if len(samples) >= PROFILE_SAMPLES or present.empty:
+            return samples
+        samples = list(samples)
+        for value in pd.unique(present):
+            value = _scalar(value)
+            if value not in samples:
+                samples.append(value)
+                if len(samples) == PROFILE_SAMPLES:
+                    break
+        return samples
+
+    @staticmethod
+    def _top(top: List[List[Any]], present: pd.Series) -> List[List[Any]]:
+        if present.empty:
+            return top
+        counts = {value: count for value, count in top}
+        for value, count in present.value_counts(sort=False).items():
+            value = _scalar(value)
+            counts[value] = counts.get(value, 0) + int(count)
+        ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+        if len(ranked) > PROFILE_TRACKED_VALUES:
+            # Misra-Gries merge: subtract the first count that doesn't fit from every counter
+            threshold = ranked[PROFILE_TRACKED_VALUES][1]
+            ranked = [(value, count - threshold) for value, count in ranked[:PROFILE_TRACKED_VALUES]]
+            ranked = [(value, count) for value, count in ranked if count > 0]
+        return [[value, count] for value, count in ranked]
+
+    @staticmethod
+    def _histogram(histogram: Optional[Dict[str, Any]], numbers: pd.Series) -> Optional[Dict[str, Any]]:
+        numbers = numbers.to_numpy(dtype=np.float64, na_value=np.nan)
+        numbers = numbers[np.isfinite(numbers)]
+        if len(numbers) == 0:
+            return histogram
+
+        low, high = float(numbers.min()), float(numbers.max())
+        if histogram:
+            width = histogram["width"]
+            low = min(low, histogram["start"] * width)
+            high = max(high, (histogram["start"] + len(histogram["counts"]) - 1) * width)
+        else:
+            # Scaled before subtracting: high - low overflows near the float limits
+            span = high / HISTOGRAM_MAX_BINS - low / HISTOGRAM_MAX_BINS
+            width = 2.0 ** math.ceil(math.log2(span)) if span > 0 else 1.0
+            # No finer than the values' precision, which keeps bin numbers within int64
+            width = max(width, 2.0 ** (math.frexp(max(abs(low), abs(high)))[1] - 53))
+        while math.floor(high / width) - math.floor(low / width) + 1 > HISTOGRAM_MAX_BINS:
+            width *= 2
+        start = math.floor(low / width)
+        counts = np.zeros(math.floor(high / width) - start + 1, dtype=np.int64)
+
+        if histogram:
+            # Widths are powers of two apart, so old bin i lies inside new bin i // factor
+            factor = int(round(width / histogram["width"]))
+            old_bins = histogram["start"] + np.arange(len(histogram["counts"]))
+            np.add.at(counts, old_bins // factor - start, histogram["counts"])
+        np.add.at(counts, np.floor(numbers / width).astype(np.int64) - start, 1)
+        return {"width": width, "start": start, "counts": counts.tolist()}
+
+    @staticmethod
+    def describe(name: str, col_type: str, profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """The served form of a column's profile."""
+        profile = profile or ProfileService.empty()
+        histogram = profile["histogram"] if col_type == "number" else None
+        if histogram:
+            width, start = histogram["width"], histogram["start"]
+            histogram = {
+                "edges": [(start + i) * width for i in range(len(histogram["counts"]) + 1)],
+                "counts": histogram["counts"],
+            }
+        return {
+            "name": name,
+            "type": col_type,
+            "sample_values": profile["samples"],
+            "top_values": [
+                {"value": value, "count": count}
+                for value, count in profile["top"][:PROFILE_TOP_VALUES]
+            ],
+            "histogram": histogram,
+        }
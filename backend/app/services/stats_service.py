@@ -0,0 +1,201 @@
+import base64
+import math
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional, Tuple
+
+# Rows per zone map entry; filters skip whole zones that can't match
+ZONE_ROWS = 10000
+# HyperLogLog precision: 2**8 registers, ~6.5% standard error on distinct counts
+SKETCH_PRECISION = 8
+
+
+def _scalar(value: Any) -> Any:
+    """JSON-safe Python scalar; NaN/NaT become None."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class StatsService:
+    @staticmethod
+    def sketch(values: pd.Series) -> np.ndarray:
+        """HyperLogLog registers of the non-null values (as text)."""
+        registers = np.zeros(1 << SKETCH_PRECISION, dtype=np.uint8)
+        values = values.dropna()
+        if values.empty:
+            return registers
+        hashes = pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy(dtype=np.uint64)
+        buckets = (hashes >> np.uint64(64 - SKETCH_PRECISION)).astype(np.intp)
+        rest = hashes << np.uint64(SKETCH_PRECISION)
+        # Position of the first set bit in the remaining bits (1-based)
+        with np.errstate(divide='ignore'):
+            ranks = 64 - np.floor(np.log2(rest.astype(np.float64)))
+        ranks = np.minimum(np.nan_to_num(ranks, posinf=64), 64 - SKETCH_PRECISION + 1)
+        np.maximum.at(registers, buckets, ranks.astype(np.uint8))
+        return registers
+
+    @staticmethod
+    def estimate_distinct(registers: np.ndarray) -> int:
+        m = len(registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.exp2(-registers.astype(np.float64)))
+        zeros = int((registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    @staticmethod
+    def encode_sketch(registers: np.ndarray) -> str:
+        return base64.b64encode(registers.tobytes()).decode("ascii")
+
+    @staticmethod
+    def decode_sketch(encoded: str) -> np.ndarray:
+        return np.frombuffer(base64.b64decode(encoded), dtype=np.uint8).copy()
+
+    @staticmethod
+    def merge_sketches(sketches: Dict[str, np.ndarray], zone_sketches: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Fold a zone's sketches (encoded or raw registers) into ``sketches``."""
+        for col, registers in zone_sketches.items():
+            if isinstance(registers, str):
+                registers = StatsService.decode_sketch(registers)
+            sketches[col] = np.maximum(sketches[col], registers) if col in sketches else registers
+        return sketches
+
+    @staticmethod
+    def zone_stats(df: pd.DataFrame) -> Dict[str, List[Any]]:
+        """Numeric min/max per column, coerced exactly like range filters coerce
+        (``pd.to_numeric``); columns without numeric values are left out, as
+        no row in the zone can pass a range filter on them."""
+        stats = {}
+        for col in df.columns:
+            numbers = pd.to_numeric(df[col], errors='coerce')
+            if numbers.notna().any():
+                stats[col] = [_scalar(numbers.min()), _scalar(numbers.max())]
+        return stats
+
+    @staticmethod
+    def merge_column_stats(
+        stats: Optional[Dict[str, Dict[str, Any]]], update: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        merged = {col: dict(values) for col, values in (stats or {}).items()}
+        for col, values in update.items():
+            current = merged.get(col)
+            if current is None:
+                merged[col] = dict(values)
+                continue
+            current["nulls"] = current.get("nulls", 0) + values["nulls"]
+            for key, pick in (("min", min), ("max", max)):
+                candidates = [v for v in (current.get(key), values.get(key)) if v is not None]
+                try:
+                    current[key] = pick(candidates) if candidates else None
+                except TypeError:
+                    # A type change (e.g. number -> string) left incomparable bounds
+                    current[key] = None
+        return merged
+
+    @staticmethod
+    def with_distinct(
+        stats: Dict[str, Dict[str, Any]],
+        sketches: Dict[str, np.ndarray],
+        dictionaries: Optional[Dict[str, List[Any]]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Stats with ``distinct`` filled in: exact for dictionary-encoded
+        columns, a sketch estimate otherwise."""
+        dictionaries = dictionaries or {}
+        result = {}
+        for col, values in stats.items():
+            values = dict(values)
+            if col in dictionaries:
+                values["distinct"] = len(dictionaries[col])
+            elif col in sketches:
+                values["distinct"] = StatsService.estimate_distinct(sketches[col])
+            else:
+                values["distinct"] = 0
+            result[col] = values
+        return result
+
+    @staticmethod
+    def range_filters(filters: Optional[Dict[str, Any]], columns: List[str]) -> Dict[str, Tuple[Any, Any]]:
+        """``{"min": .., "max": ..}`` filters on known columns with numeric bounds."""
+        ranges = {}
+        for col, value in (filters or {}).items():
+            if col not in columns or not isinstance(value, dict):
+                continue
+            low, high = value.get('min'), value.get('max')
+            numeric = all(
+                bound is None or (isinstance(bound, (int, float)) and not isinstance(bound, bool))
+                for bound in (low, high)
+            )
+            if numeric and (low is not None or high is not None):
+                ranges[col] = (low, high)
+        return ranges
+
+    @staticmethod
+    def prune(
+        zones: List[Tuple[int, int, Dict[str, List[Any]]]],
+        ranges: Dict[str, Tuple[Any, Any]]
+    ) -> Optional[List[Tuple[int, int]]]:
+        """Row id ranges of the zones (ordered by first row id) whose min/max
+        could satisfy every range filter, merged where zones are adjacent.
+        None means nothing can be skipped."""
+        if not ranges or not zones:
+            return None
+
+        def matches(stats: Dict[str, List[Any]]) -> bool:
+            for col, (low, high) in ranges.items():
+                bounds = stats.get(col)
+                if bounds is None:
+                    return False
+                zone_min, zone_max = bounds
+                if (low is not None and zone_max < low) or (high is not None and zone_min > high):
+                    return False
+            return True
+
+        kept: List[Tuple[int, int]] = []
+        previous_kept = False
+        for first_row_id, last_row_id, stats in zones:
+            if matches(stats):
+                if previous_kept:
+                    kept[-1] = (kept[-1][0], last_row_id)
+                else:
+                    kept.append((first_row_id, last_row_id))
+                previous_kept = True
+            else:
+                previous_kept = False
+        if len(kept) == 1 and kept[0] == (zones[0][0], zones[-1][1]):
+            return None
+        return kept
+
+    @staticmethod
+    def aggregate(
+        columns_json: Optional[Dict[str, Any]],
+        row_count: int,
+        group_by: List[str],
+        metrics: List[Dict[str, str]],
+        filters: Optional[Dict[str, Any]],
+        search: Optional[str]
+    ) -> Optional[pd.DataFrame]:
+        """Whole-file ``count``/``min``/``max`` metrics answered from stored
+        stats, or None when the request needs a scan. ``min``/``max`` are
+        only served for number columns, whose stored bounds use the same
+        ``pd.to_numeric`` coercion as the scan."""
+        stats = (columns_json or {}).get('stats')
+        types = (columns_json or {}).get('types', {})
+        if not stats or not row_count or group_by or filters or search or not metrics:
+            return None
+
+        result = {}
+        for metric in metrics:
+            col, agg = metric['col'], metric['agg']
+            if col not in stats:
+                return None
+            if agg == 'count':
+                result[f"{col}_{agg}"] = row_count - stats[col]["nulls"]
+            elif agg in ('min', 'max') and types.get(col) == 'number':
+                result[f"{col}_{agg}"] = stats[col].get(agg)
+            elif agg != 'count':
+                return None
+        if not result:
+            return None
+        return pd.DataFrame([result])
@@ -0,0 +1,209 @@
+import numpy as np
+from typing import List, Dict, Any, Optional
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from ..models.file import File
+from ..models.saved_view import SavedView
+from ..core.metrics import timed
+from ..core import request_context
+from .data_service import DataService
+from .dataset_cache import Dataset
+from .duckdb_service import DuckDBService
+from .filter_service import FilterService
+
+# Stored row positions (SavedView.positions)
+POSITION_DTYPE = np.dtype("<i4")
+
+
+class ViewService:
+    """Saved views: a file's query (search, filters, sort, columns) stored
+    with the positions of its matching rows in view order.
+
+    Positions are computed when a view is created and again whenever the
+    file's version changes (appends refresh them right away; a view found
+    stale when read is refreshed first). A page of a view is the slice of
+    its positions for the page, read straight from the database, taken
+    from the dataset: no filtering or sorting per request.
+    """
+
+    @staticmethod
+    def _definition(
+        db_file: File,
+        search: Optional[str],
+        filters: Optional[Dict[str, Any]],
+        sort_by: Optional[str],
+        sort_dir: str,
+        columns: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        columns_json = db_file.columns_json or {}
+        known = columns_json.get('columns', [])
+        if filters:
+            FilterService.parse(filters, columns_json.get('types', {}))
+        if sort_by and sort_by not in known:
+            raise HTTPException(status_code=400, detail=f"Unknown sort column: {sort_by}")
+        unknown = [col for col in columns or [] if col not in known]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+        return {
+            "search": search or None,
+            "filters": filters or None,
+            "sort_by": sort_by or None,
+            "sort_dir": sort_dir,
+            "columns": columns or None,
+        }
+
+    @staticmethod
+    def materialize(dataset: Dataset, definition: Dict[str, Any]) -> np.ndarray:
+        """Positions of the rows matching the view, in view order; rows tied
+        on the sort column stay in file order."""
+        search, filters = definition.get("search"), definition.get("filters")
+        sort_by, sort_dir = definition.get("sort_by"), definition.get("sort_dir", "asc")
+        frame = dataset.frame
+        if frame.empty:
+            return np.empty(0, dtype=POSITION_DTYPE)
+        selected = DuckDBService.page(dataset, 1, len(frame), sort_by, sort_dir, search, filters)
+        if selected is not None:
+            return selected[0].astype(POSITION_DTYPE)
+
+        df = DataService._apply_search_and_filters(dataset, search, filters)
+        if sort_by and sort_by in df.columns:
+            with timed("data", "sort"):
+                df = df.sort_values(by=sort_by, ascending=sort_dir.lower() == "asc", kind="stable")
+        return frame.index.get_indexer(df.index).astype(POSITION_DTYPE)
+
+    @staticmethod
+    def _store(view: SavedView, positions: np.ndarray, version: int) -> None:
+        view.positions = positions.tobytes()
+        view.row_count = len(positions)
+        view.version = version
+        view.refreshed_at = func.now()
+
+    @staticmethod
+    def describe(view: SavedView) -> Dict[str, Any]:
+        return {
+            "id": view.id,
+            "file_id": view.file_id,
+            "name": view.name,
+            **view.definition,
+            "row_count": view.row_count,
+            "version": view.version,
+            "created_at": view.created_at,
+            "refreshed_at": view.refreshed_at,
+        }
+
+    @staticmethod
+    def create_view(
+        db: Session,
+        db_file: File,
+        user_id: int,
+        name: str,
+        search: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        sort_by: Optional[str] = None,
+        sort_dir: str = "asc",
+        columns: Optional[List[str]] = None
+    ) -> SavedView:
+        definition = ViewService._definition(db_file, search, filters, sort_by, sort_dir, columns)
+        view = SavedView(file_id=db_file.id, user_id=user_id, name=name, definition=definition)
+        dataset = DataService._load_file_dataset(db_file, db)
+        ViewService._store(view, ViewService.materialize(dataset, definition), db_file.version)
+        db.add(view)
+        db.commit()
+        db.refresh(view)
+        return view
+
+    @staticmethod
+    def list_views(db: Session, file_id: int) -> List[SavedView]:
+        return db.query(SavedView).filter(SavedView.file_id == file_id).order_by(SavedView.id).all()
+
+    @staticmethod
+    def _get_view(db: Session, file_id: int, view_id: int) -> SavedView:
+        view = db.get(SavedView, view_id)
+        if view is None or view.file_id != file_id:
+            raise HTTPException(status_code=404, detail="View not found")
+        return view
+
+    @staticmethod
+    def delete_view(db: Session, file_id: int, view_id: int) -> None:
+        db.delete(ViewService._get_view(db, file_id, view_id))
+        db.commit()
+
+    @staticmethod
+    def _stale_query(db_file: File):
+        return select(SavedView).where(
+            SavedView.file_id == db_file.id,
+            or_(SavedView.version.is_(None), SavedView.version != db_file.version)
+        )
+
+    @staticmethod
+    def refresh_views(db: Session, db_file: File) -> int:
+        """Recompute the file's views computed for an older version of its
+        rows; returns how many were refreshed."""
+        stale = db.execute(ViewService._stale_query(db_file)).scalars().all()
+        if not stale:
+            return 0
+        dataset = DataService._load_file_dataset(db_file, db)
+        for view in stale:
+            ViewService._store(view, ViewService.materialize(dataset, view.definition), db_file.version)
+        db.commit()
+        return len(stale)
+
+    @staticmethod
+    async def refresh_views_async(db: AsyncSession, db_file: File) -> int:
+        stale = (await db.execute(ViewService._stale_query(db_file))).scalars().all()
+        if not stale:
+            return 0
+        dataset = await DataService._load_file_dataset_async(db_file, db)
+        for view in stale:
+            positions = await run_in_threadpool(ViewService.materialize, dataset, view.definition)
+            ViewService._store(view, positions, db_file.version)
+        await db.commit()
+        return len(stale)
+
+    @staticmethod
+    def _slice_query(view_id: int, page: int, page_size: int):
+        """The page's positions, cut out of the stored ones by the database."""
+        width = POSITION_DTYPE.itemsize
+        return select(func.substr(SavedView.positions, (page - 1) * page_size * width + 1, page_size * width)).where(
+            SavedView.id == view_id
+        )
+
+    @staticmethod
+    def _page(view: SavedView, dataset: Dataset, chunk: Optional[bytes], page: int, page_size: int) -> Dict[str, Any]:
+        positions = np.frombuffer(chunk or b"", dtype=POSITION_DTYPE)
+        rows = dataset.frame.iloc[positions]
+        columns = view.definition.get("columns")
+        if columns:
+            rows = rows[[col for col in columns if col in rows.columns]]
+        request_context.note(view=view.id, rows=len(dataset.frame), matched=view.row_count)
+        return {"total": view.row_count, "page": page, "page_size": page_size, "rows": rows}
+
+    @staticmethod
+    def get_rows(db: Session, db_file: File, view_id: int, page: int = 1, page_size: int = 50) -> Dict[str, Any]:
+        """A page of the view's rows, like ``DataService.get_rows``."""
+        view = ViewService._get_view(db, db_file.id, view_id)
+        if view.version != db_file.version:
+            ViewService.refresh_views(db, db_file)
+        chunk = db.execute(ViewService._slice_query(view.id, page, page_size)).scalar()
+        dataset = DataService._load_file_dataset(db_file, db)
+        result = ViewService._page(view, dataset, chunk, page, page_size)
+        DataService._record_access(db, db_file)
+        return result
+
+    @staticmethod
+    async def get_rows_async(
+        db: AsyncSession, db_file: File, view_id: int, page: int = 1, page_size: int = 50
+    ) -> Dict[str, Any]:
+        view = await db.get(SavedView, view_id)
+        if view is None or view.file_id != db_file.id:
+            raise HTTPException(status_code=404, detail="View not found")
+        if view.version != db_file.version:
+            await ViewService.refresh_views_async(db, db_file)
+        chunk = (await db.execute(ViewService._slice_query(view.id, page, page_size))).scalar()
+        dataset = await DataService._load_file_dataset_async(db_file, db)
+        result = ViewService._page(view, dataset, chunk, page, page_size)
+        await DataService._record_access_async(db, db_file)
+        return result
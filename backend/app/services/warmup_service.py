@@ -0,0 +1,125 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import WARMUP_DATASETS
+from ..models.file import File
+from .arrow_store import ArrowStore
+from .data_service import DataService
+from .dataset_cache import dataset_cache
+
+logger = logging.getLogger(__name__)
+
+# Warm-ups run one at a time, off the request threads
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class WarmupService:
+    """Preloads files into the dataset cache before anyone asks for them.
+
+    After a restart the cache is empty, so the first query of every file
+    reads and decodes all of its rows. A warm-up loads the files most
+    likely to be queried next (most recently or most frequently accessed,
+    see ``DataService._record_access``) in a background thread, until
+    ``WARMUP_FILES`` are cached or the ``WARMUP_MEMORY_MB`` and
+    ``WARMUP_SECONDS`` budgets run out. Loads go through the regular load
+    path, so a query arriving meanwhile shares the warm-up's read.
+    """
+
+    @staticmethod
+    def candidates(db: Session, limit: int) -> List[File]:
+        """Files to warm, best first; one per stored dataset (``data_id``)."""
+        query = db.query(File).filter(File.row_count > 0)
+        if settings.WARMUP_ORDER == "frequent":
+            query = query.order_by(File.access_count.desc(), File.last_accessed_at.desc().nullslast())
+        else:
+            query = query.order_by(File.last_accessed_at.desc().nullslast(), File.uploaded_at.desc())
+        # Files sharing rows (duplicate uploads) warm the same dataset
+        files, seen = [], set()
+        for db_file in query.order_by(File.id.desc()).limit(limit * 4).all():
+            if db_file.data_id not in seen:
+                seen.add(db_file.data_id)
+                files.append(db_file)
+        return files[:limit]
+
+    @staticmethod
+    def _dataset_bytes(frame, path: Optional[str]) -> int:
+        """Memory a cached dataset takes: its mapped Arrow file plus heap."""
+        size = DataService._heap_bytes(frame)
+        if path and os.path.exists(path):
+            size += os.path.getsize(path)
+        return size
+
+    @staticmethod
+    def warm(session_factory: Callable[[], Session], file_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Load ``file_ids`` (by default the best candidates) into the
+        dataset cache within the warm-up budgets. Returns what was done."""
+        summary: Dict[str, Any] = {"loaded": [], "cached": [], "skipped": [], "failed": [], "bytes": 0}
+        limit = min(settings.WARMUP_FILES, settings.DATASET_CACHE_SIZE)
+        if limit <= 0:
+            return summary
+        deadline = time.monotonic() + settings.WARMUP_SECONDS
+        budget = settings.WARMUP_MEMORY_MB * 1024 * 1024
+
+        db = session_factory()
+        try:
+            if file_ids is None:
+                files = WarmupService.candidates(db, limit)
+            else:
+                files = db.query(File).filter(File.id.in_(file_ids)).all()
+            for db_file in files:
+                if dataset_cache.contains(db_file.data_key, db_file.version):
+                    result = "cached"
+                elif time.monotonic() >= deadline or summary["bytes"] >= budget:
+                    result = "skipped"
+                else:
+                    path = ArrowStore.path(db_file.data_key, db_file.version)
+                    estimate = os.path.getsize(path) if os.path.exists(path) else 0
+                    if summary["bytes"] + estimate > budget:
+                        result = "skipped"
+                    else:
+                        try:
+                            dataset = DataService._load_file_dataset(db_file, db)
+                        except Exception:
+                            logger.exception("Cache warm-up failed to load file %s", db_file.id)
+                            result = "failed"
+                        else:
+                            summary["bytes"] += WarmupService._dataset_bytes(dataset.frame, dataset.path)
+                            result = "loaded"
+                WARMUP_DATASETS.inc(result=result)
+                summary[result].append(db_file.id)
+        finally:
+            db.close()
+        logger.info(
+            "Cache warm-up: %d loaded (%.1f MB), %d already cached, %d skipped, %d failed",
+            len(summary["loaded"]), summary["bytes"] / (1024 * 1024),
+            len(summary["cached"]), len(summary["skipped"]), len(summary["failed"])
+        )
+        return summary
+
+    @staticmethod
+    def schedule(session_factory: Callable[[], Session], file_ids: Optional[List[int]] = None) -> Optional[Future]:
+        """Run ``warm`` in the background; None when warm-up is disabled."""
+        global _executor
+        if settings.WARMUP_FILES <= 0 or settings.DATASET_CACHE_SIZE <= 0:
+            return None
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warmup")
+        future = _executor.submit(WarmupService.warm, session_factory, file_ids)
+        future.add_done_callback(WarmupService._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future: Future) -> None:
+        """Nobody waits for a scheduled warm-up, so its errors are logged here."""
+        exc = future.exception()
+        if exc is not None:
+            logger.error("Cache warm-up failed", exc_info=exc)
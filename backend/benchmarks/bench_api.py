@@ -0,0 +1,259 @@
+"""Latency and peak memory of the data API on synthetic sales files.
+
+Files shaped like ``sample_data/sales_data.csv`` (Date, Product, Category,
+Region, Quantity, Revenue) are generated at each ``--rows`` size and sent
+through the FastAPI app in-process, against a temporary SQLite database and
+upload directory: upload, ``/rows`` pages (first and deep, with search,
+typed filters and sorting, and cold with no cached dataset),
+``/aggregate``, ``/columns`` and ``/export``.
+
+Every case reports the median/min/p95 latency of ``--repeat`` runs, the
+peak traced memory of one more run and the Server-Timing stages of the
+last run. Results are written as JSON; ``--compare`` checks them against
+an earlier file and exits with status 1 when a case's median got slower
+than ``--threshold`` times the baseline.
+
+    python benchmarks/bench_api.py --rows 10000 100000 1000000 --output bench.json
+    python benchmarks/bench_api.py --rows 10000 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SAMPLE_CSV = os.path.join(BACKEND_DIR, "..", "sample_data", "sales_data.csv")
+
+
+class Case(NamedTuple):
+    name: str
+    method: str
+    path: str
+    params: Optional[Dict[str, Any]] = None
+    body: Optional[Dict[str, Any]] = None
+    # Run before every request, untimed (e.g. dropping caches)
+    setup: Optional[Callable[[], None]] = None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query case")
+    parser.add_argument("--upload-repeat", type=int, default=1, help="Timed uploads per size")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced peak-memory run")
+    parser.add_argument("--output", default=None, help="Write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio counted as a regression")
+    return parser.parse_args()
+
+
+def make_csv(rows: int) -> bytes:
+    """``rows`` sales rows with the sample file's products, categories and regions."""
+    sample = pd.read_csv(SAMPLE_CSV)
+    products = sample.drop_duplicates("Product")
+    unit_price = (sample["Revenue"] / sample["Quantity"]).groupby(sample["Product"]).median()
+    rng = np.random.default_rng(0)
+    picks = rng.integers(0, len(products), rows)
+    quantity = rng.integers(1, 50, rows)
+    revenue = quantity * unit_price.reindex(products["Product"]).to_numpy()[picks]
+    frame = pd.DataFrame({
+        "Date": (pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 366, rows), unit="D")).strftime("%Y-%m-%d"),
+        "Product": products["Product"].to_numpy()[picks],
+        "Category": products["Category"].to_numpy()[picks],
+        "Region": rng.choice(sorted(sample["Region"].unique()), rows),
+        "Quantity": quantity,
+        "Revenue": np.where(rng.random(rows) < 0.02, np.nan, revenue.round(2)),
+    })
+    return frame.to_csv(index=False).encode()
+
+
+def query_cases(file_id: int, rows: int, drop_caches: Callable[[], None]) -> List[Case]:
+    base = f"/api/v1/data/{file_id}"
+    deep_page = max(rows // 50 - 1, 1)
+    filters = json.dumps({"region": {"in": ["North", "East"]}, "revenue": {"min": 1000}})
+    return [
+        Case("rows_cold", "GET", f"{base}/rows", {"page": 1, "page_size": 50}, setup=drop_caches),
+        Case("rows_first_page", "GET", f"{base}/rows", {"page": 1, "page_size": 50}),
+        Case("rows_deep_page", "GET", f"{base}/rows", {"page": deep_page, "page_size": 50}),
+        Case("rows_search", "GET", f"{base}/rows", {"search": "lap", "page_size": 50}),
+        Case("rows_filters", "GET", f"{base}/rows", {"filters": filters, "page_size": 50}),
+        Case("rows_sort_deep", "GET", f"{base}/rows", {
+            "sort_by": "revenue", "sort_dir": "desc", "page": deep_page // 2 or 1, "page_size": 50,
+        }),
+        Case("rows_filters_search_sort", "GET", f"{base}/rows", {
+            "filters": filters, "search": "e", "sort_by": "date", "page": 3, "page_size": 100,
+        }),
+        Case("aggregate_group_by", "POST", f"{base}/aggregate", body={
+            "group_by": ["region", "category"],
+            "metrics": [{"col": "revenue", "agg": "sum"}, {"col": "quantity", "agg": "avg"}],
+        }),
+        Case("aggregate_filtered", "POST", f"{base}/aggregate", body={
+            "group_by": ["product"], "metrics": [{"col": "revenue", "agg": "sum"}],
+            "filters": json.loads(filters),
+        }),
+        Case("columns", "GET", f"{base}/columns"),
+        Case("export_filtered", "GET", f"{base}/export", {"filters": filters}),
+    ]
+
+
+def server_timing(resp) -> Dict[str, float]:
+    stages = {}
+    for part in filter(None, resp.headers.get("server-timing", "").split(", ")):
+        name, _, duration = part.partition(";dur=")
+        stages[name] = float(duration)
+    return stages
+
+
+def measure(run: Callable[[], Any], repeat: int, memory: bool, setup: Optional[Callable[[], None]] = None):
+    """Latency summary of ``repeat`` runs plus the peak traced memory of one more."""
+    timings, resp = [], None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        resp = run()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    result = {
+        "runs": repeat,
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(timings[0], 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 3),
+        "stages_ms": server_timing(resp),
+        "peak_memory_mb": None,
+    }
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            run()
+            result["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> bool:
+    """Print median ratios against the baseline; True when nothing regressed."""
+    with open(baseline_path) as fh:
+        baseline = {(r["rows"], r["case"]): r for r in json.load(fh)["results"]}
+    ok = True
+    print(f"\ncompared with {baseline_path} (regression above {threshold:.2f}x)")
+    for result in results:
+        before = baseline.get((result["rows"], result["case"]))
+        if before is None:
+            continue
+        ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+        flag = "REGRESSION" if ratio > threshold else ""
+        ok = ok and not flag
+        print(f"  {result['rows']:>8} {result['case']:26s} {before['median_ms']:10.1f} -> "
+              f"{result['median_ms']:10.1f} ms  {ratio:5.2f}x {flag}")
+    return ok
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_api_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["UPLOAD_DIR"] = os.path.join(workdir, "uploads")
+    os.environ["MAX_UPLOAD_SIZE_MB"] = "0"
+    sys.path.insert(0, BACKEND_DIR)
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.core.database import Base, engine
+    from app.services.arrow_store import ArrowStore
+    from app.services.dataset_cache import dataset_cache
+    from app import models  # noqa: F401 - register tables
+
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+    resp = client.post("/api/v1/auth/signup", json={
+        "username": "bench", "email": "bench@example.com", "password": "benchpassword",
+    })
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    def request(case: Case):
+        resp = client.request(case.method, case.path, params=case.params, json=case.body, headers=headers)
+        assert resp.status_code == 200, f"{case.name}: {resp.status_code} {resp.text[:200]}"
+        return resp
+
+    results = []
+    for rows in args.rows:
+        content = make_csv(rows)
+        uploads = []
+
+        def upload():
+            # A distinct trailing newline count per upload keeps dedup from reusing earlier rows
+            body = content + b"\n" * len(uploads)
+            resp = client.post(
+                "/api/v1/files/upload", files={"file": ("sales_data.csv", body, "text/csv")}, headers=headers
+            )
+            assert resp.status_code == 200, resp.text[:200]
+            uploads.append(resp.json()["id"])
+            return resp
+
+        def record(name: str, result: Dict[str, Any]):
+            results.append({"rows": rows, "case": name, **result})
+            memory = f"{result['peak_memory_mb']:8.1f} MB" if result["peak_memory_mb"] is not None else ""
+            print(f"  {name:26s} median {result['median_ms']:10.1f} ms  p95 {result['p95_ms']:10.1f} ms  {memory}")
+
+        print(f"rows={rows} ({len(content) / 2**20:.1f} MB csv)")
+        record("upload", measure(upload, args.upload_repeat, not args.no_memory))
+        file_id = uploads[0]
+
+        def drop_caches():
+            dataset_cache.clear()
+            ArrowStore.remove(file_id)
+
+        for case in query_cases(file_id, rows, drop_caches):
+            record(case.name, measure(lambda: request(case), args.repeat, not args.no_memory, case.setup))
+
+        for extra in uploads:
+            client.delete(f"/api/v1/files/{extra}", headers=headers)
+        dataset_cache.clear()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"results written to {args.output}")
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Compare requests/second of the sync and async (ASYNC_DB) API variants.
+
+Runs both routers in-process against the same database and fires
+``--requests`` GETs at ``--concurrency`` in flight. Sync endpoints are
+bounded by the threadpool size; async endpoints only by the event loop,
+so the gap widens as database latency grows (use ``--database-url`` to
+point at PostgreSQL for realistic numbers).
+
+    python benchmarks/bench_async_db.py --concurrency 200 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SAMPLE_CSV = os.path.join(BACKEND_DIR, "..", "sample_data", "sales_data.csv")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument(
+        "--endpoint", default="files",
+        choices=["files", "file", "columns", "rows"],
+        help="Which DB-bound endpoint to hammer",
+    )
+    return parser.parse_args()
+
+
+async def run_load(app, path, headers, total, concurrency):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        failures = 0
+
+        async def one():
+            nonlocal failures
+            async with semaphore:
+                resp = await client.get(path, headers=headers)
+                if resp.status_code != 200:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+    return total / elapsed, failures
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_async_")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["UPLOAD_DIR"] = workdir
+    # Every in-flight sync request pins a pooled connection while it waits for
+    # a worker thread; size the pools to the concurrency so the sync variant is
+    # limited by threads instead of deadlocking on pool checkout.
+    os.environ.setdefault("DB_POOL_SIZE", str(args.concurrency))
+    sys.path.insert(0, BACKEND_DIR)
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api.v1 import build_api_router
+    from app.core.database import Base, engine, dispose_async_engine
+    from app import models  # noqa: F401 - register tables
+
+    Base.metadata.create_all(bind=engine)
+
+    apps = {}
+    for name, async_db in (("sync", False), ("async", True)):
+        app = FastAPI()
+        app.include_router(build_api_router(async_db=async_db), prefix="/api/v1")
+        apps[name] = app
+
+    with TestClient(apps["sync"]) as client:
+        resp = client.post("/api/v1/auth/signup", json={
+            "username": "bench", "email": "bench@example.com", "password": "benchpassword",
+        })
+        headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+        with open(SAMPLE_CSV, "rb") as fh:
+            resp = client.post("/api/v1/files/upload", files={"file": ("sales_data.csv", fh, "text/csv")}, headers=headers)
+        file_id = resp.json()["id"]
+
+    path = {
+        "files": "/api/v1/files",
+        "file": f"/api/v1/files/{file_id}",
+        "columns": f"/api/v1/data/{file_id}/columns",
+        "rows": f"/api/v1/data/{file_id}/rows",
+    }[args.endpoint]
+
+    async def bench():
+        results = {}
+        for name, app in apps.items():
+            # Warm up connections/pools before measuring
+            await run_load(app, path, headers, min(100, args.requests), args.concurrency)
+            results[name] = await run_load(app, path, headers, args.requests, args.concurrency)
+        await dispose_async_engine()
+        return results
+
+    results = asyncio.run(bench())
+    print(f"GET {path}  requests={args.requests} concurrency={args.concurrency}")
+    for name, (rps, failures) in results.items():
+        print(f"  {name:>5}: {rps:10.1f} req/s  failures={failures}")
+    print(f"  speedup: {results['async'][0] / results['sync'][0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
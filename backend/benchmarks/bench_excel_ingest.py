@@ -0,0 +1,117 @@
+"""Parse time and peak memory of an Excel upload: full read vs. streaming.
+
+Legacy path: ``pd.read_excel(engine='openpyxl')`` (whole workbook DOM).
+Streaming paths: ``FileService.iter_file_chunks`` over openpyxl read-only
+rows and, when installed, python-calamine. The same data as CSV is read
+chunked for reference. Each reader runs in a fresh process so peak RSS is
+its own.
+
+    python benchmarks/bench_excel_ingest.py --rows 200000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.file_service import FileService  # noqa: E402
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "Product": rng.choice(["Laptop", "Mouse", "Desk Chair", "Monitor"], rows),
+        "Category": rng.choice(["Electronics", "Furniture"], rows),
+        "Region": rng.choice(["North", "South", "East", "West"], rows),
+        "Quantity": rng.integers(1, 50, rows),
+        "Revenue": (rng.random(rows) * 5000).round(2),
+    })
+
+
+def write_workbook(df: pd.DataFrame, path: str) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sales")
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        sheet.append([row[0].to_pydatetime(), *row[1:]])
+    workbook.save(path)
+
+
+def legacy(path: str) -> int:
+    return len(pd.read_excel(path, engine="openpyxl"))
+
+
+def streaming(path: str) -> int:
+    return sum(len(chunk) for chunk in FileService.iter_file_chunks(path, os.path.basename(path)))
+
+
+def streaming_openpyxl(path: str) -> int:
+    rows = FileService._openpyxl_rows(path, None)
+    return sum(len(chunk) for chunk in FileService._frames_from_rows(rows, 50000))
+
+
+def run(fn, path: str, queue) -> None:
+    start = time.perf_counter()
+    rows = fn(path)
+    elapsed = time.perf_counter() - start
+    queue.put((rows, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def measure(fn, path: str):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=run, args=(fn, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    try:
+        import python_calamine  # noqa: F401
+        has_calamine = True
+    except ImportError:
+        has_calamine = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        df = make_frame(args.rows)
+        xlsx_path = os.path.join(tmp, "sales.xlsx")
+        csv_path = os.path.join(tmp, "sales.csv")
+        write_workbook(df, xlsx_path)
+        df.to_csv(csv_path, index=False)
+        print(f"rows={args.rows} xlsx={os.path.getsize(xlsx_path) / 2**20:.1f} MiB "
+              f"csv={os.path.getsize(csv_path) / 2**20:.1f} MiB")
+
+        cases = [
+            ("read_excel (openpyxl)", legacy, xlsx_path),
+            ("stream openpyxl read-only", streaming_openpyxl, xlsx_path),
+        ]
+        if has_calamine:
+            cases.append(("stream calamine", streaming, xlsx_path))
+        cases.append(("stream csv (reference)", streaming, csv_path))
+
+        baseline = None
+        for label, fn, path in cases:
+            rows, elapsed, peak_mib = measure(fn, path)
+            baseline = baseline or elapsed
+            print(f"  {label:28s} {elapsed:7.2f} s  {rows / elapsed:9.0f} rows/s  "
+                  f"peak RSS {peak_mib:6.0f} MiB  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
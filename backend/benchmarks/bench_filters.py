@@ -0,0 +1,84 @@
+"""Filter latency: legacy full-column scans vs. the indexed filter engine.
+
+Legacy path: the pre-index filter loop (``astype(str)`` substring match per
+string filter, ``pd.to_numeric`` per range bound) over the whole frame.
+Current path: ``FilterService.select`` on a cached Dataset, timed on the
+first query (index build) and on repeated queries (index lookups).
+
+    python benchmarks/bench_filters.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.dataset_cache import Dataset  # noqa: E402
+from app.services.filter_service import FilterService  # noqa: E402
+
+COLUMNS_JSON = {
+    "columns": ["order_id", "customer", "region", "revenue"],
+    "types": {"order_id": "number", "customer": "string", "region": "string", "revenue": "number"},
+}
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "order_id": np.arange(rows),
+        "customer": [f"CUST-{v:06d}" for v in rng.integers(0, rows // 10, rows)],
+        "region": pd.Categorical(rng.choice(["North", "South", "East", "West"], rows)),
+        "revenue": (rng.random(rows) * 5000).round(2),
+    })
+
+
+def legacy_filter(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    for col, value in filters.items():
+        if isinstance(value, dict):
+            if "min" in value:
+                df = df[pd.to_numeric(df[col], errors="coerce") >= value["min"]]
+            if "max" in value:
+                df = df[pd.to_numeric(df[col], errors="coerce") <= value["max"]]
+        else:
+            df = df[df[col].astype(str).str.contains(str(value), case=False, na=False)]
+    return df
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    customer = df["customer"].iloc[args.rows // 2]
+    cases = [
+        ("customer match", {"customer": customer}, {"customer": {"eq": customer}}),
+        ("revenue range 0.1%", {"revenue": {"min": 1000, "max": 1005}}, {"revenue": {"min": 1000, "max": 1005}}),
+        ("region + range", {"region": "north", "revenue": {"min": 4990}},
+         {"region": {"eq": "North"}, "revenue": {"min": 4990}}),
+    ]
+    print(f"rows={args.rows}")
+    dataset = Dataset(df, COLUMNS_JSON, indexed=True)
+    for label, legacy, typed in cases:
+        legacy_s = timed(lambda: legacy_filter(df, legacy))
+        first_s = timed(lambda: FilterService.select(dataset, typed))
+        repeat_s = min(timed(lambda: FilterService.select(dataset, typed)) for _ in range(5))
+        matches = len(FilterService.select(dataset, typed))
+        assert matches == len(legacy_filter(df, legacy))
+        print(f"  {label:20s} legacy {legacy_s * 1000:8.1f} ms   first (builds index) {first_s * 1000:8.1f} ms"
+              f"   indexed {repeat_s * 1000:7.2f} ms  ({legacy_s / repeat_s:.0f}x)  matches={matches}")
+
+
+if __name__ == "__main__":
+    main()
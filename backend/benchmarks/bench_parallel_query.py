@@ -0,0 +1,97 @@
+"""Scaling of partitioned query execution with the number of query workers.
+
+Runs search, filter scans and aggregates (with and without filters) through
+``DataService`` on a synthetic sales frame at each ``--workers`` count,
+serial first, and prints the best time of ``--repeat`` runs with the
+speedup over the serial run. Results are checked against the serial ones.
+Cached (indexed) datasets only scan partitioned after the index lookups;
+``--indexed`` benchmarks those instead of one-off frames.
+
+    python benchmarks/bench_parallel_query.py --rows 2000000 --workers 1 2 4 8 16
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.config import settings  # noqa: E402
+from app.services.data_service import DataService  # noqa: E402
+from app.services.dataset_cache import Dataset  # noqa: E402
+
+COLUMNS_JSON = {
+    "columns": ["order_id", "customer", "product", "region", "quantity", "revenue"],
+    "types": {
+        "order_id": "number", "customer": "string", "product": "string",
+        "region": "string", "quantity": "number", "revenue": "number",
+    },
+}
+METRICS = [
+    {"col": "revenue", "agg": "sum"}, {"col": "revenue", "agg": "std"},
+    {"col": "quantity", "agg": "avg"}, {"col": "quantity", "agg": "max"},
+]
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "order_id": np.arange(rows),
+        "customer": [f"CUST-{v:06d}" for v in rng.integers(0, rows // 10, rows)],
+        "product": pd.Categorical(rng.choice(["Laptop", "Lamp", "Mouse", "Desk Chair", "Monitor"], rows)),
+        "region": pd.Categorical(rng.choice(["North", "South", "East", "West"], rows)),
+        "quantity": rng.integers(1, 50, rows),
+        "revenue": np.where(rng.random(rows) < 0.02, np.nan, (rng.random(rows) * 5000).round(2)),
+    })
+
+
+def best_of(repeat: int, fn):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--indexed", action="store_true", help="Query a cached (indexed) dataset")
+    args = parser.parse_args()
+
+    frame = make_frame(args.rows)
+    dataset = Dataset(frame, COLUMNS_JSON, indexed=args.indexed)
+    filters = {"revenue": {"min": 1000}, "quantity": {"max": 40}}
+    cases = [
+        ("search", lambda: DataService._apply_search_and_filters(dataset, "cust-0001", None)),
+        ("filter scan", lambda: DataService._apply_search_and_filters(dataset, None, filters)),
+        ("aggregate", lambda: DataService._aggregate(dataset, [], METRICS, None, None)),
+        ("aggregate group_by", lambda: DataService._aggregate(dataset, ["region", "product"], METRICS, None, None)),
+        ("aggregate filtered", lambda: DataService._aggregate(dataset, ["region"], METRICS, filters, "lap")),
+    ]
+
+    print(f"rows={args.rows} cpu_count={os.cpu_count()} indexed={args.indexed}")
+    for label, run in cases:
+        run()  # builds indexes of cached datasets
+        baseline, expected = None, None
+        line = f"  {label:20s}"
+        for workers in args.workers:
+            settings.QUERY_WORKERS = workers
+            seconds, result = best_of(args.repeat, run)
+            if baseline is None:
+                baseline, expected = seconds, result
+            else:
+                pd.testing.assert_frame_equal(result, expected, check_exact=False)
+            line += f"  {workers:>2}w {seconds * 1000:8.1f} ms ({baseline / seconds:4.1f}x)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
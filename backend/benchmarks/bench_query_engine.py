@@ -0,0 +1,122 @@
+"""Query latency of the pandas path vs. the DuckDB engine (QUERY_ENGINE).
+
+A synthetic sales dataset is stored as a memory-mapped Arrow file, as
+cached datasets are, and queried through ``DataService`` with each engine:
+pages (first, filtered, sorted deep), search, aggregates and a filtered
+export. Reports the first run (DuckDB builds its Arrow table, pandas its
+filter indexes) and the best of ``--repeat`` later runs, and checks that
+both engines return the same result.
+
+    python benchmarks/bench_query_engine.py --rows 1000000 5000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.config import settings  # noqa: E402
+from app.services.arrow_store import ArrowStore  # noqa: E402
+from app.services.data_service import DataService  # noqa: E402
+from app.services.dataset_cache import Dataset  # noqa: E402
+
+COLUMNS_JSON = {
+    "columns": ["order_id", "date", "customer", "product", "region", "quantity", "revenue"],
+    "types": {
+        "order_id": "number", "date": "date", "customer": "string", "product": "string",
+        "region": "string", "quantity": "number", "revenue": "number",
+    },
+    "date_formats": {"date": "%Y-%m-%d"},
+}
+METRICS = [
+    {"col": "revenue", "agg": "sum"}, {"col": "revenue", "agg": "avg"},
+    {"col": "quantity", "agg": "max"}, {"col": "quantity", "agg": "count"},
+]
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "order_id": np.arange(rows),
+        "date": (pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 366, rows), unit="D")).strftime("%Y-%m-%d"),
+        "customer": [f"CUST-{v:06d}" for v in rng.integers(0, rows // 10, rows)],
+        "product": pd.Categorical(rng.choice(["Laptop", "Lamp", "Mouse", "Desk Chair", "Monitor"], rows)),
+        "region": pd.Categorical(rng.choice(["North", "South", "East", "West"], rows)),
+        "quantity": rng.integers(1, 50, rows),
+        "revenue": np.where(rng.random(rows) < 0.02, np.nan, (rng.random(rows) * 5000).round(2)),
+    })
+
+
+def cases(rows: int):
+    filters = {"region": {"in": ["North", "East"]}, "revenue": {"min": 1000}}
+    deep = rows // 100
+    return [
+        ("rows_first_page", lambda d: DataService._paginate(d, 1, 50, None, "asc", None, None)),
+        ("rows_filtered", lambda d: DataService._paginate(d, 2, 50, None, "asc", None, filters)),
+        ("rows_date_range", lambda d: DataService._paginate(
+            d, 1, 50, None, "asc", None, {"date": {"min": "2024-03-01", "max": "2024-03-31"}})),
+        # Rows tied on revenue may come in any order, so only the sorted values are compared
+        ("rows_sort_deep", lambda d: DataService._paginate(d, deep, 50, "revenue", "desc", None, None)["rows"]["revenue"]),
+        ("rows_search", lambda d: DataService._paginate(d, 1, 50, None, "asc", "cust-0001", None)),
+        ("aggregate_group_by", lambda d: DataService._aggregate(d, ["region", "product"], METRICS, None, None)),
+        ("aggregate_filtered", lambda d: DataService._aggregate(d, ["product"], METRICS, filters, "a")),
+        ("export_filtered", lambda d: DataService._to_csv(d, None, filters, None)),
+    ]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def same(left, right) -> bool:
+    if isinstance(left, dict):
+        return left["total"] == right["total"] and same(left["rows"], right["rows"])
+    if isinstance(left, pd.Series):
+        return left.tolist() == right.tolist()
+    if isinstance(left, pd.DataFrame):
+        try:
+            pd.testing.assert_frame_equal(
+                left.reset_index(drop=True), right.reset_index(drop=True), check_dtype=False, check_categorical=False
+            )
+        except AssertionError:
+            return False
+        return True
+    return left == right
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    settings.UPLOAD_DIR = tempfile.mkdtemp(prefix="bench_query_engine_")
+    for data_id, rows in enumerate(args.rows, 1):
+        assert ArrowStore.write(make_frame(rows), data_id, 1)
+        print(f"rows={rows}")
+        for label, run in cases(rows):
+            line, results = f"  {label:20s}", []
+            for engine in ("pandas", "duckdb"):
+                settings.QUERY_ENGINE = engine
+                # A fresh mapped dataset per engine, so each pays its own first-query cost
+                dataset = Dataset(ArrowStore.read(data_id, 1), COLUMNS_JSON, indexed=True, path=ArrowStore.path(data_id, 1))
+                first, result = timed(lambda: run(dataset))
+                best = min(timed(lambda: run(dataset))[0] for _ in range(args.repeat))
+                results.append((best, result))
+                line += f"  {engine} first {first * 1000:8.1f} ms  best {best * 1000:8.1f} ms"
+            (pandas_s, expected), (duckdb_s, result) = results
+            line += f"  ({pandas_s / duckdb_s:5.1f}x){'' if same(expected, result) else '  MISMATCH'}"
+            print(line)
+        ArrowStore.remove(data_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Per-request cost of serializing a /rows page: legacy vs. frame_response.
+
+Legacy path: ``to_dict(orient='records')`` -> ``RowsResponse`` validation
+-> FastAPI's response_model serialization -> stdlib JSON encoding.
+Fast path: ``core.serialization.frame_response`` (one pandas encoder pass).
+
+    python benchmarks/bench_serialization.py --page-size 500 --columns 6
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from app.core.serialization import frame_response  # noqa: E402
+from app.schemas.data import RowsResponse  # noqa: E402
+
+
+def make_page(page_size: int, columns: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    data = {
+        "date": pd.date_range("2024-01-01", periods=page_size).strftime("%Y-%m-%d"),
+        "product": rng.choice(["Laptop", "Mouse", "Desk Chair", "Monitor"], page_size),
+        "category": rng.choice(["Electronics", "Furniture"], page_size),
+        "region": rng.choice(["North", "South", "East", "West"], page_size),
+        "quantity": rng.integers(1, 50, page_size),
+        "revenue": rng.random(page_size) * 5000,
+    }
+    for i in range(max(0, columns - len(data))):
+        data[f"extra_{i}"] = rng.random(page_size)
+    return pd.DataFrame(data).iloc[:, :columns]
+
+
+async def legacy(df: pd.DataFrame, field) -> bytes:
+    result = RowsResponse(total=len(df), page=1, page_size=len(df), rows=df.to_dict(orient="records"))
+    content = await serialize_response(field=field, response_content=result)
+    return JSONResponse(content).body
+
+
+def fast(df: pd.DataFrame) -> bytes:
+    return frame_response(df, "rows", total=len(df), page=1, page_size=len(df)).body
+
+
+async def timeit(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+        if asyncio.iscoroutine(result):
+            await result
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--columns", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    df = make_page(args.page_size, args.columns)
+    field = create_response_field(name="response", type_=RowsResponse)
+
+    legacy_ms = asyncio.run(timeit(lambda: legacy(df, field), args.repeat))
+    fast_ms = asyncio.run(timeit(lambda: fast(df), args.repeat))
+    print(f"page_size={args.page_size} columns={args.columns} payload={len(fast(df)) / 1024:.1f} KiB")
+    print(f"  legacy: {legacy_ms:8.2f} ms/request")
+    print(f"  fast:   {fast_ms:8.2f} ms/request")
+    print(f"  saved:  {legacy_ms - fast_ms:8.2f} ms/request ({legacy_ms / fast_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Column type inference: legacy full-scan heuristic vs. sample-based inference.
+
+Legacy path: regex cleaning + ``pd.to_numeric`` + ``pd.to_datetime`` over
+every value of every object column (the heuristic before sampling).
+Current path: ``FileService.infer_column_types`` (stratified sample, early
+exit on a unanimous probe, one detected date format per column,
+column-parallel for wide frames).
+
+Both are scored against the known type of each synthetic column.
+
+    python benchmarks/bench_type_inference.py --rows 200000 --columns 32
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services import file_service  # noqa: E402
+from app.services.file_service import FileService  # noqa: E402
+
+
+def legacy_infer(df: pd.DataFrame) -> dict:
+    column_types = {}
+    numeric_candidates = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series):
+            column_types[col] = "number"
+            continue
+        if pd.api.types.is_datetime64_any_dtype(series):
+            column_types[col] = "date"
+            continue
+        s_str = series.astype(str).str.strip()
+        s_str = s_str.str.replace(r"[\s,]", "", regex=True)
+        s_str = s_str.str.replace(r"[\$€£]", "", regex=True)
+        s_str = s_str.str.replace(r"%$", "", regex=True)
+        num_ratio = pd.to_numeric(s_str, errors="coerce").notna().sum() / len(series)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            dt = pd.to_datetime(series, errors="coerce", infer_datetime_format=True)
+        dt_ratio = dt.notna().sum() / len(series)
+        numeric_candidates.append((col, num_ratio))
+        if num_ratio >= 0.5 and num_ratio >= dt_ratio:
+            column_types[col] = "number"
+        elif dt_ratio >= 0.5:
+            column_types[col] = "date"
+        else:
+            column_types[col] = "string"
+    if "number" not in column_types.values() and numeric_candidates:
+        best_col, best_ratio = max(numeric_candidates, key=lambda x: x[1])
+        if best_ratio >= 0.2:
+            column_types[best_col] = "number"
+    return column_types
+
+
+def make_columns(rows: int, rng) -> dict:
+    """Messy object columns as they come out of read_csv, with their true type."""
+    amounts = rng.random(rows) * 10000
+    dates = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1500, rows), unit="D")
+    words = np.array(["Laptop", "Mouse", "Desk Chair", "Monitor", "Keyboard", "n/a"])
+    missing = rng.random(rows) < 0.1
+
+    def with_gaps(values):
+        values = pd.Series(values, dtype=object)
+        values[missing] = None
+        return values
+
+    return {
+        "currency": ("number", with_gaps([f"${v:,.2f}" for v in amounts])),
+        "percent": ("number", with_gaps([f"{v % 100:.1f}%" for v in amounts])),
+        "thousands": ("number", with_gaps([f"{int(v):,}" for v in amounts * 100])),
+        "mostly_numeric": ("number", with_gaps(np.where(rng.random(rows) < 0.15, "N/A", amounts.round(2).astype(str)))),
+        "iso_date": ("date", with_gaps(dates.strftime("%Y-%m-%d"))),
+        "us_date": ("date", with_gaps(dates.strftime("%m/%d/%Y"))),
+        "timestamp": ("date", with_gaps(dates.strftime("%Y-%m-%d %H:%M:%S"))),
+        "product": ("string", with_gaps(rng.choice(words, rows))),
+        "code": ("string", with_gaps([f"SKU-{v:05d}" for v in rng.integers(0, 99999, rows)])),
+        "note": ("string", with_gaps(rng.choice(["ok", "late delivery", "refund 2024", "see ticket #12"], rows))),
+    }
+
+
+def make_frame(rows: int, columns: int) -> tuple:
+    rng = np.random.default_rng(0)
+    base = make_columns(rows, rng)
+    names = list(base)
+    data, truth = {}, {}
+    for i in range(columns):
+        kind, values = base[names[i % len(names)]]
+        name = f"{names[i % len(names)]}_{i}"
+        data[name] = values
+        truth[name] = kind
+    # Numeric columns arrive typed from read_csv; include a couple
+    data["quantity"] = rng.integers(1, 50, rows)
+    truth["quantity"] = "number"
+    return pd.DataFrame(data), truth
+
+
+def score(types: dict, truth: dict) -> float:
+    return sum(types[col] == kind for col, kind in truth.items()) / len(truth)
+
+
+def timed(fn, df):
+    start = time.perf_counter()
+    result = fn(df)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--columns", type=int, default=32)
+    args = parser.parse_args()
+
+    df, truth = make_frame(args.rows, args.columns)
+    print(f"rows={args.rows} object columns={args.columns} workers={file_service.INFER_WORKERS}")
+
+    legacy_types, legacy_s = timed(legacy_infer, df)
+    sampled_types, sampled_s = timed(FileService.infer_column_types, df)
+    workers = file_service.INFER_WORKERS
+    file_service.INFER_WORKERS = 1
+    serial_types, serial_s = timed(FileService.infer_column_types, df)
+    file_service.INFER_WORKERS = workers
+
+    print(f"  legacy full scan:    {legacy_s:8.2f} s  accuracy {score(legacy_types, truth):.0%}")
+    print(f"  sampled (serial):    {serial_s:8.2f} s  accuracy {score(serial_types, truth):.0%}")
+    print(f"  sampled (parallel):  {sampled_s:8.2f} s  accuracy {score(sampled_types, truth):.0%}")
+    print(f"  speedup vs legacy:   {legacy_s / sampled_s:8.1f}x")
+    disagreements = {col: (legacy_types[col], sampled_types[col]) for col in truth if legacy_types[col] != sampled_types[col]}
+    if disagreements:
+        print(f"  legacy vs sampled disagreements (legacy, sampled): {disagreements}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Range-filtered queries with and without zone-map pruning.
+
+A file with an increasing ``order_id`` column (as exports usually are) is
+ingested into a temporary SQLite database. The same ``{"min", "max"}``
+filter is run through ``DataService.get_rows`` with zone maps in place and
+with the file's zones removed (full scan). ``min``/``max`` aggregates are
+timed against the stored-stats fast path as well.
+
+    python benchmarks/bench_zone_pruning.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import Base  # noqa: E402
+from app.models import File, RowZone  # noqa: E402
+from app.services.data_service import DataService  # noqa: E402
+from app.services.file_service import ChunkedIngest  # noqa: E402
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "order_id": np.arange(rows),
+        "region": rng.choice(["North", "South", "East", "West"], rows),
+        "revenue": (rng.random(rows) * 5000).round(2),
+    })
+
+
+def ingest(db, df: pd.DataFrame) -> int:
+    db_file = File(filename="orders.csv", storage_path="orders.csv", user_id=1, row_count=0)
+    db.add(db_file)
+    db.flush()
+    ingest = ChunkedIngest(iter([df]), db_file.id)
+    ingest.insert_remaining(db)
+    db_file.row_count = ingest.row_count
+    db_file.columns_json = ingest.columns_json()
+    db.commit()
+    return db_file.id
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        file_id = ingest(db, make_frame(args.rows))
+
+        window = max(args.rows // 100, 1)
+        filters = {"order_id": {"min": args.rows // 2, "max": args.rows // 2 + window}}
+        query = lambda: DataService.get_rows(file_id, db, 1, 50, None, "asc", None, filters)  # noqa: E731
+        metrics = [{"col": "revenue", "agg": "min"}, {"col": "revenue", "agg": "max"}]
+        aggregate = lambda: DataService.aggregate_data(file_id, [], metrics, None, None, db)  # noqa: E731
+
+        pruned_s = timed(query)
+        stats_s = timed(aggregate)
+        total = query()["total"]
+
+        db.query(RowZone).delete()
+        columns_json = dict(db.get(File, file_id).columns_json)
+        columns_json.pop("stats")
+        db.get(File, file_id).columns_json = columns_json
+        db.commit()
+        assert query()["total"] == total
+        scan_s = timed(query)
+        agg_scan_s = timed(aggregate)
+
+        print(f"rows={args.rows} filter window={window} rows matched={total}")
+        print(f"  range filter, full scan:   {scan_s:8.3f} s")
+        print(f"  range filter, zone maps:   {pruned_s:8.3f} s  ({scan_s / pruned_s:.1f}x)")
+        print(f"  min/max aggregate, scan:   {agg_scan_s:8.3f} s")
+        print(f"  min/max aggregate, stats:  {stats_s:8.4f} s  ({agg_scan_s / stats_s:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
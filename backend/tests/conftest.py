@@ -6,3 +6,22 @@ CURRENT_DIR = os.path.dirname(__file__)
 BACKEND_DIR = os.path.abspath(os.path.join(CURRENT_DIR, '..'))
 if BACKEND_DIR not in sys.path:
     sys.path.insert(0, BACKEND_DIR)
+
+import pytest
+
+from app.core.config import settings
+from app.services import data_service
+from app.services.dataset_cache import dataset_cache
+from app.services.listing_service import ListingService
+
+
+@pytest.fixture(autouse=True)
+def clear_dataset_cache(monkeypatch):
+    # Each test starts a fresh database; cached datasets must not outlive it
+    dataset_cache.clear()
+    data_service._accesses.clear()
+    ListingService.invalidate_totals()
+    # Background warm-ups would make cache hits depend on timing
+    monkeypatch.setattr(settings, "WARMUP_FILES", 0)
+    yield
+    dataset_cache.clear()
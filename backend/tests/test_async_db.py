@@ -0,0 +1,161 @@
+import os
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("aiosqlite")
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.api.v1 import build_api_router
+from app.core.database import Base, get_db, get_async_db
+from app.core.config import settings
+from app import models  # Ensure models are imported so metadata has tables
+
+TEST_DB_PATH = "test_async.db"
+
+engine = create_engine(f"sqlite:///./{TEST_DB_PATH}", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    Base.metadata.create_all(bind=engine)
+
+    # The async engine is bound to the TestClient's event loop, so create it per test
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///./{TEST_DB_PATH}")
+    AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(build_api_router(async_db=True), prefix="/api/v1")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    @app.on_event("shutdown")
+    async def dispose():
+        await async_engine.dispose()
+
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        try:
+            os.remove(TEST_DB_PATH)
+        except FileNotFoundError:
+            pass
+
+
+def _auth_headers(client):
+    payload = {"username": "asyncuser", "email": "async@example.com", "password": "supersecurepassword"}
+    resp = client.post("/api/v1/auth/signup", json=payload)
+    assert resp.status_code == 201, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_async_signup_and_login(client):
+    _auth_headers(client)
+
+    resp = client.post("/api/v1/auth/login", json={"email": "async@example.com", "password": "supersecurepassword"})
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["user"]["username"] == "asyncuser"
+
+    resp = client.post("/api/v1/auth/login", json={"email": "async@example.com", "password": "wrongpassword"})
+    assert resp.status_code == 401
+
+
+def test_async_upload_query_and_delete(client):
+    headers = _auth_headers(client)
+    csv = b"Date,Product,Revenue\n2024-01-15,Laptop,4500\n2024-01-16,Mouse,300\n2024-01-17,Desk,2400\n"
+
+    resp = client.post("/api/v1/files/upload", files={"file": ("sales.csv", csv, "text/csv")}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    file_id = resp.json()["id"]
+    assert resp.json()["row_count"] == 3
+
+    resp = client.get("/api/v1/files", headers=headers)
+    assert resp.json()["total"] == 1
+
+    resp = client.get(f"/api/v1/data/{file_id}/rows", params={"sort_by": "revenue", "sort_dir": "desc"}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert [r["product"] for r in resp.json()["rows"]] == ["Laptop", "Desk", "Mouse"]
+
+    resp = client.post(
+        f"/api/v1/data/{file_id}/aggregate",
+        json={"metrics": [{"col": "revenue", "agg": "sum"}]},
+        headers=headers,
+    )
+    assert resp.json()["data"] == [{"revenue_sum": 7200}]
+
+    resp = client.get(f"/api/v1/data/{file_id}/rows", params={"filters": '{"revenue": {"min": 1000}}'}, headers=headers)
+    assert [r["product"] for r in resp.json()["rows"]] == ["Laptop", "Desk"]
+
+    resp = client.get(f"/api/v1/data/{file_id}/stats", headers=headers)
+    assert resp.status_code == 200, resp.text
+    revenue = next(col for col in resp.json()["columns"] if col["name"] == "revenue")
+    assert (revenue["min"], revenue["max"], revenue["nulls"]) == (300, 4500, 0)
+
+    # Files ingested before stats were tracked get them backfilled on first request
+    with TestingSessionLocal() as db:
+        db_file = db.get(models.File, file_id)
+        db_file.columns_json = {k: v for k, v in db_file.columns_json.items() if k != "stats"}
+        db.query(models.RowZone).delete()
+        db.commit()
+    resp = client.get(f"/api/v1/data/{file_id}/stats", headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert next(col for col in resp.json()["columns"] if col["name"] == "revenue")["max"] == 4500
+    with TestingSessionLocal() as db:
+        assert db.query(models.RowZone).count() == 1
+
+    with TestingSessionLocal() as db:
+        db.query(models.ColumnProfile).delete()
+        db.commit()
+    resp = client.get(f"/api/v1/data/{file_id}/columns", headers=headers)
+    assert resp.status_code == 200, resp.text
+    product = next(col for col in resp.json() if col["name"] == "product")
+    assert product["sample_values"] == ["Laptop", "Mouse", "Desk"]
+
+    view = client.post(f"/api/v1/data/{file_id}/views", json={"name": "big", "filters": {"revenue": {"min": 1000}},
+                       "sort_by": "revenue"}, headers=headers).json()
+    # Stale views are refreshed before their rows are read
+    with TestingSessionLocal() as db:
+        db.query(models.SavedView).update({"version": 0})
+        db.commit()
+    resp = client.get(f"/api/v1/data/{file_id}/rows", params={"view": view["id"]}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert [r["product"] for r in resp.json()["rows"]] == ["Desk", "Laptop"]
+
+    resp = client.delete(f"/api/v1/files/{file_id}", headers=headers)
+    assert resp.status_code == 200
+    assert client.get(f"/api/v1/files/{file_id}", headers=headers).status_code == 404
+    with TestingSessionLocal() as db:
+        assert db.query(models.SavedView).count() == 0
+
+
+def test_async_upload_warms_dataset_cache(client, monkeypatch):
+    from app.services import warmup_service
+    from app.services.dataset_cache import dataset_cache
+
+    monkeypatch.setattr(settings, "WARMUP_FILES", 2)
+    headers = _auth_headers(client)
+    csv = b"Date,Product,Revenue\n2024-01-15,Laptop,4500\n2024-01-16,Mouse,300\n"
+    resp = client.post("/api/v1/files/upload", files={"file": ("sales.csv", csv, "text/csv")}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    # Runs after the scheduled warm-up
+    warmup_service._executor.submit(lambda: None).result()
+    with TestingSessionLocal() as db:
+        assert dataset_cache.contains(db.get(models.File, resp.json()["id"]).data_key, 1)
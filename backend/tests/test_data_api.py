@@ -0,0 +1,1035 @@
+import io
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.core.database import Base, get_db
+from app.core.config import settings
+from app import models  # Ensure models are imported so metadata has tables
+from app.services import file_service
+from app.services.file_service import FileService
+from app.services.data_service import DataService
+
+SALES_CSV = (
+    b"Date,Product,Category,Region,Quantity,Revenue\n"
+    b"2024-01-15,Laptop,Electronics,North,5,4500\n"
+    b"2024-01-16,Mouse,Electronics,South,15,300\n"
+    b"2024-01-17,Desk Chair,Furniture,East,8,\n"
+    b"2024-01-18,Monitor,Electronics,West,12,3600\n"
+)
+
+
+@pytest.fixture(scope="function")
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    engine = create_engine(f"sqlite:///{tmp_path / 'test_data.db'}", connect_args={"check_same_thread": False})
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+        engine.dispose()
+
+
+@pytest.fixture
+def headers(client):
+    resp = client.post("/api/v1/auth/signup", json={
+        "username": "datauser", "email": "data@example.com", "password": "supersecurepassword",
+    })
+    assert resp.status_code == 201, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+@pytest.fixture
+def file_id(client, headers):
+    resp = client.post("/api/v1/files/upload", files={"file": ("sales.csv", SALES_CSV, "text/csv")}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    return resp.json()["id"]
+
+
+def _data_key(file_id):
+    from app.models.file import File
+
+    db = next(app.dependency_overrides[get_db]())
+    try:
+        return db.get(File, file_id).data_key
+    finally:
+        db.close()
+
+
+def test_rows_serializes_missing_values_as_null(client, headers, file_id):
+    resp = client.get(f"/api/v1/data/{file_id}/rows", params={"page_size": 2, "page": 2}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["total"] == 4
+    assert body["page"] == 2
+    assert body["page_size"] == 2
+    assert body["rows"][0]["product"] == "Desk Chair"
+    assert body["rows"][0]["revenue"] is None
+
+
+def test_rows_sort_and_filter(client, headers, file_id):
+    resp = client.get(
+        f"/api/v1/data/{file_id}/rows",
+        params={"sort_by": "quantity", "sort_dir": "desc", "filters": '{"category": "electronics"}'},
+        headers=headers,
+    )
+    body = resp.json()
+    assert body["total"] == 3
+    assert [r["product"] for r in body["rows"]] == ["Mouse", "Monitor", "Laptop"]
+
+
+def test_aggregate_group_by(client, headers, file_id):
+    resp = client.post(
+        f"/api/v1/data/{file_id}/aggregate",
+        json={"group_by": ["category"], "metrics": [{"col": "revenue", "agg": "sum"}, {"col": "quantity", "agg": "count"}]},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    data = {r["category"]: r for r in resp.json()["data"]}
+    assert data["Electronics"]["revenue_sum"] == 8400
+    assert data["Furniture"]["quantity_count"] == 1
+
+
+def test_rows_empty_page(client, headers, file_id):
+    resp = client.get(f"/api/v1/data/{file_id}/rows", params={"page": 10}, headers=headers)
+    assert resp.json()["rows"] == []
+
+
+def test_rows_columnar_layout(client, headers, file_id):
+    resp = client.get(
+        f"/api/v1/data/{file_id}/rows",
+        params={"layout": "columnar", "page_size": 2},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["total"] == 4
+    assert body["columns"] == ["date", "product", "category", "region", "quantity", "revenue"]
+    assert body["data"][1] == ["2024-01-16", "Mouse", "Electronics", "South", 15, 300]
+
+
+def test_floats_round_trip_exactly(client, headers):
+    from app.core.serialization import frame_to_json, ndjson_stream
+
+    values = [0.1 + 0.2, 1 / 3, 4500.0, None]
+    df = pd.DataFrame({"name": ["a", "b", "c", "d"], "x": values})
+    assert [row["x"] for row in json.loads(frame_to_json(df))] == values
+    assert [row[1] for row in json.loads(frame_to_json(df, "columnar"))["data"]] == values
+    assert [json.loads(line)["x"] for line in b"".join(ndjson_stream([df])).splitlines()] == values
+
+    csv = b"Name,X,Group\na,0.1,g\nb,0.2,g\nc,1,h\nd,0,h\ne,0,h\n"
+    new_id = client.post("/api/v1/files/upload", files={"file": ("x.csv", csv, "text/csv")}, headers=headers).json()["id"]
+    resp = client.post(f"/api/v1/data/{new_id}/aggregate", json={
+        "group_by": ["group"], "metrics": [{"col": "x", "agg": "sum"}, {"col": "x", "agg": "avg"}],
+    }, headers=headers)
+    assert resp.status_code == 200, resp.text
+    data = {row["group"]: row for row in resp.json()["data"]}
+    assert data["g"]["x_sum"] == 0.1 + 0.2 and data["h"]["x_avg"] == 1 / 3
+
+
+def test_rows_arrow_layout(client, headers, file_id):
+    pa = pytest.importorskip("pyarrow")
+    resp = client.get(f"/api/v1/data/{file_id}/rows", params={"layout": "arrow"}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert resp.headers["x-total"] == "4"
+
+    table = pa.ipc.open_stream(resp.content).read_all()
+    assert table.num_rows == 4
+    assert table.column("product").to_pylist()[0] == "Laptop"
+
+
+def test_large_responses_are_gzipped(client, headers, file_id):
+    resp = client.get(f"/api/v1/data/{file_id}/rows", params={"page_size": 1}, headers={**headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers  # below the size threshold
+
+    big_csv = SALES_CSV + b"".join(b"2024-02-%02d,Laptop,Electronics,North,1,100\n" % (i % 28 + 1) for i in range(200))
+    resp = client.post("/api/v1/files/upload", files={"file": ("big.csv", big_csv, "text/csv")}, headers=headers)
+    big_id = resp.json()["id"]
+
+    resp = client.get(f"/api/v1/data/{big_id}/rows", params={"page_size": 200}, headers={**headers, "Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert len(resp.json()["rows"]) == 200
+
+
+def test_append_rows_to_existing_file(client, headers, file_id):
+    extra = b"Date,Product,Category,Region,Quantity,Revenue\n2024-01-19,Keyboard,Electronics,North,3,150\n"
+    resp = client.post(f"/api/v1/files/{file_id}/append", files={"file": ("day2.csv", extra, "text/csv")}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["appended_rows"] == 1
+    assert body["row_count"] == 5
+
+    meta = client.get(f"/api/v1/files/{file_id}", headers=headers).json()
+    assert meta["row_count"] == 5
+    assert meta["columns_json"]["types"]["revenue"] == "number"
+
+    rows = client.get(f"/api/v1/data/{file_id}/rows", headers=headers).json()
+    assert rows["total"] == 5
+    assert rows["rows"][-1]["product"] == "Keyboard"
+
+
+def test_append_rejects_schema_mismatch(client, headers, file_id):
+    extra = b"Date,Product,Price\n2024-01-19,Keyboard,150\n"
+    resp = client.post(f"/api/v1/files/{file_id}/append", files={"file": ("bad.csv", extra, "text/csv")}, headers=headers)
+    assert resp.status_code == 400
+    assert "schema mismatch" in resp.json()["detail"].lower()
+    assert client.get(f"/api/v1/files/{file_id}", headers=headers).json()["row_count"] == 4
+
+
+def test_duplicate_upload_shares_parsed_rows(client, headers, file_id):
+    resp = client.post("/api/v1/files/upload", files={"file": ("copy.csv", SALES_CSV, "text/csv")}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    dup_id = resp.json()["id"]
+    assert dup_id != file_id
+    assert resp.json()["row_count"] == 4
+
+    rows = client.get(f"/api/v1/data/{dup_id}/rows", headers=headers).json()
+    assert [r["product"] for r in rows["rows"]] == ["Laptop", "Mouse", "Desk Chair", "Monitor"]
+
+    # Deleting the original hands its rows to the duplicate
+    assert client.delete(f"/api/v1/files/{file_id}", headers=headers).status_code == 200
+    assert client.get(f"/api/v1/data/{dup_id}/rows", headers=headers).json()["total"] == 4
+
+    # Appending to a shared file must not change the other sharer
+    third_id = client.post("/api/v1/files/upload", files={"file": ("third.csv", SALES_CSV, "text/csv")}, headers=headers).json()["id"]
+    extra = b"Date,Product,Category,Region,Quantity,Revenue\n2024-01-19,Keyboard,Electronics,North,3,150\n"
+    client.post(f"/api/v1/files/{third_id}/append", files={"file": ("day2.csv", extra, "text/csv")}, headers=headers)
+    assert client.get(f"/api/v1/data/{third_id}/rows", headers=headers).json()["total"] == 5
+    assert client.get(f"/api/v1/data/{dup_id}/rows", headers=headers).json()["total"] == 4
+
+
+def test_reused_file_id_never_serves_other_rows(client, headers, file_id):
+    from sqlalchemy import text
+    from app.services.dataset_cache import dataset_cache
+
+    assert client.get(f"/api/v1/data/{file_id}/rows", headers=headers).json()["total"] == 4
+    # Deleted by another worker: this process's cache and Arrow file stay
+    db = next(app.dependency_overrides[get_db]())
+    db.execute(text("DELETE FROM rows WHERE file_id = :id"), {"id": file_id})
+    db.execute(text("DELETE FROM files WHERE id = :id"), {"id": file_id})
+    db.commit()
+
+    resp = client.post("/api/v1/auth/signup", json={
+        "username": "bob", "email": "bob@example.com", "password": "supersecurepassword",
+    })
+    bob = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    csv = b"Name,Score\nbob1,1\nbob2,2\n"
+    bob_id = client.post("/api/v1/files/upload", files={"file": ("bob.csv", csv, "text/csv")}, headers=bob).json()["id"]
+    assert bob_id != file_id
+
+    # Even where an older table hands the id out again
+    for table in ("rows", "row_zones", "column_profiles", "files"):
+        column = "id" if table == "files" else "file_id"
+        db.execute(text(f"UPDATE {table} SET {column} = :old WHERE {column} = :new"), {"old": file_id, "new": bob_id})
+    db.commit()
+    db.close()
+    rows = client.get(f"/api/v1/data/{file_id}/rows", headers=bob).json()["rows"]
+    assert [row["name"] for row in rows] == ["bob1", "bob2"]
+    # Nor in a worker without it cached, which maps the shared Arrow files
+    dataset_cache.clear()
+    rows = client.get(f"/api/v1/data/{file_id}/rows", headers=bob).json()["rows"]
+    assert [row["name"] for row in rows] == ["bob1", "bob2"]
+
+
+def test_blob_removed_with_last_reference(client, headers, file_id):
+    dup_id = client.post("/api/v1/files/upload", files={"file": ("copy.csv", SALES_CSV, "text/csv")}, headers=headers).json()["id"]
+    blobs = list((Path(settings.UPLOAD_DIR) / "blobs").rglob("*.csv"))
+    assert len(blobs) == 1
+
+    client.delete(f"/api/v1/files/{file_id}", headers=headers)
+    assert blobs[0].exists()
+    client.delete(f"/api/v1/files/{dup_id}", headers=headers)
+    assert not blobs[0].exists()
+
+
+def test_oversized_uploads_rejected(client, headers, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE_MB", 1)
+    line = b"2024-02-01,Laptop,Electronics,North,1,100\n"
+
+    # Declared Content-Length far above the limit: rejected before the body is read
+    body = SALES_CSV + line * 30000
+    resp = client.post("/api/v1/files/upload", files={"file": ("big.csv", body, "text/csv")}, headers=headers)
+    assert resp.status_code == 413
+
+    # Just above the limit: rejected while streaming, partial file removed
+    body = SALES_CSV + line * (1024 * 1024 // len(line) + 100)
+    resp = client.post("/api/v1/files/upload", files={"file": ("big.csv", body, "text/csv")}, headers=headers)
+    assert resp.status_code == 413
+    assert not [p for p in Path(settings.UPLOAD_DIR).rglob("*") if p.is_file()]
+
+
+def test_malformed_uploads_rejected_before_parsing(client, headers):
+    resp = client.post("/api/v1/files/upload", files={"file": ("fake.xlsx", b"Date,Product\n1,2\n", "application/octet-stream")}, headers=headers)
+    assert resp.status_code == 400
+    assert "xlsx" in resp.json()["detail"]
+
+    resp = client.post("/api/v1/files/upload", files={"file": ("empty.csv", b"", "text/csv")}, headers=headers)
+    assert resp.status_code == 400
+
+    resp = client.post("/api/v1/files/upload", files={"file": ("notes.txt", b"hello", "text/plain")}, headers=headers)
+    assert resp.status_code == 400
+
+
+def _sales_workbook() -> bytes:
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    notes = workbook.active
+    notes.title = "Notes"
+    notes.append(["Exported from the sales system"])
+    sales = workbook.create_sheet("Sales")
+    sales.append(["Date", "Product", "Quantity", "Revenue"])
+    sales.append([datetime(2024, 1, 15), "Laptop", 5, 4500.5])
+    sales.append([None, None, None, None])
+    sales.append([datetime(2024, 1, 16), "Mouse", 15, None])
+    sales.append([datetime(2024, 1, 17), "Monitor", 12, 3600])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_excel_upload_streams_selected_sheet(client, headers, monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_CHUNK_ROWS", 2)
+    workbook = _sales_workbook()
+    resp = client.post(
+        "/api/v1/files/upload", data={"sheet": "Sales"},
+        files={"file": ("sales.xlsx", workbook, "application/octet-stream")}, headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["row_count"] == 3
+    assert resp.json()["columns"] == ["date", "product", "quantity", "revenue"]
+    xlsx_id = resp.json()["id"]
+
+    types = client.get(f"/api/v1/files/{xlsx_id}", headers=headers).json()["columns_json"]["types"]
+    assert types == {"date": "date", "product": "string", "quantity": "number", "revenue": "number"}
+    rows = client.get(f"/api/v1/data/{xlsx_id}/rows", headers=headers).json()["rows"]
+    assert rows[0] == {"date": "2024-01-15T00:00:00", "product": "Laptop", "quantity": 5, "revenue": 4500.5}
+    assert rows[1]["revenue"] is None
+
+    # The default (first) sheet holds different rows, so it must not be deduplicated against "Sales"
+    resp = client.post("/api/v1/files/upload", files={"file": ("sales.xlsx", workbook, "application/octet-stream")}, headers=headers)
+    assert resp.json()["columns"] == ["exported_from_the_sales_system"]
+
+    resp = client.post(
+        "/api/v1/files/upload", data={"sheet": "Missing"},
+        files={"file": ("sales.xlsx", workbook, "application/octet-stream")}, headers=headers,
+    )
+    assert resp.status_code == 400
+    assert "Notes, Sales" in resp.json()["detail"]
+
+
+def test_excel_readers_agree(tmp_path):
+    pytest.importorskip("python_calamine")
+    path = tmp_path / "sales.xlsx"
+    path.write_bytes(_sales_workbook())
+    frames = [
+        pd.concat(FileService._frames_from_rows(rows, 2), ignore_index=True)
+        for rows in (FileService._openpyxl_rows(str(path), "1"), FileService._calamine_rows(str(path), "1"))
+    ]
+    pd.testing.assert_frame_equal(frames[0], frames[1])
+
+
+def test_chunked_csv_ingest_matches_single_pass(client, headers, monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_CHUNK_ROWS", 3)
+    resp = client.post("/api/v1/files/upload", files={"file": ("sales.csv", SALES_CSV, "text/csv")}, headers=headers)
+    assert resp.json()["row_count"] == 4
+    meta = client.get(f"/api/v1/files/{resp.json()['id']}", headers=headers).json()
+    assert meta["columns_json"]["types"]["revenue"] == "number"
+    rows = client.get(f"/api/v1/data/{resp.json()['id']}/rows", headers=headers).json()["rows"]
+    assert [r["quantity"] for r in rows] == [5, 15, 8, 12]
+    assert rows[2]["revenue"] is None
+
+
+def test_low_cardinality_columns_dictionary_encoded(client, headers, file_id):
+    meta = client.get(f"/api/v1/files/{file_id}", headers=headers).json()
+    assert meta["columns_json"]["dictionaries"] == {"category": ["Electronics", "Furniture"]}
+
+    extra = b"Date,Product,Category,Region,Quantity,Revenue\n2024-01-19,Lamp,Lighting,North,3,150\n"
+    client.post(f"/api/v1/files/{file_id}/append", files={"file": ("day2.csv", extra, "text/csv")}, headers=headers)
+    meta = client.get(f"/api/v1/files/{file_id}", headers=headers).json()
+    assert meta["columns_json"]["dictionaries"]["category"] == ["Electronics", "Furniture", "Lighting"]
+
+    rows = client.get(
+        f"/api/v1/data/{file_id}/rows", params={"sort_by": "category", "sort_dir": "desc"}, headers=headers
+    ).json()["rows"]
+    assert [r["category"] for r in rows] == ["Lighting", "Furniture", "Electronics", "Electronics", "Electronics"]
+
+    rows = client.get(
+        f"/api/v1/data/{file_id}/rows", params={"filters": '{"category": "light"}', "search": "lamp"}, headers=headers
+    ).json()["rows"]
+    assert [r["product"] for r in rows] == ["Lamp"]
+
+    resp = client.post(f"/api/v1/data/{file_id}/aggregate", json={
+        "group_by": ["category"], "metrics": [{"col": "revenue", "agg": "sum"}],
+        "filters": {"region": "north"},
+    }, headers=headers)
+    assert resp.json()["data"] == [
+        {"category": "Electronics", "revenue_sum": 4500.0},
+        {"category": "Lighting", "revenue_sum": 150.0},
+    ]
+
+
+def test_dictionary_encoding_dropped_once_it_outgrows_the_cap(client, headers, file_id, monkeypatch):
+    from app.services.stats_service import StatsService
+
+    def estimate(values):
+        return StatsService.estimate_distinct(StatsService.sketch(pd.Series(values, dtype=object)))
+
+    monkeypatch.setattr(file_service, "CATEGORY_MAX_DISTINCT", 50)
+    monkeypatch.setattr(settings, "INGEST_CHUNK_ROWS", 100)
+    # Low-cardinality first chunk, then unique values
+    codes = ["x", "y", "z"] * 34 + [f"u{i}" for i in range(500)]
+    csv = ("Code,Qty\n" + "".join(f"{code},{i}\n" for i, code in enumerate(codes))).encode()
+    new_id = client.post("/api/v1/files/upload", files={"file": ("codes.csv", csv, "text/csv")}, headers=headers).json()["id"]
+    columns_json = client.get(f"/api/v1/files/{new_id}", headers=headers).json()["columns_json"]
+    assert "code" not in columns_json["dictionaries"]
+    assert columns_json["stats"]["code"]["distinct"] == estimate(codes)
+    stored = [
+        r["code"] for page in (1, 2)
+        for r in client.get(f"/api/v1/data/{new_id}/rows", params={"page": page, "page_size": 500}, headers=headers).json()["rows"]
+    ]
+    assert stored == codes
+
+    # Appends past the cap decode the rows stored so far
+    kinds = [f"Kind{i}" for i in range(60)]
+    extra = "Date,Product,Category,Region,Quantity,Revenue\n" + "".join(
+        f"2024-02-01,Item{i},{kind},North,1,10\n" for i, kind in enumerate(kinds)
+    )
+    resp = client.post(f"/api/v1/files/{file_id}/append", files={"file": ("more.csv", extra.encode(), "text/csv")}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    columns_json = client.get(f"/api/v1/files/{file_id}", headers=headers).json()["columns_json"]
+    assert columns_json["dictionaries"] == {}
+    assert columns_json["stats"]["category"]["distinct"] == estimate(["Electronics", "Furniture"] + kinds)
+    rows = client.get(f"/api/v1/data/{file_id}/rows", params={"page_size": 100}, headers=headers).json()["rows"]
+    assert [r["category"] for r in rows[:5]] == ["Electronics", "Electronics", "Furniture", "Electronics", "Kind0"]
+    rows = client.get(
+        f"/api/v1/data/{file_id}/rows", params={"filters": '{"category": "furniture"}'}, headers=headers
+    ).json()["rows"]
+    assert [r["product"] for r in rows] == ["Desk Chair"]
+
+
+def test_stats_endpoint(client, headers, file_id):
+    resp = client.get(f"/api/v1/data/{file_id}/stats", headers=headers)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["row_count"] == 4
+    stats = {col["name"]: col for col in body["columns"]}
+    assert stats["revenue"] == {
+        "name": "revenue", "type": "number", "min": 300, "max": 4500, "nulls": 1, "distinct": 3,
+    }
+    assert stats["date"]["min"].startswith("2024-01-15") and stats["date"]["max"].startswith("2024-01-18")
+    assert stats["product"]["min"] is None and stats["product"]["distinct"] == 4
+    assert stats["category"]["distinct"] == 2
+
+
+def test_range_filters_prune_zones(client, headers, monkeypatch):
+    monkeypatch.setattr(file_service, "ZONE_ROWS", 2)
+    resp = client.post("/api/v1/files/upload", files={"file": ("sales.csv", SALES_CSV, "text/csv")}, headers=headers)
+    zone_file = resp.json()["id"]
+    extra = b"Date,Product,Category,Region,Quantity,Revenue\n2024-01-19,Lamp,Lighting,North,30,150\n"
+    client.post(f"/api/v1/files/{zone_file}/append", files={"file": ("day2.csv", extra, "text/csv")}, headers=headers)
+
+    for filters, expected in (
+        ('{"quantity": {"min": 10}}', ["Mouse", "Monitor", "Lamp"]),
+        ('{"quantity": {"min": 13, "max": 20}}', ["Mouse"]),
+        ('{"quantity": {"min": 100}}', []),
+        ('{"revenue": {"max": 200}}', ["Lamp"]),
+    ):
+        body = client.get(f"/api/v1/data/{zone_file}/rows", params={"filters": filters}, headers=headers).json()
+        assert [r["product"] for r in body["rows"]] == expected, filters
+        assert body["total"] == len(expected)
+
+    resp = client.post(f"/api/v1/data/{zone_file}/aggregate", json={
+        "metrics": [{"col": "revenue", "agg": "sum"}], "filters": {"quantity": {"min": 100}},
+    }, headers=headers)
+    assert resp.json()["data"] == [{"revenue_sum": 0}]
+    csv_text = client.get(
+        f"/api/v1/data/{zone_file}/export", params={"filters": '{"quantity": {"min": 100}}'}, headers=headers
+    ).text
+    assert csv_text.strip() == "date,product,category,region,quantity,revenue"
+
+
+def test_min_max_count_answered_from_stats(client, headers, file_id, monkeypatch):
+    def no_scan(*args, **kwargs):
+        raise AssertionError("rows were scanned")
+
+    monkeypatch.setattr(DataService, "_load_file_dataset", no_scan)
+    resp = client.post(f"/api/v1/data/{file_id}/aggregate", json={"metrics": [
+        {"col": "revenue", "agg": "min"}, {"col": "revenue", "agg": "max"}, {"col": "revenue", "agg": "count"},
+    ]}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["data"] == [{"revenue_min": 300, "revenue_max": 4500, "revenue_count": 3}]
+
+
+def test_columns_served_from_profiles(client, headers, file_id, monkeypatch):
+    extra = (
+        b"Date,Product,Category,Region,Quantity,Revenue\n"
+        b"2024-01-19,Laptop,Electronics,North,30,4700\n"
+        b"2024-01-20,Laptop,Electronics,East,2,\n"
+    )
+    client.post(f"/api/v1/files/{file_id}/append", files={"file": ("day2.csv", extra, "text/csv")}, headers=headers)
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("rows were scanned")
+
+    monkeypatch.setattr(DataService, "_frame_from_rows", no_scan)
+    resp = client.get(f"/api/v1/data/{file_id}/columns", headers=headers)
+    assert resp.status_code == 200, resp.text
+    columns = {col["name"]: col for col in resp.json()}
+    assert list(columns) == ["date", "product", "category", "region", "quantity", "revenue"]
+
+    product = columns["product"]
+    assert product["sample_values"] == ["Laptop", "Mouse", "Desk Chair", "Monitor"]
+    assert product["top_values"][0] == {"value": "Laptop", "count": 3}
+    assert product["histogram"] is None
+    assert columns["category"]["top_values"] == [
+        {"value": "Electronics", "count": 5}, {"value": "Furniture", "count": 1},
+    ]
+
+    # The missing revenue is skipped in samples; the histogram covers all numbers
+    revenue = columns["revenue"]
+    assert 300 in revenue["sample_values"] and None not in revenue["sample_values"]
+    histogram = revenue["histogram"]
+    assert sum(histogram["counts"]) == 4
+    assert histogram["edges"][0] <= 300 and histogram["edges"][-1] > 4700
+    assert len(histogram["edges"]) == len(histogram["counts"]) + 1
+
+
+@pytest.mark.parametrize("chunks", [
+    [[-1.7e308, 1.7e308]],
+    [[1e300, 1e300], [1e300]],
+    [[1e18, 1e18 + 4096], [-5.0]],
+    [[0.0, 0.0]],
+])
+def test_histogram_of_extreme_numbers(chunks):
+    from app.services.profile_service import ProfileService
+
+    profile = ProfileService.empty()
+    for chunk in chunks:
+        numbers = pd.Series(chunk)
+        profile = ProfileService.update(profile, numbers.astype(object), numbers)
+    histogram = ProfileService.describe("x", "number", profile)["histogram"]
+    assert sum(histogram["counts"]) == sum(len(chunk) for chunk in chunks)
+    assert histogram["edges"][0] <= min(map(min, chunks)) and histogram["edges"][-1] > max(map(max, chunks))
+
+
+def test_chunked_profiles_match_single_pass(client, headers, file_id, monkeypatch):
+    single = client.get(f"/api/v1/data/{file_id}/columns", headers=headers).json()
+    monkeypatch.setattr(settings, "INGEST_CHUNK_ROWS", 1)
+    # A trailing blank line changes the bytes, so the same rows are ingested again, one per chunk
+    resp = client.post("/api/v1/files/upload", files={"file": ("copy.csv", SALES_CSV + b"\n", "text/csv")}, headers=headers)
+    assert client.get(f"/api/v1/files/{resp.json()['id']}", headers=headers).json()["row_count"] == 4
+    chunked = client.get(f"/api/v1/data/{resp.json()['id']}/columns", headers=headers).json()
+    # Bin widths depend on the first chunk's spread, but every value is counted exactly once
+    for col in single + chunked:
+        col["histogram"] = col["histogram"] and sum(col["histogram"]["counts"])
+    assert chunked == single
+
+
+def test_typed_filters_on_cached_dataset(client, headers, file_id, monkeypatch):
+    assert client.get(f"/api/v1/data/{file_id}/rows", headers=headers).json()["total"] == 4
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("rows were read again")
+
+    # The first request cached the parsed file; filters are answered from it
+    monkeypatch.setattr(DataService, "_frame_from_rows", no_scan)
+    for filters, expected in (
+        ('{"product": {"eq": "Mouse"}}', ["Mouse"]),
+        ('{"category": {"in": ["Furniture", "Toys"]}}', ["Desk Chair"]),
+        ('{"product": {"prefix": "m"}, "revenue": {"is_null": false}}', ["Mouse", "Monitor"]),
+        ('{"date": {"min": "2024-01-16", "max": "2024-01-17"}}', ["Mouse", "Desk Chair"]),
+        ('{"or": [{"revenue": {"is_null": true}}, {"quantity": {"eq": 5}}]}', ["Laptop", "Desk Chair"]),
+    ):
+        body = client.get(f"/api/v1/data/{file_id}/rows", params={"filters": filters}, headers=headers).json()
+        assert [r["product"] for r in body["rows"]] == expected, filters
+
+    resp = client.get(f"/api/v1/data/{file_id}/rows", params={"filters": '{"product": {"like": "M"}}'}, headers=headers)
+    assert resp.status_code == 400
+    assert "Unsupported filter operator 'like'" in resp.json()["detail"]
+
+
+def test_datasets_shared_through_arrow_files(client, headers, file_id, monkeypatch):
+    from app.core.deps import get_current_admin_user, get_current_user
+    from app.services.arrow_store import ArrowStore
+    from app.services.dataset_cache import dataset_cache
+
+    first = client.get(f"/api/v1/data/{file_id}/rows", headers=headers).json()
+    stored = list((Path(settings.UPLOAD_DIR) / "datasets").glob("*.arrow"))
+    key = _data_key(file_id)
+    assert [p.name for p in stored] == [f"{key}-v1.arrow"]
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("rows were read again")
+
+    # Another worker (empty in-process cache) maps the file instead of reading rows
+    dataset_cache.clear()
+    monkeypatch.setattr(DataService, "_frame_from_rows", no_scan)
+    assert client.get(f"/api/v1/data/{file_id}/rows", headers=headers).json() == first
+    frame = dataset_cache.get(key, 1).frame
+    assert not frame["quantity"].to_numpy().flags.writeable
+
+    assert client.get("/api/v1/admin/datasets", headers=headers).status_code == 403
+    app.dependency_overrides[get_current_admin_user] = get_current_user
+    try:
+        report = client.get("/api/v1/admin/datasets", headers=headers).json()
+    finally:
+        app.dependency_overrides.pop(get_current_admin_user)
+    [entry] = report["datasets"]
+    assert entry["data_key"] == key and entry["rows"] == 4
+    assert entry["file_bytes"] == stored[0].stat().st_size
+    assert entry["path"] == ArrowStore.path(key, 1)
+
+    client.delete(f"/api/v1/files/{file_id}", headers=headers)
+    assert not stored[0].exists()
+
+
+def test_arrow_store_round_trip(tmp_path, monkeypatch):
+    from app.services.arrow_store import ArrowStore
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    frame = pd.DataFrame({
+        "id": [1, 2, 3],
+        "score": [1.5, float("nan"), 3.0],
+        "count": pd.Series([1, None, 3], dtype=object),
+        "name": ["a", None, "c"],
+        "region": pd.Categorical(["North", "South", "North"], categories=["North", "South"]),
+    })
+    assert ArrowStore.write(frame, "a", 1)
+    pd.testing.assert_frame_equal(ArrowStore.read("a", 1), frame)
+    assert ArrowStore.read("a", 2) is None
+
+    # Newer versions replace older files; mixed columns are not stored
+    assert ArrowStore.write(frame, "a", 2) and ArrowStore.read("a", 1) is None
+    assert not ArrowStore.write(pd.DataFrame({"mixed": [1, "a"]}), "b", 1)
+    monkeypatch.setattr(settings, "ARROW_CACHE", False)
+    assert not ArrowStore.write(frame, "c", 1) and ArrowStore.read("a", 2) is None
+
+
+def test_metrics_and_server_timing(client, headers, monkeypatch):
+    from app.core import metrics
+
+    metrics.reset()
+    resp = client.post("/api/v1/files/upload", files={"file": ("sales.csv", SALES_CSV, "text/csv")}, headers=headers)
+    timing = dict(part.split(";dur=") for part in resp.headers["server-timing"].split(", "))
+    assert {"write", "parse", "infer", "encode", "insert", "total"} <= set(timing)
+
+    file_id = resp.json()["id"]
+    for _ in range(2):
+        resp = client.get(f"/api/v1/data/{file_id}/rows", params={"sort_by": "revenue", "search": "o"}, headers=headers)
+    assert {"load", "filter", "sort", "serialize", "total"} <= set(
+        part.split(";")[0] for part in resp.headers["server-timing"].split(", ")
+    )
+
+    # Local scrapers only by default; the test client has no IP address
+    assert client.get("/metrics").status_code == 403
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    body = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).text
+    assert ('http_request_duration_seconds_count{method="GET",route="/api/v1/data/{file_id}/rows",status="200"} 2'
+            in body)
+    assert 'stage_duration_seconds_count{service="data",stage="load"} 2' in body
+    assert 'cache_requests_total{cache="dataset",result="hit"} 1' in body
+    assert 'cache_hit_ratio{cache="dataset"} 0.5' in body
+    assert "ingest_rows_total 4" in body
+    assert float(body.split("\ningest_rows_per_second ")[1].split("\n")[0]) > 0
+
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+    assert client.get("/metrics").status_code == 404
+    assert "server-timing" not in client.get(f"/api/v1/data/{file_id}/rows", headers=headers).headers
+
+
+@pytest.mark.parametrize("host, allowed_ips, allowed", [
+    ("127.0.0.1", "127.0.0.1,::1", True),
+    ("::1", "127.0.0.1,::1", True),
+    ("10.1.2.3", "127.0.0.1,::1", False),
+    ("10.1.2.3", "10.0.0.0/8", True),
+    ("10.1.2.3", "", False),
+    ("testclient", "127.0.0.1", False),
+])
+def test_metrics_ip_allow_list(monkeypatch, host, allowed_ips, allowed):
+    from starlette.requests import Request
+    from app.main import metrics_access_allowed
+
+    monkeypatch.setattr(settings, "METRICS_ALLOWED_IPS", allowed_ips)
+    request = Request({"type": "http", "client": (host, 1234), "headers": []})
+    assert metrics_access_allowed(request) is allowed
+
+
+def test_slow_query_log_and_profiles(client, headers, file_id, monkeypatch):
+    from app.core.profiling import request_log
+    from app.models.user import User, UserRole
+
+    request_log.clear()
+    monkeypatch.setattr(settings, "SLOW_REQUEST_MS", 1)
+    params = {"sort_by": "revenue", "search": "o"}
+    profile_headers = {**headers, "X-Profile": "1"}
+
+    # Members can't ask for profiles or read the log
+    resp = client.get(f"/api/v1/data/{file_id}/rows", params=params, headers=profile_headers)
+    assert "x-profile-id" not in resp.headers
+    assert client.get("/api/v1/admin/slow-queries", headers=headers).status_code == 403
+
+    db = next(app.dependency_overrides[get_db]())
+    db.query(User).update({"role": UserRole.ADMIN})
+    db.commit()
+    db.close()
+
+    resp = client.get(f"/api/v1/data/{file_id}/rows", params=params, headers=profile_headers)
+    profile = client.get(f"/api/v1/admin/profiles/{resp.headers['x-profile-id']}", headers=headers).json()
+    assert profile["route"] == "/api/v1/data/{file_id}/rows"
+    assert any("sort_values" in f["function"] for f in profile["functions"])
+
+    slow = client.get("/api/v1/admin/slow-queries", headers=headers).json()
+    [latest, first] = [entry for entry in slow if entry["route"] == "/api/v1/data/{file_id}/rows"]
+    assert latest["profile_id"] == profile["profile_id"] and first["profile_id"] is None
+    assert latest["file_id"] == file_id and latest["params"] == params
+    assert latest["details"] == {"loaded_from": "cache", "rows": 4, "matched": 3}
+    assert {"load", "filter", "sort", "serialize"} <= set(latest["stages_ms"])
+
+    # Sampled requests keep their profile when they turn out slow
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+    client.post(f"/api/v1/data/{file_id}/aggregate", json={
+        "group_by": ["region"], "metrics": [{"col": "revenue", "agg": "sum"}],
+    }, headers=headers)
+    [sampled] = [p for p in client.get("/api/v1/admin/profiles", headers=headers).json()
+                 if p["route"] == "/api/v1/data/{file_id}/aggregate"]
+    assert sampled["details"]["groups"] == 4 and sampled["functions"]
+    assert client.get("/api/v1/admin/profiles/999", headers=headers).status_code == 404
+
+
+def test_stream_rows(client, headers, file_id, monkeypatch):
+    import json
+    from app.services import data_service
+
+    # One-row chunks, so every chunk is filtered on its own
+    monkeypatch.setattr(data_service, "STREAM_FIRST_CHUNK_ROWS", 1)
+    monkeypatch.setattr(data_service, "STREAM_MAX_CHUNK_ROWS", 2)
+    url = f"/api/v1/data/{file_id}/stream"
+    filters = '{"revenue": {"min": 300}}'
+    # Cold (read from the database in chunks), then sliced from the cached dataset
+    for _ in range(2):
+        resp = client.get(url, params={"filters": filters, "search": "o"}, headers=headers)
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in resp.text.splitlines()]
+        expected = client.get(f"/api/v1/data/{file_id}/rows", params={"filters": filters, "search": "o"},
+                              headers=headers).json()["rows"]
+        assert rows == expected and [r["product"] for r in rows] == ["Laptop", "Mouse", "Monitor"]
+
+    resp = client.get(url, params={"format": "sse", "limit": 2}, headers=headers)
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n") for block in resp.text.strip().split("\n\n")]
+    assert [event[0] for event in events] == ["event: rows", "event: rows", "event: end"]
+    assert [row["product"] for event in events[:2] for row in json.loads(event[1][6:])] == ["Laptop", "Mouse"]
+    assert json.loads(events[-1][1][6:]) == {"total": 2}
+
+    resp = client.get(url, params={"filters": '{"product": {"like": "M"}}'}, headers=headers)
+    assert resp.status_code == 400
+
+
+def test_duckdb_engine_matches_pandas(client, headers, file_id, monkeypatch):
+    pytest.importorskip("duckdb")
+    base = f"/api/v1/data/{file_id}"
+    filters = '{"revenue": {"min": 300}, "region": {"in": ["North", "South", "West"]}}'
+    requests = [
+        ("GET", f"{base}/rows", {"params": {"sort_by": "revenue", "sort_dir": "desc", "filters": filters}}),
+        ("GET", f"{base}/rows", {"params": {"search": "electr", "page_size": 2, "page": 2}}),
+        ("POST", f"{base}/aggregate", {"json": {
+            "group_by": ["category"], "metrics": [{"col": "revenue", "agg": "sum"}, {"col": "quantity", "agg": "std"}],
+        }}),
+        ("GET", f"{base}/export", {"params": {"filters": filters, "columns": "product,revenue"}}),
+    ]
+
+    def responses():
+        return [client.request(method, url, headers=headers, **kwargs) for method, url, kwargs in requests]
+
+    monkeypatch.setattr(settings, "QUERY_ENGINE", "pandas")
+    expected = responses()
+    monkeypatch.setattr(settings, "QUERY_ENGINE", "duckdb")
+    for resp, before in zip(responses(), expected):
+        assert resp.status_code == 200, resp.text
+        assert resp.content == before.content
+    resp = client.get(f"{base}/rows", params={"filters": '{"product": {"like": "M"}}'}, headers=headers)
+    assert resp.status_code == 400
+
+
+def test_concurrent_loads_and_queries_coalesce(client, headers, file_id, monkeypatch):
+    import threading
+    import time
+    from app.core.metrics import COALESCED_REQUESTS
+    from app.services.arrow_store import ArrowStore
+    from app.services.dataset_cache import dataset_cache
+
+    dataset_cache.clear()
+    ArrowStore.remove(_data_key(file_id))
+    reads = []
+    read_dataset = DataService._read_dataset
+
+    def slow_read(*args):
+        reads.append(1)
+        time.sleep(0.3)
+        return read_dataset(*args)
+
+    monkeypatch.setattr(DataService, "_read_dataset", slow_read)
+    before = {op: COALESCED_REQUESTS.value(operation=op) for op in ("load", "query")}
+    results = []
+
+    def query(run):
+        db = next(app.dependency_overrides[get_db]())
+        try:
+            results.append(run(db))
+        finally:
+            db.close()
+
+    runs = [lambda db: DataService.get_rows(file_id, db, page_size=2)["total"]] * 3 + [
+        lambda db: len(DataService.aggregate_data(file_id, ["category"], [{"col": "revenue", "agg": "sum"}], None, None, db)),
+        lambda db: len(DataService.export_csv(file_id, db).splitlines()),
+    ]
+    threads = [threading.Thread(target=query, args=(run,)) for run in runs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # One read of the file; identical row queries waited for the first
+    assert len(reads) == 1
+    assert sorted(results) == [2, 4, 4, 4, 5]
+    assert COALESCED_REQUESTS.value(operation="query") - before["query"] == 2
+    assert COALESCED_REQUESTS.value(operation="load") - before["load"] == 2
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    metrics_text = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).text
+    assert 'coalesced_requests_total{operation="load"}' in metrics_text
+
+
+def test_cache_warmup(client, headers, monkeypatch):
+    from app.models.file import File
+    from app.services.dataset_cache import dataset_cache
+    from app.services import warmup_service
+    from app.services.warmup_service import WarmupService
+
+    def upload(name: str) -> int:
+        content = SALES_CSV + f"2024-01-19,{name},Home,North,1,20\n".encode()
+        resp = client.post("/api/v1/files/upload", files={"file": (f"{name}.csv", content, "text/csv")}, headers=headers)
+        return resp.json()["id"]
+
+    ids = [upload(f"lamp{i}") for i in range(3)]
+    session_factory = sessionmaker(bind=next(app.dependency_overrides[get_db]()).get_bind())
+
+    # Queries are recorded on the file; after the first, in batches
+    for file_id in (ids[0], ids[0], ids[1]):
+        assert client.get(f"/api/v1/data/{file_id}/rows", headers=headers).status_code == 200
+    db = session_factory()
+    accessed = {f.id: (f.access_count, f.last_accessed_at) for f in db.query(File)}
+    assert accessed[ids[0]][0] == 1 and accessed[ids[1]][0] == 1 and accessed[ids[2]] == (0, None)
+
+    monkeypatch.setattr(settings, "WARMUP_FILES", 2)
+    assert {f.id for f in WarmupService.candidates(db, 2)} == set(ids[:2])
+    monkeypatch.setattr(settings, "WARMUP_ORDER", "frequent")
+    db.query(File).filter(File.id == ids[1]).update({"access_count": 5})
+    db.commit()
+    assert [f.id for f in WarmupService.candidates(db, 3)] == [ids[1], ids[0], ids[2]]
+    db.close()
+
+    dataset_cache.clear()
+    summary = WarmupService.warm(session_factory)
+    assert summary["loaded"] == [ids[1], ids[0]] and summary["bytes"] > 0
+    assert WarmupService.warm(session_factory)["cached"] == [ids[1], ids[0]]
+
+    # Over the memory budget nothing more is loaded
+    dataset_cache.clear()
+    monkeypatch.setattr(settings, "WARMUP_MEMORY_MB", 0)
+    assert WarmupService.warm(session_factory)["skipped"] == [ids[1], ids[0]]
+
+    # Uploads warm the new file in the background
+    monkeypatch.setattr(settings, "WARMUP_MEMORY_MB", 1024)
+    new_id = upload("pen")
+    warmup_service._executor.submit(lambda: None).result()  # runs after the scheduled warm-up
+    db = session_factory()
+    new_file = db.get(File, new_id)
+    assert dataset_cache.contains(new_file.data_key, new_file.version)
+    db.close()
+
+
+@pytest.mark.parametrize("engine", ["pandas", "duckdb"])
+def test_saved_views(client, headers, file_id, monkeypatch, engine):
+    if engine == "duckdb":
+        pytest.importorskip("duckdb")
+    monkeypatch.setattr(settings, "QUERY_ENGINE", engine)
+    url = f"/api/v1/data/{file_id}"
+    definition = {"filters": {"category": {"eq": "Electronics"}}, "sort_by": "quantity", "sort_dir": "desc"}
+    resp = client.post(f"{url}/views", json={"name": "Top electronics", **definition, "columns": ["product", "quantity"]},
+                       headers=headers)
+    assert resp.status_code == 201, resp.text
+    view = resp.json()
+    assert view["name"] == "Top electronics" and view["row_count"] == 3 and view["version"] == 1
+    assert client.get(f"{url}/views", headers=headers).json() == [view]
+
+    def page(number: int, page_size: int = 2) -> dict:
+        resp = client.get(f"{url}/rows", params={"view": view["id"], "page": number, "page_size": page_size},
+                          headers=headers)
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    # Pages come from the stored positions, restricted to the view's columns
+    assert page(1) == {"total": 3, "page": 1, "page_size": 2, "rows": [
+        {"product": "Mouse", "quantity": 15}, {"product": "Monitor", "quantity": 12},
+    ]}
+    assert page(2)["rows"] == [{"product": "Laptop", "quantity": 5}]
+    assert page(3)["rows"] == []
+    expected = client.get(f"{url}/rows", params={"filters": json.dumps(definition["filters"]), "sort_by": "quantity",
+                                                 "sort_dir": "desc"}, headers=headers).json()["rows"]
+    assert [row["product"] for row in page(1, 10)["rows"]] == [row["product"] for row in expected]
+
+    # Appends refresh the view
+    extra = b"Date,Product,Category,Region,Quantity,Revenue\n2024-01-19,Tablet,Electronics,North,20,900\n"
+    resp = client.post(f"/api/v1/files/{file_id}/append", files={"file": ("more.csv", extra, "text/csv")},
+                       headers=headers)
+    assert resp.status_code == 200, resp.text
+    [refreshed] = client.get(f"{url}/views", headers=headers).json()
+    assert refreshed["row_count"] == 4 and refreshed["version"] == 2
+    assert page(1)["rows"][0] == {"product": "Tablet", "quantity": 20}
+
+    # A view found stale when read is refreshed first
+    from app.models.saved_view import SavedView
+    db = next(app.dependency_overrides[get_db]())
+    db.query(SavedView).update({"version": 1})
+    db.commit()
+    db.close()
+    assert page(1)["total"] == 4
+
+    assert client.get(f"{url}/rows", params={"view": view["id"], "search": "a"}, headers=headers).status_code == 400
+    assert client.get(f"{url}/rows", params={"view": 999}, headers=headers).status_code == 404
+    resp = client.post(f"{url}/views", json={"name": "bad", "sort_by": "nope"}, headers=headers)
+    assert resp.status_code == 400
+    assert client.delete(f"{url}/views/{view['id']}", headers=headers).status_code == 200
+    assert client.get(f"{url}/views", headers=headers).json() == []
+
+
+def test_file_and_user_listings_page_by_cursor(client, headers, monkeypatch):
+    from app.models.file import File
+    from app.models.user import User, UserRole
+
+    names = ["Sales-2024.csv", "sales-2025.csv", "costs.csv", "SALES-eu.csv", "stock.csv"]
+    ids = [client.post("/api/v1/files/upload", files={"file": (name, SALES_CSV, "text/csv")}, headers=headers).json()["id"]
+           for name in names]
+    db = next(app.dependency_overrides[get_db]())
+    # Two uploads in the same second, the rest apart
+    for file_id, uploaded_at in zip(ids, ["2024-01-01 10:00:00", "2024-01-02 10:00:00", "2024-01-02 10:00:00",
+                                          "2024-01-03 10:00:00", "2024-01-04 10:00:00"]):
+        db.query(File).filter(File.id == file_id).update({"uploaded_at": datetime.fromisoformat(uploaded_at)})
+    db.commit()
+
+    def walk(**params) -> list:
+        pages, cursor = [], None
+        while True:
+            resp = client.get("/api/v1/files", params={"page_size": 2, **params, **({"cursor": cursor} if cursor else {})},
+                              headers=headers)
+            assert resp.status_code == 200, resp.text
+            body = resp.json()
+            pages.append([f["id"] for f in body["files"]])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                return pages
+
+    # Newest first, ties by id; every file exactly once
+    assert walk() == [[ids[4], ids[3]], [ids[2], ids[1]], [ids[0]]]
+    assert client.get("/api/v1/files", params={"page": 2, "page_size": 2}, headers=headers).json()["files"][0]["id"] == ids[2]
+    assert walk(prefix="sales") == [[ids[3], ids[1]], [ids[0]]]
+    resp = client.get("/api/v1/files", params={"prefix": "SALES-20"}, headers=headers).json()
+    assert resp["total"] == 2 and resp["next_cursor"] is None
+    assert client.get("/api/v1/files", params={"cursor": "nonsense"}, headers=headers).status_code == 400
+
+    # Totals are reused until they expire or files change
+    db.query(File).filter(File.id == ids[0]).delete()
+    db.commit()
+    assert client.get("/api/v1/files", headers=headers).json()["total"] == 5
+    monkeypatch.setattr(settings, "LIST_TOTAL_TTL_SECONDS", 0)
+    assert client.get("/api/v1/files", headers=headers).json()["total"] == 4
+    monkeypatch.setattr(settings, "LIST_TOTAL_TTL_SECONDS", 30)
+    client.post("/api/v1/files/upload", files={"file": ("new.csv", SALES_CSV, "text/csv")}, headers=headers)
+    assert client.get("/api/v1/files", headers=headers).json()["total"] == 5
+
+    assert client.get("/api/v1/users", headers=headers).status_code == 403
+    for i in range(2):
+        client.post("/api/v1/auth/signup", json={
+            "username": f"other{i}", "email": f"other{i}@example.com", "password": "supersecurepassword",
+        })
+    db.query(User).filter(User.username == "datauser").update({"role": UserRole.ADMIN})
+    db.commit()
+    db.close()
+    first = client.get("/api/v1/users", params={"page_size": 2}, headers=headers).json()
+    assert first["total"] == 3 and [u["username"] for u in first["users"]] == ["datauser", "other0"]
+    rest = client.get("/api/v1/users", params={"page_size": 2, "cursor": first["next_cursor"]}, headers=headers).json()
+    assert [u["username"] for u in rest["users"]] == ["other1"] and rest["next_cursor"] is None
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "sse"])
+def test_streams_skip_compression(client, headers, file_id, monkeypatch, fmt):
+    import asyncio
+    from app.services import data_service
+
+    # One row per chunk, so every row is its own write
+    monkeypatch.setattr(data_service, "STREAM_FIRST_CHUNK_ROWS", 1)
+    monkeypatch.setattr(data_service, "STREAM_MAX_CHUNK_ROWS", 1)
+    messages = []
+
+    async def run():
+        done = asyncio.Event()
+        requested = False
+
+        async def receive():
+            # The (empty) request body, then a disconnect once the response is sent
+            nonlocal requested
+            if requested:
+                await done.wait()
+                return {"type": "http.disconnect"}
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                done.set()
+
+        await app(scope, receive, send)
+
+    path = f"/api/v1/data/{file_id}/stream"
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "root_path": "",
+        "path": path, "raw_path": path.encode(), "query_string": f"format={fmt}".encode(),
+        "server": ("testserver", 80), "client": ("testclient", 50000),
+        "headers": [(b"accept-encoding", b"gzip, br"), (b"authorization", headers["Authorization"].encode())],
+    }
+    asyncio.run(run())
+
+    start = dict(messages[0]["headers"])
+    assert start[b"content-encoding"] == b"identity"
+    bodies = [m["body"] for m in messages[1:] if m.get("body")]
+    # Every row went out as it was written, readable on its own
+    assert len(bodies) >= 4
+    if fmt == "ndjson":
+        assert json.loads(bodies[0])["product"] == "Laptop"
+    else:
+        assert bodies[0].startswith(b"event: rows\ndata: [{") and bodies[0].endswith(b"\n\n")
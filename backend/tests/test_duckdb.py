@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.services.arrow_store import ArrowStore
+from app.services.data_service import DataService
+from app.services.dataset_cache import Dataset
+from app.services.duckdb_service import DuckDBService
+
+pytest.importorskip("duckdb")
+
+COLUMNS_JSON = {
+    "columns": ["order_id", "date", "product", "region", "quantity", "revenue"],
+    "types": {
+        "order_id": "number", "date": "date", "product": "string",
+        "region": "string", "quantity": "number", "revenue": "number",
+    },
+    "date_formats": {"date": "%m/%d/%Y"},
+}
+
+FILTERS = [
+    None,
+    {"product": "lap"},
+    {"product": "none"},
+    {"product": {"eq": "Lamp"}},
+    {"quantity": {"eq": "7"}},
+    {"quantity": {"in": [1, 2, 3], "min": 2}},
+    {"product": {"prefix": "la"}, "region": {"in": ["North", "South"]}},
+    {"date": {"min": "2024-02-01", "max": "2024-02-15"}},
+    {"revenue": {"min": 1000, "max": 2500}},
+    {"quantity": {"is_null": True}},
+    {"revenue": {"is_null": True}},
+    {"product": {"is_null": False}, "quantity": {"max": 10}},
+    {"or": [{"region": {"eq": "East"}}, {"quantity": {"min": 45}}], "product": "mouse"},
+    {"and": [{"or": [{"product": {"eq": "Lamp"}}, {"product": {"eq": "Mouse"}}]}, {"date": {"max": "2024-01-10"}}]},
+    {"unknown": {"eq": 1}, "region": {"in": []}},
+]
+
+
+def _frame(rows: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 90, rows), unit="D")
+    frame = pd.DataFrame({
+        "order_id": np.arange(rows),
+        "date": dates.strftime("%m/%d/%Y"),
+        "product": rng.choice(["Laptop", "Lamp", "Mouse", "Desk Chair"], rows),
+        "region": pd.Categorical(rng.choice(["East", "North", "South"], rows)),
+        "quantity": rng.integers(1, 50, rows).astype(object),
+        "revenue": (rng.random(rows) * 5000).round(2),
+    })
+    frame.loc[rng.random(rows) < 0.1, "quantity"] = None
+    frame.loc[rng.random(rows) < 0.05, "product"] = None
+    frame.loc[rng.random(rows) < 0.05, "revenue"] = np.nan
+    return frame
+
+
+@pytest.fixture(params=["frame", "arrow_file"])
+def dataset(request, tmp_path, monkeypatch):
+    frame = _frame()
+    if request.param == "frame":
+        return Dataset(frame, COLUMNS_JSON, indexed=True)
+    # Mapped like cached datasets: NaN is stored as a value, ints with nulls come back as objects
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    assert ArrowStore.write(frame, "sales", 1)
+    return Dataset(ArrowStore.read("sales", 1), COLUMNS_JSON, indexed=True, path=ArrowStore.path("sales", 1))
+
+
+def _both(monkeypatch, run):
+    """``run()`` with the pandas engine, then with DuckDB."""
+    monkeypatch.setattr(settings, "QUERY_ENGINE", "pandas")
+    expected = run()
+    monkeypatch.setattr(settings, "QUERY_ENGINE", "duckdb")
+    return expected, run()
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+# "nan"/"none" would match nulls rendered as text
+@pytest.mark.parametrize("search", [None, "la", "north", "nan", "none"])
+def test_rows_and_export_match_pandas(monkeypatch, dataset, filters, search):
+    expected, result = _both(monkeypatch, lambda: DataService._paginate(dataset, 2, 25, None, "asc", search, filters))
+    assert result["total"] == expected["total"]
+    pd.testing.assert_frame_equal(result["rows"], expected["rows"])
+
+    expected, result = _both(monkeypatch, lambda: DataService._to_csv(dataset, search, filters, ["order_id", "revenue"]))
+    assert result == expected
+    # Answered by DuckDB, not by the pandas fallback
+    assert DuckDBService.positions(dataset, search, filters) is not None
+
+
+@pytest.mark.parametrize("sort_by,sort_dir", [
+    ("order_id", "desc"), ("revenue", "asc"), ("revenue", "desc"), ("product", "asc"), ("region", "desc"),
+])
+@pytest.mark.parametrize("page", [1, 7, 500])
+def test_sorted_pages_match_pandas(monkeypatch, dataset, sort_by, sort_dir, page):
+    filters = {"quantity": {"min": 5}}
+    expected, result = _both(monkeypatch, lambda: DataService._paginate(dataset, page, 50, sort_by, sort_dir, None, filters))
+    assert result["total"] == expected["total"]
+    # Rows tied on the sort key keep file order in both
+    pd.testing.assert_frame_equal(result["rows"], expected["rows"])
+
+
+@pytest.mark.parametrize("group_by", [[], ["region"], ["product", "region"], ["quantity"]])
+@pytest.mark.parametrize("filters,search", [(None, None), ({"revenue": {"min": 2000}}, None), (None, "mouse")])
+def test_aggregates_match_pandas(monkeypatch, dataset, group_by, filters, search):
+    metrics = [
+        {"col": col, "agg": agg}
+        for col in ("quantity", "revenue", "product") for agg in ("count", "sum", "avg", "min", "max", "std")
+    ]
+    expected, result = _both(monkeypatch, lambda: DataService._aggregate(dataset, group_by, metrics, filters, search))
+    assert list(result.columns) == list(expected.columns)
+    assert DuckDBService.aggregate(dataset, group_by, {"n": ("revenue", "count")}, filters, search) is not None
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_categorical=False)
+
+
+def test_unsupported_queries_fall_back(monkeypatch, dataset):
+    monkeypatch.setattr(settings, "QUERY_ENGINE", "duckdb")
+    # A lookahead is valid for pandas' regex engine but not for DuckDB's RE2
+    assert DuckDBService.positions(dataset, "la(?=p)", None) is None
+    result = DataService._paginate(dataset, 1, 10, None, "asc", "la(?=p)", None)
+    assert result["total"] == dataset.frame["product"].astype(str).str.contains("lap", case=False).sum()
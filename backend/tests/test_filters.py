@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.services.dataset_cache import Dataset, DatasetCache
+from app.services.filter_service import FilterService
+
+COLUMNS_JSON = {
+    "columns": ["date", "product", "region", "quantity"],
+    "types": {"date": "date", "product": "string", "region": "string", "quantity": "number"},
+    "date_formats": {"date": "%m/%d/%Y"},
+}
+
+
+def _frame(rows: int = 2000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 90, rows), unit="D")
+    frame = pd.DataFrame({
+        "date": dates.strftime("%m/%d/%Y"),
+        "product": rng.choice(["Laptop", "Lamp", "Mouse", "Desk Chair"], rows),
+        "region": pd.Categorical(rng.choice(["North", "South", "East"], rows)),
+        "quantity": rng.integers(1, 50, rows).astype(object),
+    })
+    frame.loc[rng.random(rows) < 0.1, "quantity"] = None
+    frame.loc[rng.random(rows) < 0.05, "product"] = None
+    return frame
+
+
+FILTERS = [
+    {"product": "lap"},
+    {"product": {"eq": "Lamp"}},
+    {"quantity": {"eq": "7"}},
+    {"quantity": {"in": [1, 2, 3], "min": 2}},
+    {"product": {"prefix": "la"}, "region": {"in": ["North", "South"]}},
+    {"date": {"min": "2024-02-01", "max": "2024-02-15"}},
+    {"quantity": {"is_null": True}},
+    {"product": {"is_null": False}, "quantity": {"max": 10}},
+    {"or": [{"region": {"eq": "East"}}, {"quantity": {"min": 45}}], "product": "mouse"},
+    {"and": [{"or": [{"product": {"eq": "Lamp"}}, {"product": {"eq": "Mouse"}}]}, {"date": {"max": "2024-01-10"}}]},
+    {"unknown": {"eq": 1}, "region": "north"},
+]
+
+
+def _expected(frame: pd.DataFrame, filters: dict) -> np.ndarray:
+    """The same filters spelled out with plain pandas."""
+    quantity = pd.to_numeric(frame["quantity"], errors="coerce")
+    dates = pd.to_datetime(frame["date"], format="%m/%d/%Y")
+    product = frame["product"]
+    masks = [
+        product.str.contains("lap", case=False, na=False),
+        product == "Lamp",
+        quantity == 7,
+        quantity.isin([1, 2, 3]) & (quantity >= 2),
+        product.str.lower().str.startswith("la", na=False) & frame["region"].isin(["North", "South"]),
+        (dates >= "2024-02-01") & (dates <= "2024-02-15"),
+        frame["quantity"].isna(),
+        product.notna() & (quantity <= 10),
+        ((frame["region"] == "East") | (quantity >= 45)) & product.str.contains("mouse", case=False, na=False),
+        product.isin(["Lamp", "Mouse"]) & (dates <= "2024-01-10"),
+        frame["region"].astype(str).str.contains("north", case=False),
+    ]
+    return np.flatnonzero(masks[FILTERS.index(filters)].to_numpy(dtype=bool))
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filters_match_pandas(filters, indexed):
+    frame = _frame()
+    dataset = Dataset(frame, COLUMNS_JSON, indexed=indexed)
+    positions = FilterService.select(dataset, filters)
+    np.testing.assert_array_equal(positions, _expected(frame, filters))
+    # Indexes are reused by the next query
+    np.testing.assert_array_equal(FilterService.select(dataset, filters), positions)
+
+
+@pytest.mark.parametrize("filters", [
+    {"product": {"like": "x"}},
+    {"product": {"in": "Lamp"}},
+    {"product": {"is_null": "yes"}},
+    {"date": {"min": "not a date"}},
+    {"or": [["product"]]},
+])
+def test_malformed_filters_rejected(filters):
+    dataset = Dataset(_frame(10), COLUMNS_JSON)
+    with pytest.raises(HTTPException) as excinfo:
+        FilterService.select(dataset, filters)
+    assert excinfo.value.status_code == 400
+
+
+def test_dataset_cache_keeps_latest_version(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "DATASET_CACHE_SIZE", 2)
+    cache = DatasetCache()
+    frame = _frame(10)
+    cache.put("a", 1, frame, COLUMNS_JSON)
+    assert cache.get("a", 1).indexed
+    cache.put("a", 2, frame, COLUMNS_JSON)
+    assert cache.get("a", 1) is None and cache.get("a", 2) is not None
+    cache.put("b", 1, frame, COLUMNS_JSON)
+    cache.put("c", 1, frame, COLUMNS_JSON)
+    assert cache.get("a", 2) is None
+    cache.invalidate("c")
+    assert cache.get("c", 1) is None and cache.get("b", 1) is not None
+
+    monkeypatch.setattr(settings, "DATASET_CACHE_SIZE", 0)
+    assert not DatasetCache().put("d", 1, frame, COLUMNS_JSON).indexed
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+@pytest.mark.parametrize("group_by", [[], ["region"], ["product", "region"]])
+def test_partitioned_queries_match_serial(monkeypatch, group_by, indexed):
+    from app.core.config import settings
+    from app.services import data_service
+    from app.services.data_service import DataService
+
+    frame = _frame(5000)
+    metrics = [{"col": "quantity", "agg": agg} for agg in ("count", "sum", "avg", "min", "max", "std")]
+    cases = [(None, None), ({"quantity": {"min": 10}}, None), ({"region": {"in": ["North", "East"]}}, "la")]
+
+    def run(filters, search):
+        dataset = Dataset(frame, COLUMNS_JSON, indexed=indexed)
+        rows = DataService._apply_search_and_filters(dataset, search, filters)
+        return rows, DataService._aggregate(dataset, group_by, metrics, filters, search)
+
+    monkeypatch.setattr(settings, "QUERY_WORKERS", 1)
+    serial = [run(*case) for case in cases]
+    monkeypatch.setattr(settings, "QUERY_WORKERS", 4)
+    monkeypatch.setattr(data_service, "PARTITION_MIN_ROWS", 1000)
+    assert len(DataService._partitions(frame)) == 4
+    for (rows, result), case in zip(serial, cases):
+        parallel_rows, parallel_result = run(*case)
+        pd.testing.assert_frame_equal(parallel_rows, rows)
+        pd.testing.assert_frame_equal(parallel_result, result)
+
+
+@pytest.mark.parametrize("sort_by", ["product", "region", "quantity"])
+@pytest.mark.parametrize("sort_dir", ["asc", "desc"])
+def test_sorted_pages_match_saved_view_order(monkeypatch, sort_by, sort_dir):
+    from app.core.config import settings
+    from app.services.data_service import DataService
+    from app.services.view_service import ViewService
+
+    monkeypatch.setattr(settings, "QUERY_ENGINE", "pandas")
+    frame = _frame(3000)
+    dataset = Dataset(frame, COLUMNS_JSON)
+    filters = {"quantity": {"max": 40}}
+    # Sort keys repeat a lot; ties must come back in file order on every page
+    pages = [
+        DataService._paginate(dataset, page, 250, sort_by, sort_dir, None, filters)["rows"]
+        for page in range(1, 13)
+    ]
+    paged = frame.index.get_indexer(pd.concat(pages).index)
+    view = ViewService.materialize(dataset, {"filters": filters, "sort_by": sort_by, "sort_dir": sort_dir})
+    assert len(set(paged)) == len(paged) == len(view)
+    assert paged.tolist() == view.tolist()
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.metrics import COALESCED_REQUESTS
+from app.core.single_flight import SingleFlight, flight_key
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight("test")
+    calls, results = [], []
+    before = COALESCED_REQUESTS.value(operation="test")
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return object()
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    assert COALESCED_REQUESTS.value(operation="test") - before == 4
+    assert flight.in_flight() == 0
+    # Finished flights keep nothing
+    assert flight.do("key", compute) is not results[0]
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight("test")
+    errors = []
+
+    def fail():
+        time.sleep(0.2)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flight.do("key", fail)
+        except ValueError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+def test_async_and_sync_callers_share_flights():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return "rows"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("key", compute))
+        await asyncio.sleep(0.05)
+        # A thread (sync endpoint) joins the coroutine's flight
+        from_thread = asyncio.get_running_loop().run_in_executor(None, flight.do, "key", lambda: "recomputed")
+        return await asyncio.gather(leader, flight.do_async("key", compute), from_thread)
+
+    assert asyncio.run(main()) == ["rows", "rows", "rows"]
+    assert len(calls) == 1
+
+
+def test_cancelled_leader_hands_over():
+    flight = SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "done"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("key", slow))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(flight.do_async("key", fast))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_flight_key_normalizes_parameters():
+    assert flight_key("rows", {"a": 1, "b": [1, 2]}) == flight_key("rows", {"b": [1, 2], "a": 1})
+    assert flight_key("rows", {"a": 1}) != flight_key("rows", {"a": 2})
+    hash(flight_key("rows", {"or": [{"x": {"in": [1, 2]}}]}, None))
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from app.services import file_service
+from app.services.file_service import FileService
+
+
+def _messy_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    amounts = rng.random(rows) * 1000
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 300, rows), unit="D")
+    return pd.DataFrame({
+        "price": [f"${v:,.2f}" for v in amounts],
+        "share": [f"{v % 100:.1f}%" for v in amounts],
+        "score": np.where(rng.random(rows) < 0.2, "N/A", amounts.round(1).astype(str)),
+        "day": dates.strftime("%d/%m/%Y"),
+        "product": rng.choice(["Laptop", "Mouse", "Desk Chair"], rows),
+        "quantity": rng.integers(1, 50, rows),
+    })
+
+
+def test_sampled_inference_on_messy_columns(monkeypatch):
+    monkeypatch.setattr(file_service, "INFER_SAMPLE_SIZE", 300)
+    monkeypatch.setattr(file_service, "INFER_PROBE_SIZE", 30)
+    types = FileService.infer_column_types(_messy_frame(2000))
+    assert types == {
+        "price": "number", "share": "number", "score": "number",
+        "day": "date", "product": "string", "quantity": "number",
+    }
+
+
+def test_parallel_inference_matches_serial(monkeypatch):
+    df = pd.concat([_messy_frame(500).add_suffix(f"_{i}") for i in range(4)], axis=1)
+    monkeypatch.setattr(file_service, "INFER_PARALLEL_COLUMNS", 1)
+    monkeypatch.setattr(file_service, "INFER_WORKERS", 4)
+    parallel = FileService.infer_column_types(df)
+    monkeypatch.setattr(file_service, "INFER_WORKERS", 1)
+    assert parallel == FileService.infer_column_types(df)
+
+
+def test_date_format_detected_once():
+    dates = pd.Series(["03/02/2024", None, "15/02/2024", "not a date"])
+    assert FileService.detect_date_format(dates) == "%d/%m/%Y"
+    parsed = FileService._coerce_datetime(dates)
+    assert parsed.iloc[0] == pd.Timestamp("2024-02-03")
+    assert parsed.iloc[3] is pd.NaT